@@ -0,0 +1,8 @@
+# benchmarks/__main__.py
+# Entry point for `python -m benchmarks`.
+
+import sys
+
+from .runner import main
+
+sys.exit(main())
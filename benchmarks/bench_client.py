@@ -0,0 +1,111 @@
+# benchmarks/bench_client.py
+# Benchmarks for the client's hot paths. Run with `python -m benchmarks`.
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from py_schwab_wrapper.candles import CandleSeries
+from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.testing.stand_in import StandInServer
+from py_schwab_wrapper.utils.option_chain_utils import flatten_options_chain
+
+from .runner import benchmark
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TEST_DATA = os.path.join(ROOT, "tests", "test_data")
+
+# Imports the client and constructs it in a fresh interpreter, as a CLI job or short-lived worker would
+STARTUP_SCRIPT = """
+import time
+from py_schwab_wrapper.schwab_api import SchwabAPI
+token = {{"access_token": "benchmark", "refresh_token": "benchmark", "expires_at": time.time() + 86400}}
+SchwabAPI("client", "secret", load_token_func=lambda: token, save_token_func=lambda new_token: None, lazy={lazy})
+"""
+
+
+def _read_fixture(name):
+    with open(os.path.join(TEST_DATA, name), "rb") as f:
+        return f.read()
+
+
+def make_api(base_url="http://127.0.0.1:9"):
+    # A token that stays valid, so the constructor and ensure_valid_token never refresh
+    token = {"access_token": "benchmark", "refresh_token": "benchmark", "expires_at": time.time() + 86400}
+    return SchwabAPI("client", "secret", base_url=base_url, load_token_func=lambda: token,
+                     save_token_func=lambda new_token: None)
+
+
+def make_options_chain(expirations=20, strikes=100):
+    def side(put_call):
+        return {
+            f"2024-{10 + e // 28:02d}-{1 + e % 28:02d}:{e}": {
+                f"{400.0 + s:.1f}": [{"putCall": put_call, "symbol": f"QQQ{e:02d}{put_call[0]}{s}",
+                                      "strikePrice": 400.0 + s, "bid": 1.0, "ask": 1.1}]
+                for s in range(strikes)
+            }
+            for e in range(expirations)
+        }
+    return {"symbol": "QQQ", "status": "SUCCESS", "callExpDateMap": side("CALL"), "putExpDateMap": side("PUT")}
+
+
+@benchmark("price_history_decode", number=5)
+def price_history_decode():
+    raw = _read_fixture("QQQ-default.json")
+    yield lambda: json.loads(raw)
+
+
+@benchmark("price_history_to_series", number=5)
+def price_history_to_series():
+    history = json.loads(_read_fixture("QQQ-default.json"))
+    yield lambda: CandleSeries.from_price_history(history)
+
+
+@benchmark("options_chain_flatten", number=50)
+def options_chain_flatten():
+    chain = make_options_chain()
+    yield lambda: flatten_options_chain(chain)
+
+
+@benchmark("first_triggers_oco_payload", number=20000)
+def first_triggers_oco_payload():
+    api = make_api()
+    yield lambda: api.build_first_triggers_oco_payload("LIMIT", 10, "QQQ", "BUY", price=480.0,
+                                                       stop_loss=478.0, profit_target=484.0)
+
+
+@benchmark("ensure_valid_token", number=50000)
+def ensure_valid_token():
+    api = make_api()
+    yield api.ensure_valid_token
+
+
+@benchmark("get_with_retry_stand_in", number=200)
+def get_with_retry_stand_in():
+    with StandInServer() as server:
+        server.add_route("GET", "/marketdata/v1/quotes", {"QQQ": {"symbol": "QQQ", "quote": {"lastPrice": 480.0}}})
+        api = make_api(server.base_url)
+        url = f"{server.base_url}/marketdata/v1/quotes"
+        yield lambda: api.get_with_retry(url, params={"symbols": "QQQ"})
+
+
+def _run_python(code):
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+@benchmark("startup_interpreter", number=3)
+def startup_interpreter():
+    # The floor for the startup benchmarks below
+    yield lambda: _run_python("pass")
+
+
+@benchmark("startup_eager", number=3)
+def startup_eager():
+    yield lambda: _run_python(STARTUP_SCRIPT.format(lazy=False))
+
+
+@benchmark("startup_lazy", number=3)
+def startup_lazy():
+    yield lambda: _run_python(STARTUP_SCRIPT.format(lazy=True))
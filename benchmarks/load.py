@@ -0,0 +1,66 @@
+# benchmarks/load.py
+# Load test SchwabAPI against the stand-in server with injected faults.
+# Run with `python -m benchmarks.load --concurrency 16 --duration 10 --rate-limit 0.05`.
+
+import argparse
+import json
+import logging
+import time
+
+from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.testing.faults import FaultInjector, lognormal_latency
+from py_schwab_wrapper.testing.load import run_load
+from py_schwab_wrapper.testing.stand_in import StandInServer
+
+QUOTES_PATH = "/marketdata/v1/quotes"
+
+
+class TokenStore:
+    def __init__(self):
+        self.token = {"access_token": "", "refresh_token": "load-test", "expires_at": 0}
+
+    def load(self):
+        return self.token
+
+    def save(self, token):
+        self.token = token
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive SchwabAPI against a faulty local stand-in.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Run time in seconds")
+    parser.add_argument("--latency", type=float, default=0.02, help="Median injected latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Probability of a 429")
+    parser.add_argument("--server-error", type=float, default=0.0, help="Probability of starting a 503 burst")
+    parser.add_argument("--burst", type=int, default=3, help="Length of a 503 burst")
+    parser.add_argument("--reset", type=float, default=0.0, help="Probability of a connection reset")
+    parser.add_argument("--expire-tokens-every", type=int, help="Revoke tokens every N requests")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Show the client's retry log messages")
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("py_schwab_wrapper").setLevel(logging.CRITICAL)
+
+    faults = FaultInjector(
+        latency=lognormal_latency(args.latency, args.latency_sigma) if args.latency else None,
+        rate_limit=args.rate_limit, server_error=args.server_error, server_error_burst=args.burst,
+        connection_reset=args.reset, expire_tokens_every=args.expire_tokens_every, seed=args.seed,
+    )
+    with StandInServer(faults=faults) as server:
+        server.add_route("GET", QUOTES_PATH, {"QQQ": {"symbol": "QQQ", "quote": {"lastPrice": 480.0}}})
+        store = TokenStore()
+        api = SchwabAPI("client", "secret", base_url=server.base_url, load_token_func=store.load,
+                        save_token_func=store.save)
+        started = time.time()
+        report = run_load(lambda: api.get_quotes(["QQQ"]), concurrency=args.concurrency,
+                          duration=args.duration, server=server)
+
+    result = dict(report.as_dict(), faults=faults.counts, started=started)
+    print(json.dumps(result, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+# benchmarks/runner.py
+# Times registered benchmarks, stores results as JSON and compares them against a baseline.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+BENCHMARKS = {}
+
+DEFAULT_THRESHOLD = 0.25
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), "thresholds.json")
+
+
+def benchmark(name, number):
+    """
+    Register a benchmark.
+
+    The decorated function is a generator: it does its setup, yields the callable to time, and
+    cleans up after the yield. The callable runs `number` times per round.
+
+    :param name: The benchmark name used in results and thresholds.
+    :param number: Calls per round.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (contextmanager(setup), number)
+        return setup
+    return register
+
+
+def time_callable(func, number, rounds):
+    """
+    :return: A dictionary with the median, min and max seconds per call, calls per second, number and rounds.
+    """
+    func()  # Warm up caches and connections outside the measurement
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - started) / number)
+    median = statistics.median(per_call)
+    return {
+        "median_s": median,
+        "min_s": min(per_call),
+        "max_s": max(per_call),
+        "ops_per_s": 1.0 / median if median else float("inf"),
+        "number": number,
+        "rounds": rounds,
+    }
+
+
+def run_benchmarks(names=None, rounds=5, scale=1.0):
+    """
+    :param names: Benchmark names to run. Default is every registered benchmark.
+    :param rounds: Timed rounds per benchmark; the median round is reported.
+    :param scale: Multiplier for the calls per round, e.g. 0.01 for a smoke run.
+    :return: A results document with `meta` and `results` keys.
+    """
+    from . import bench_client  # noqa: F401  Registers the benchmarks
+
+    results = {}
+    for name in names or sorted(BENCHMARKS):
+        setup, number = BENCHMARKS[name]
+        with setup() as func:
+            results[name] = time_callable(func, max(1, int(number * scale)), rounds)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def load_thresholds(path=THRESHOLDS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, thresholds=None, default_threshold=DEFAULT_THRESHOLD):
+    """
+    Compare median timings against a baseline.
+
+    :param results: A results document from `run_benchmarks`.
+    :param baseline: An earlier results document.
+    :param thresholds: Optional dictionary mapping benchmark name to the allowed slowdown, e.g. 0.5 for 50%.
+    :param default_threshold: The allowed slowdown for benchmarks without their own threshold.
+    :return: A list of `(name, baseline_median, median, ratio, regressed)` tuples, one per shared benchmark.
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for name, result in sorted(results["results"].items()):
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        ratio = result["median_s"] / previous["median_s"] if previous["median_s"] else float("inf")
+        regressed = ratio > 1.0 + thresholds.get(name, default_threshold)
+        rows.append((name, previous["median_s"], result["median_s"], ratio, regressed))
+    return rows
+
+
+def _format_seconds(seconds):
+    for unit, factor in (("s", 1.0), ("ms", 1e3), ("us", 1e6)):
+        if seconds * factor >= 1:
+            return f"{seconds * factor:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the client's hot paths.")
+    parser.add_argument("--only", nargs="*", help="Benchmark names to run")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for calls per round")
+    parser.add_argument("--output", help="Write the results document to this file")
+    parser.add_argument("--baseline", help="Compare against this results document")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown for benchmarks without an entry in thresholds.json")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, args.rounds, args.scale)
+    for name, result in results["results"].items():
+        print(f"{name:32} {_format_seconds(result['median_s']):>12}/call  {result['ops_per_s']:>14,.0f} ops/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, load_thresholds(), args.threshold)
+        print()
+        for name, previous, current, ratio, regressed in rows:
+            flag = "REGRESSION" if regressed else "ok"
+            print(f"{name:32} {_format_seconds(previous):>12} -> {_format_seconds(current):>12}  x{ratio:.2f}  {flag}")
+        if any(row[4] for row in rows):
+            return 1
+    return 0
@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.market_calendar import get_default_calendar
 
 
 def save_price_history_to_json(api_response, filename):
@@ -57,13 +58,18 @@ client_secret = os.getenv('SCHWAB_CLIENT_SECRET')
 # Initialize the API wrapper with your credentials
 schwab_api = SchwabAPI(client_id=client_id, client_secret=client_secret)
 
+calendar = get_default_calendar()
+
 # Define the time range
 while True:
-    now = datetime.now()
-    start_of_day = now.replace(hour=9, minute=30, second=0, microsecond=0)
-    end_of_day = now.replace(hour=16, minute=0, second=0, microsecond=0)
-    start_date = int(start_of_day.timestamp() * 1000)
-    end_date = int(end_of_day.timestamp() * 1000)
+    # Nothing changes while the market is closed, so sleep until the next session opens
+    seconds_until_open = calendar.seconds_until_open()
+    if seconds_until_open:
+        print(f"Market closed. Sleeping {seconds_until_open:.0f} seconds until the next open.")
+        time.sleep(seconds_until_open)
+        continue
+
+    start_date, end_date = calendar.trading_session()
 
     # Fetch and save price history
     fetch_and_save_price_history(schwab_api, symbol='QQQ', start_date=start_date, end_date=end_date)
@@ -0,0 +1,42 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+
+# To use published library, uncomment lines below:
+# from py_schwab_wrapper.schwab_api import SchwabAPI
+# from py_schwab_wrapper.streaming import SchwabStreamer
+# For local development, uncomment code blow:
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.streaming import SchwabStreamer, CHART_EQUITY
+
+
+async def main():
+    # Load environment variables from .env file
+    load_dotenv()
+    client_id = os.getenv('SCHWAB_CLIENT_ID')
+    client_secret = os.getenv('SCHWAB_CLIENT_SECRET')
+    # Initialize the API wrapper with your credentials
+    schwab_api = SchwabAPI(client_id=client_id, client_secret=client_secret)
+
+    # Streamed events replace the `while True` / `time.sleep(300)` loop in save_5_min_candles.py
+    queue = asyncio.Queue()
+    streamer = SchwabStreamer(schwab_api, queue=queue)
+    await streamer.subscribe_chart_bars(['QQQ'])
+    await streamer.subscribe_quotes(['QQQ'])
+    task = asyncio.create_task(streamer.run())
+
+    try:
+        while True:
+            event = await queue.get()
+            if event.service == CHART_EQUITY:
+                print(f"{event.symbol} bar: {event.fields}")
+            else:
+                print(f"{event.symbol} last: {event.fields.get('lastPrice')}")
+    finally:
+        await streamer.stop()
+        await task
+
+if __name__ == "__main__":
+    asyncio.run(main())
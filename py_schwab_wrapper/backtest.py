@@ -0,0 +1,210 @@
+# py_schwab_wrapper/backtest.py
+# Local simulation of First Triggers OCO brackets over stored candles.
+
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import product
+
+from .candles import CandleSeries
+from .market_calendar import get_default_calendar
+from .utils.parameter_utils import get_inverse_instruction
+
+# Exit reasons
+STOP = "STOP"
+LIMIT = "LIMIT"
+EXPIRED = "EXPIRED"  # DAY children cancelled at the end of the session, marked at the last close
+OPEN = "OPEN"        # Still open when the data ends, marked at the last close
+
+Trade = namedtuple("Trade", [
+    "signal_index", "entry_index", "entry_time", "entry_price", "instruction",
+    "exit_index", "exit_time", "exit_price", "exit_instruction", "exit_reason",
+    "quantity", "pnl",
+])
+
+
+def _is_long(instruction):
+    return instruction.startswith("BUY")
+
+
+def _session_ends(datetimes, calendar):
+    # Position of the last bar of every bar's trading day, computed once per series
+    day_starts = calendar.day_starts
+    ends = array("q", bytes(8 * len(datetimes)))
+    last = len(datetimes) - 1
+    index = last
+    while index >= 0:
+        day = bisect_right(day_starts, datetimes[index]) - 1
+        day_start = day_starts[day] if day >= 0 else float("-inf")
+        while index >= 0 and datetimes[index] >= day_start:
+            ends[index] = last
+            index -= 1
+        last = index
+    return ends
+
+
+def simulate_first_triggers_oco(series, entries, stop_loss, profit_target, instruction="BUY", quantity=1,
+                                order_type="MARKET", price=None, duration="DAY", asset_type="EQUITY",
+                                stop_first=True, one_position=True, calendar=None):
+    """
+    Replay the order built by `SchwabAPI.place_first_triggers_oco_order` over historical candles.
+
+    Every entry is a signal at the close of a bar. The primary order then fills at the next bar's
+    open (MARKET), or at the first later bar that trades through `price` (LIMIT). Once it fills,
+    the OCO pair is active: a STOP child at `stop_loss` and a LIMIT child at `profit_target`, both
+    with the inverse instruction from `get_inverse_instruction`. The first child to fill cancels
+    the other. Fills gap through the level at the open when a bar opens beyond it.
+
+    :param series: A CandleSeries or a get_price_history response.
+    :param entries: Bar positions of the entry signals, in increasing order.
+    :param stop_loss: The stop price, or a sequence with one stop price per entry.
+    :param profit_target: The target price, or a sequence with one target price per entry.
+    :param instruction: The primary instruction, e.g. 'BUY' or 'SELL_SHORT'.
+    :param quantity: The number of shares or contracts.
+    :param order_type: 'MARKET' or 'LIMIT' for the primary order.
+    :param price: The LIMIT price, or a sequence with one price per entry.
+    :param duration: 'DAY' cancels unfilled orders and the OCO pair at the end of the session;
+                     'GOOD_TILL_CANCEL' keeps them until the data ends.
+    :param asset_type: 'EQUITY' or 'OPTION', used to resolve the inverse instruction.
+    :param stop_first: Whether the STOP child wins when a bar reaches both levels. The candle does not
+                       say which came first, so the default is the conservative assumption.
+    :param one_position: Whether signals are ignored while a bracket is still open.
+    :param calendar: A MarketCalendar used to find session ends. Default is the shared calendar.
+    :return: A list of Trade tuples.
+    """
+    if order_type not in ("MARKET", "LIMIT"):
+        raise ValueError(f"Unsupported order type: {order_type}")
+    if order_type == "LIMIT" and price is None:
+        raise ValueError("Must provide a price for LIMIT orders")
+    if not isinstance(series, CandleSeries):
+        series = CandleSeries.from_price_history(series)
+
+    exit_instruction = get_inverse_instruction(instruction=instruction, asset_type=asset_type)
+    direction = 1.0 if _is_long(instruction) else -1.0
+    opens, highs, lows, closes, datetimes = series.opens, series.highs, series.lows, series.closes, series.datetimes
+    count = len(series)
+    day_orders = duration == "DAY"
+    session_ends = _session_ends(datetimes, calendar or get_default_calendar()) if day_orders else None
+
+    def per_entry(value, n):
+        return value[n] if isinstance(value, (list, tuple, array)) else value
+
+    trades = []
+    busy_until = -1
+    for n, signal in enumerate(entries):
+        if signal <= busy_until and one_position:
+            continue
+        entry_index = signal + 1
+        if entry_index >= count:
+            break
+        last_index = session_ends[signal] if day_orders else count - 1
+        stop = per_entry(stop_loss, n)
+        target = per_entry(profit_target, n)
+
+        # Primary order
+        if order_type == "MARKET":
+            if day_orders and entry_index > last_index:
+                continue  # Signal on the last bar of a session; the DAY order would open tomorrow
+            entry_price = opens[entry_index]
+            first_exit_bar = entry_index
+        else:
+            limit = per_entry(price, n)
+            while entry_index <= last_index:
+                if direction > 0 and lows[entry_index] <= limit:
+                    entry_price = min(opens[entry_index], limit)
+                    break
+                if direction < 0 and highs[entry_index] >= limit:
+                    entry_price = max(opens[entry_index], limit)
+                    break
+                entry_index += 1
+            else:
+                busy_until = last_index
+                continue  # Expired unfilled
+            # An intrabar LIMIT fill cannot tell which part of the bar came after it
+            first_exit_bar = entry_index + 1 if opens[entry_index] != entry_price else entry_index
+
+        # OCO children
+        exit_index, exit_price, exit_reason = last_index, closes[last_index], EXPIRED if day_orders else OPEN
+        for index in range(first_exit_bar, last_index + 1):
+            if direction > 0:
+                stop_hit = lows[index] <= stop
+                target_hit = highs[index] >= target
+            else:
+                stop_hit = highs[index] >= stop
+                target_hit = lows[index] <= target
+            if stop_hit and (stop_first or not target_hit):
+                gap = opens[index] if (opens[index] - stop) * direction < 0 else stop
+                exit_index, exit_price, exit_reason = index, gap, STOP
+                break
+            if target_hit:
+                gap = opens[index] if (opens[index] - target) * direction > 0 else target
+                exit_index, exit_price, exit_reason = index, gap, LIMIT
+                break
+        if exit_reason == EXPIRED and last_index == count - 1:
+            exit_reason = OPEN
+
+        trades.append(Trade(
+            signal, entry_index, datetimes[entry_index], entry_price, instruction,
+            exit_index, datetimes[exit_index], exit_price, exit_instruction, exit_reason,
+            quantity, (exit_price - entry_price) * direction * quantity,
+        ))
+        busy_until = exit_index
+    return trades
+
+
+def summarize(trades):
+    """
+    :param trades: A list of Trade tuples.
+    :return: A dictionary with trade count, wins, losses, win rate, total and average P&L,
+             profit factor and maximum drawdown of the cumulative P&L.
+    """
+    wins = [trade.pnl for trade in trades if trade.pnl > 0]
+    losses = [trade.pnl for trade in trades if trade.pnl < 0]
+    total = 0.0
+    peak = 0.0
+    max_drawdown = 0.0
+    for trade in trades:
+        total += trade.pnl
+        peak = max(peak, total)
+        max_drawdown = max(max_drawdown, peak - total)
+    return {
+        "trades": len(trades),
+        "wins": len(wins),
+        "losses": len(losses),
+        "win_rate": len(wins) / len(trades) if trades else 0.0,
+        "total_pnl": total,
+        "average_pnl": total / len(trades) if trades else 0.0,
+        "profit_factor": sum(wins) / -sum(losses) if losses else float("inf") if wins else 0.0,
+        "max_drawdown": max_drawdown,
+    }
+
+
+def sweep_brackets(series, entries, stop_distances, target_distances, instruction="BUY", **kwargs):
+    """
+    Run `simulate_first_triggers_oco` for every combination of stop and target distance.
+
+    Levels are placed relative to the close of each signal bar: below it for the stop and above it
+    for the target of a long entry, the other way around for a short one.
+
+    :param series: A CandleSeries or a get_price_history response.
+    :param entries: Bar positions of the entry signals.
+    :param stop_distances: Stop distances to try, in price units.
+    :param target_distances: Target distances to try, in price units.
+    :param instruction: The primary instruction, e.g. 'BUY' or 'SELL_SHORT'.
+    :param kwargs: Any other `simulate_first_triggers_oco` parameter.
+    :return: A list of dictionaries with stop_distance, target_distance and the summary keys,
+             sorted by total P&L, best first.
+    """
+    if not isinstance(series, CandleSeries):
+        series = CandleSeries.from_price_history(series)
+    direction = 1.0 if _is_long(instruction) else -1.0
+    references = [series.closes[signal] for signal in entries]
+
+    results = []
+    for stop_distance, target_distance in product(stop_distances, target_distances):
+        stops = [reference - direction * stop_distance for reference in references]
+        targets = [reference + direction * target_distance for reference in references]
+        trades = simulate_first_triggers_oco(series, entries, stops, targets, instruction=instruction, **kwargs)
+        results.append(dict(summarize(trades), stop_distance=stop_distance, target_distance=target_distance))
+    results.sort(key=lambda result: result["total_pnl"], reverse=True)
+    return results
@@ -0,0 +1,191 @@
+# py_schwab_wrapper/bar_aggregator.py
+# Builds OHLCV bars from a quote stream for many symbols at once.
+
+from array import array
+import logging
+
+from .streaming import LEVELONE_EQUITIES, CHART_EQUITY
+
+logger = logging.getLogger(__name__)
+
+_NO_BAR = -1
+
+
+def _zeros(typecode, size):
+    return array(typecode, bytes(array(typecode).itemsize * size))
+
+
+class BarAggregator:
+    """
+    Aggregates ticks (or smaller bars) into fixed-interval OHLCV bars.
+
+    Per-symbol state lives in preallocated, array-backed columns indexed by a slot number, so a
+    tick only updates numbers in place instead of allocating a dictionary. Closed bars are
+    written to `store` and passed to `on_bar` in the get_price_history candle schema.
+    """
+
+    def __init__(self, interval_ms=60000, capacity=1024, store=None, on_bar=None):
+        """
+        :param interval_ms: Bar length in milliseconds. Default is one minute.
+        :param capacity: Number of symbol slots allocated up front. Grows by doubling when exceeded.
+        :param store: Optional object with an `append(symbol, candle)` method, e.g. a CandleStore.
+        :param on_bar: Optional callable receiving `(symbol, candle)` for every closed bar.
+        """
+        if interval_ms <= 0:
+            raise ValueError("interval_ms must be positive")
+        self.interval_ms = int(interval_ms)
+        self.store = store
+        self.on_bar = on_bar
+        self.late_ticks = 0
+        self.symbols = []
+        self._slots = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._start = array("q", [_NO_BAR]) * capacity
+        self._last_closed = array("q", [_NO_BAR]) * capacity
+        self._open = _zeros("d", capacity)
+        self._high = _zeros("d", capacity)
+        self._low = _zeros("d", capacity)
+        self._close = _zeros("d", capacity)
+        self._volume = _zeros("d", capacity)
+        self._total_volume = _zeros("d", capacity)  # Last cumulative volume seen on a level-one quote
+
+    def _grow(self):
+        extra = self.capacity
+        self._start.extend(array("q", [_NO_BAR]) * extra)
+        self._last_closed.extend(array("q", [_NO_BAR]) * extra)
+        for column in (self._open, self._high, self._low, self._close, self._volume, self._total_volume):
+            column.extend(_zeros("d", extra))
+        self.capacity += extra
+
+    def _slot(self, symbol):
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            if slot >= self.capacity:
+                self._grow()
+            self._slots[symbol] = slot
+            self.symbols.append(symbol)
+        return slot
+
+    def update(self, symbol, price, volume, timestamp):
+        """
+        Add a trade to the current bar of a symbol, closing the previous bar if the trade starts a new one.
+
+        :param symbol: The ticker symbol.
+        :param price: The trade price.
+        :param volume: The traded volume (incremental, not cumulative).
+        :param timestamp: The trade time in milliseconds since the epoch.
+        """
+        self.add_bar(symbol, price, price, price, price, volume, timestamp)
+
+    def add_bar(self, symbol, open_, high, low, close, volume, timestamp):
+        """
+        Merge a smaller bar (e.g. a streamed one-minute chart bar) into the current bar of a symbol.
+
+        :param timestamp: The start of the smaller bar in milliseconds since the epoch.
+        """
+        slot = self._slot(symbol)
+        timestamp = int(timestamp)
+        bucket = timestamp - timestamp % self.interval_ms
+        start = self._start[slot]
+
+        if start != bucket:
+            if bucket <= self._last_closed[slot] or (start != _NO_BAR and bucket < start):
+                # Ticks for a bar that was already closed cannot be applied any more
+                self.late_ticks += 1
+                return
+            if start != _NO_BAR:
+                self._emit(slot)
+            self._start[slot] = bucket
+            self._open[slot] = open_
+            self._high[slot] = high
+            self._low[slot] = low
+            self._close[slot] = close
+            self._volume[slot] = volume
+            return
+
+        if high > self._high[slot]:
+            self._high[slot] = high
+        if low < self._low[slot]:
+            self._low[slot] = low
+        self._close[slot] = close
+        self._volume[slot] += volume
+
+    def on_stream_event(self, event):
+        """
+        Feed a `SchwabStreamer` event. Level-one quotes are treated as trades, with the volume taken
+        from the change in total volume; chart bars are merged as smaller bars.
+
+        :param event: A StreamEvent from `py_schwab_wrapper.streaming`.
+        """
+        fields = event.fields
+        if event.service == CHART_EQUITY:
+            self.add_bar(event.symbol, fields["open"], fields["high"], fields["low"], fields["close"],
+                         fields.get("volume", 0.0), fields["datetime"])
+        elif event.service == LEVELONE_EQUITIES:
+            price = fields.get("lastPrice")
+            if price is None:
+                return  # Quote-only update (bid/ask changed), no trade to aggregate
+            slot = self._slot(event.symbol)
+            volume = 0.0
+            total_volume = fields.get("totalVolume")
+            if total_volume is not None:
+                previous = self._total_volume[slot]
+                if previous and total_volume > previous:
+                    volume = total_volume - previous
+                self._total_volume[slot] = total_volume
+            timestamp = fields.get("tradeTime") or event.timestamp
+            self.update(event.symbol, price, volume, timestamp)
+
+    def flush(self, now):
+        """
+        Close every bar whose interval has ended, even for symbols that have not traded since.
+
+        :param now: The current time in milliseconds since the epoch.
+        :return: The number of bars closed.
+        """
+        closed = 0
+        cutoff = now - self.interval_ms
+        starts = self._start
+        for slot in range(len(self.symbols)):
+            start = starts[slot]
+            if start != _NO_BAR and start <= cutoff:
+                self._emit(slot)
+                starts[slot] = _NO_BAR
+                closed += 1
+        return closed
+
+    def current_bar(self, symbol):
+        """
+        :return: The open (not yet closed) bar of a symbol as a candle dictionary, or None.
+        """
+        slot = self._slots.get(symbol)
+        if slot is None or self._start[slot] == _NO_BAR:
+            return None
+        return self._candle(slot)
+
+    def _candle(self, slot):
+        volume = self._volume[slot]
+        return {
+            "open": self._open[slot],
+            "high": self._high[slot],
+            "low": self._low[slot],
+            "close": self._close[slot],
+            "volume": int(volume) if volume.is_integer() else volume,
+            "datetime": self._start[slot],
+        }
+
+    def _emit(self, slot):
+        symbol = self.symbols[slot]
+        candle = self._candle(slot)
+        self._last_closed[slot] = self._start[slot]
+        if self.store is not None:
+            self.store.append(symbol, candle)
+        if self.on_bar is not None:
+            try:
+                self.on_bar(symbol, candle)
+            except Exception as e:
+                logger.error(f"Bar callback failed for {symbol}: {e}")
@@ -0,0 +1,82 @@
+# py_schwab_wrapper/candle_store.py
+# Local candle storage using the same schema get_price_history returns.
+
+import json
+import os
+import threading
+
+from .candles import CandleSeries
+
+
+class CandleStore:
+    """
+    Stores candles per symbol, in memory and optionally as JSON lines files on disk.
+
+    Candles use the get_price_history schema (open, high, low, close, volume, datetime) and are
+    kept sorted by datetime in a CandleSeries, so reading a time range returns the same shape as
+    a REST call.
+    """
+
+    def __init__(self, directory=None):
+        """
+        :param directory: Optional directory where every symbol is persisted to `<symbol>.jsonl`.
+                          Existing files are loaded on first access.
+        """
+        self.directory = directory
+        self._candles = {}
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, symbol):
+        return os.path.join(self.directory, f"{symbol.replace('/', '_')}.jsonl")
+
+    def _series(self, symbol):
+        series = self._candles.get(symbol)
+        if series is None:
+            series = CandleSeries(symbol)
+            if self.directory is not None and os.path.exists(self._path(symbol)):
+                with open(self._path(symbol), "r") as f:
+                    # Later lines replace earlier candles with the same datetime
+                    series.extend(json.loads(line) for line in f if line.strip())
+            self._candles[symbol] = series
+        return series
+
+    def append(self, symbol, candle):
+        """
+        Add a closed candle. A candle with the same datetime as an existing one replaces it.
+
+        :param symbol: The ticker symbol.
+        :param candle: A dictionary with open, high, low, close, volume and datetime keys, or a Candle.
+        """
+        with self._lock:
+            self._series(symbol).append(candle)
+            if self.directory is not None:
+                with open(self._path(symbol), "a") as f:
+                    f.write(json.dumps(candle if isinstance(candle, dict) else candle.to_dict()) + "\n")
+
+    def symbols(self):
+        return sorted(self._candles)
+
+    def get_price_history(self, symbol, start_date=None, end_date=None):
+        """
+        Read stored candles in the same shape `SchwabAPI.get_price_history` returns.
+
+        :param symbol: The ticker symbol.
+        :param start_date: Optional start in milliseconds since the epoch (inclusive).
+        :param end_date: Optional end in milliseconds since the epoch (inclusive).
+        :return: A dictionary with candles, symbol and empty keys.
+        """
+        return self.get_series(symbol, start_date, end_date).to_price_history()
+
+    def get_series(self, symbol, start_date=None, end_date=None):
+        """
+        Read stored candles as a CandleSeries, without building a dictionary per candle.
+
+        :param symbol: The ticker symbol.
+        :param start_date: Optional start in milliseconds since the epoch (inclusive).
+        :param end_date: Optional end in milliseconds since the epoch (inclusive).
+        :return: A CandleSeries holding a copy of the selected range.
+        """
+        with self._lock:
+            return self._series(symbol).between(start_date, end_date)
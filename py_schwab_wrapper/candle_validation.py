@@ -0,0 +1,219 @@
+# py_schwab_wrapper/candle_validation.py
+# Integrity checks for price history and targeted backfill of the windows that fail them.
+
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+import logging
+
+from .candles import CandleSeries
+from .market_calendar import get_default_calendar
+from .utils.concurrency_utils import run_concurrently
+
+logger = logging.getLogger(__name__)
+
+# Issue kinds
+OUT_OF_ORDER = "OUT_OF_ORDER"
+DUPLICATE = "DUPLICATE"
+OFF_SESSION = "OFF_SESSION"
+MISALIGNED = "MISALIGNED"
+OHLC = "OHLC"
+GAP = "GAP"
+
+# Issues that make a candle unusable, so it is dropped before backfilling
+CORRUPT_KINDS = (OUT_OF_ORDER, DUPLICATE, OFF_SESSION, MISALIGNED, OHLC)
+
+CandleIssue = namedtuple("CandleIssue", ["kind", "index", "datetime", "start", "end", "detail"])
+CandleIssue.__doc__ = """
+A problem found in a candle list. `index` and `datetime` point at the offending candle (for a GAP,
+the candle after the gap) and `start`/`end` is the window, in milliseconds since the epoch, that
+has to be fetched again to repair it.
+"""
+
+_FREQUENCY_MS = {"minute": 60000}
+_DAY_MS = 86400000
+
+
+def frequency_to_ms(frequency_type, frequency):
+    """
+    :param frequency_type: The get_price_history frequency type, e.g. 'minute'.
+    :param frequency: The get_price_history frequency, e.g. 5.
+    :return: The bar length in milliseconds, or None for daily and longer bars.
+    """
+    unit = _FREQUENCY_MS.get(frequency_type)
+    return unit * frequency if unit is not None else None
+
+
+class ValidationReport:
+    """
+    The issues found by `validate_candles`, plus the merged windows that need a new request.
+    """
+
+    def __init__(self, issues, frequency_ms, count):
+        self.issues = issues
+        self.frequency_ms = frequency_ms
+        self.count = count
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def by_kind(self):
+        """
+        :return: A dictionary mapping issue kind to the number of issues of that kind.
+        """
+        counts = {}
+        for issue in self.issues:
+            counts[issue.kind] = counts.get(issue.kind, 0) + 1
+        return counts
+
+    def corrupt_indexes(self):
+        """
+        :return: The set of candle positions that should be dropped.
+        """
+        return {issue.index for issue in self.issues if issue.kind in CORRUPT_KINDS}
+
+    def windows(self):
+        """
+        :return: A sorted list of `(start, end)` windows to fetch again. Windows closer than one bar are merged.
+        """
+        step = self.frequency_ms or 0
+        merged = []
+        for start, end in sorted((issue.start, issue.end) for issue in self.issues):
+            if merged and start <= merged[-1][1] + step:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return [tuple(window) for window in merged]
+
+
+def _columns(candles):
+    if isinstance(candles, CandleSeries):
+        return candles.datetimes, candles.opens, candles.highs, candles.lows, candles.closes, candles.volumes
+    datetimes = array("q", (int(candle["datetime"]) for candle in candles))
+    return (datetimes,) + tuple(array("d", (candle.get(name, 0) for candle in candles))
+                                for name in ("open", "high", "low", "close", "volume"))
+
+
+def validate_candles(price_history, frequency_ms=60000, calendar=None, extended=True, min_gap_bars=1):
+    """
+    Check a candle list for out-of-order or duplicate timestamps, candles that are not on a
+    trading day or off the bar grid, inconsistent OHLC values and gaps inside a session.
+
+    The checks run column by column over typed arrays, so a full year of minute bars takes a
+    fraction of a second.
+
+    :param price_history: A get_price_history response, a list of candle dictionaries or a CandleSeries.
+    :param frequency_ms: The bar length in milliseconds. None (daily and longer bars) skips the
+                         session, alignment and gap checks.
+    :param calendar: A MarketCalendar. Default is the shared calendar.
+    :param extended: Whether the candles include pre- and post-market hours.
+    :param min_gap_bars: The smallest number of missing bars reported as a GAP. Schwab leaves out
+                         bars without trades, so thin symbols may need a higher value.
+    :return: A ValidationReport.
+    """
+    candles = price_history.get("candles", []) if isinstance(price_history, dict) else price_history
+    datetimes, opens, highs, lows, closes, volumes = _columns(candles)
+    count = len(datetimes)
+    calendar = calendar or get_default_calendar()
+    issues = []
+
+    def neighbours(index):
+        # The window between the closest valid neighbours of a corrupt candle
+        start = datetimes[index - 1] if index > 0 else datetimes[index]
+        end = datetimes[index + 1] if index + 1 < count else start
+        return min(start, end), max(start, end)
+
+    sessions = None
+    off_session = set()
+    if frequency_ms is not None:
+        sessions = []
+        day_starts = calendar.day_starts
+        for index, timestamp in enumerate(datetimes):
+            day = -1
+            if calendar.range_start <= timestamp < calendar.range_end:
+                day = bisect_right(day_starts, timestamp) - 1
+            # Schwab also returns overnight bars, so any time on a trading day is accepted
+            if day < 0 or timestamp - day_starts[day] >= _DAY_MS:
+                sessions.append(None)
+                off_session.add(index)
+                issues.append(CandleIssue(OFF_SESSION, index, timestamp, *neighbours(index),
+                                          "Timestamp is not on a trading day"))
+                continue
+            sessions.append(calendar.session_index(timestamp, extended))
+            if timestamp % frequency_ms:
+                issues.append(CandleIssue(MISALIGNED, index, timestamp, *neighbours(index),
+                                          f"Timestamp is not a multiple of {frequency_ms} ms"))
+
+    latest = datetimes[0] if count else 0
+    for index, (previous, current) in enumerate(zip(datetimes, datetimes[1:]), start=1):
+        if current < latest:
+            issues.append(CandleIssue(OUT_OF_ORDER, index, current, *neighbours(index),
+                                      f"Timestamp goes back {latest - current} ms"))
+            continue
+        if current == previous:
+            issues.append(CandleIssue(DUPLICATE, index, current, current, current, "Repeated timestamp"))
+        elif (frequency_ms is not None and current - previous > frequency_ms
+              and sessions[index] is not None and sessions[index] == sessions[index - 1]):
+            missing = (current - previous) // frequency_ms - 1
+            if missing >= min_gap_bars:
+                issues.append(CandleIssue(GAP, index, current, previous + frequency_ms, current - frequency_ms,
+                                          f"{missing} missing bars"))
+        if index not in off_session:
+            latest = current
+
+    for index, (o, h, l, c, v) in enumerate(zip(opens, highs, lows, closes, volumes)):
+        if not (0 < l <= h and l <= o <= h and l <= c <= h and v >= 0):
+            timestamp = datetimes[index]
+            issues.append(CandleIssue(OHLC, index, timestamp, timestamp, timestamp,
+                                      f"Inconsistent values open={o} high={h} low={l} close={c} volume={v}"))
+
+    issues.sort(key=lambda issue: issue.index)
+    return ValidationReport(issues, frequency_ms, count)
+
+
+def backfill_price_history(api, symbol, price_history, frequency_type="minute", frequency=1, extended=True,
+                           calendar=None, min_gap_bars=1, max_workers=4):
+    """
+    Validate a price history and re-request only the windows that failed validation.
+
+    Corrupt candles are dropped, every merged issue window is fetched again through
+    `get_price_history` and the fresh candles replace or fill in the stored ones.
+
+    :param api: A SchwabAPI instance.
+    :param symbol: The ticker symbol.
+    :param price_history: A get_price_history response or a list of candle dictionaries.
+    :param frequency_type: The frequency type the history was fetched with.
+    :param frequency: The frequency the history was fetched with.
+    :param extended: Whether the history includes pre- and post-market hours.
+    :param calendar: A MarketCalendar. Default is the shared calendar.
+    :param min_gap_bars: The smallest gap that is backfilled, see `validate_candles`.
+    :param max_workers: The maximum number of windows fetched at the same time.
+    :return: A tuple `(price_history, report)` with the repaired history and the report of the original one.
+    """
+    candles = price_history.get("candles", []) if isinstance(price_history, dict) else price_history
+    report = validate_candles(candles, frequency_to_ms(frequency_type, frequency), calendar, extended, min_gap_bars)
+    if report.ok:
+        return CandleSeries.from_price_history(candles, symbol).to_price_history(), report
+
+    corrupt = report.corrupt_indexes()
+    series = CandleSeries.from_price_history(
+        [candle for index, candle in enumerate(candles) if index not in corrupt], symbol
+    )
+    windows = report.windows()
+    logger.info(f"Backfilling {len(windows)} windows for {symbol}: {report.by_kind()}")
+
+    results = run_concurrently({
+        window: (lambda window=window: api.get_price_history(
+            symbol, frequency_type=frequency_type, frequency=frequency, start_date=window[0],
+            end_date=window[1], need_extended_hours_data=extended))
+        for window in windows
+    }, max_workers=max_workers)
+
+    for window in windows:
+        fresh = validate_candles(results[window].get("candles", []), report.frequency_ms, calendar, extended,
+                                 min_gap_bars=float("inf"))
+        dropped = fresh.corrupt_indexes()
+        series.extend(candle for index, candle in enumerate(results[window].get("candles", []))
+                      if index not in dropped and window[0] <= candle["datetime"] <= window[1])
+    return series.to_price_history(), report
@@ -0,0 +1,179 @@
+# py_schwab_wrapper/candles.py
+# Compact candle types backed by typed arrays instead of one dictionary per bar.
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Field order of the get_price_history candle schema
+CANDLE_FIELDS = ("open", "high", "low", "close", "volume", "datetime")
+
+
+def _volume(value):
+    return int(value) if value.is_integer() else value
+
+
+class Candle:
+    """
+    A single OHLCV bar. Uses `__slots__`, so it carries no per-instance dictionary.
+    """
+
+    __slots__ = CANDLE_FIELDS
+
+    def __init__(self, open_, high, low, close, volume, datetime):
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.datetime = datetime
+
+    @classmethod
+    def from_dict(cls, candle):
+        """
+        :param candle: A dictionary in the get_price_history candle schema.
+        :return: A Candle.
+        """
+        return cls(candle["open"], candle["high"], candle["low"], candle["close"], candle.get("volume", 0),
+                   candle["datetime"])
+
+    def to_dict(self):
+        """
+        :return: The candle as a dictionary in the get_price_history candle schema.
+        """
+        return {field: getattr(self, field) for field in CANDLE_FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, Candle):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in CANDLE_FIELDS)
+
+    def __repr__(self):
+        return "Candle(" + ", ".join(f"{field}={getattr(self, field)!r}" for field in CANDLE_FIELDS) + ")"
+
+
+class CandleSeries:
+    """
+    Candles of one symbol stored as six contiguous columns sorted by datetime.
+
+    Prices and volume are `array('d')` and datetimes `array('q')` (milliseconds since the epoch),
+    about 48 bytes per bar instead of a dictionary per bar. Time ranges are located with binary
+    search over the datetime column.
+    """
+
+    def __init__(self, symbol=None):
+        """
+        :param symbol: Optional ticker symbol the candles belong to.
+        """
+        self.symbol = symbol
+        self.datetimes = array("q")
+        self.opens = array("d")
+        self.highs = array("d")
+        self.lows = array("d")
+        self.closes = array("d")
+        self.volumes = array("d")
+
+    def _columns(self):
+        return self.opens, self.highs, self.lows, self.closes, self.volumes, self.datetimes
+
+    @classmethod
+    def from_price_history(cls, price_history, symbol=None):
+        """
+        Build a series from the JSON returned by `SchwabAPI.get_price_history`.
+
+        :param price_history: The response dictionary, or a plain list of candle dictionaries.
+        :param symbol: The ticker symbol. Default is the `symbol` key of the response.
+        :return: A CandleSeries.
+        """
+        if isinstance(price_history, dict):
+            symbol = symbol or price_history.get("symbol")
+            candles = price_history.get("candles", [])
+        else:
+            candles = price_history
+        series = cls(symbol)
+        series.extend(candles)
+        return series
+
+    def to_price_history(self):
+        """
+        :return: A dictionary with candles, symbol and empty keys, like `SchwabAPI.get_price_history`.
+        """
+        return {"candles": self.to_dicts(), "symbol": self.symbol, "empty": not len(self)}
+
+    def to_dicts(self):
+        """
+        :return: A list of candle dictionaries in the get_price_history schema.
+        """
+        return [
+            {"open": o, "high": h, "low": l, "close": c, "volume": _volume(v), "datetime": t}
+            for o, h, l, c, v, t in zip(*self._columns())
+        ]
+
+    def append(self, candle):
+        """
+        Add a candle, keeping the series sorted. A candle with the same datetime as an existing one replaces it.
+
+        :param candle: A Candle or a dictionary in the get_price_history candle schema.
+        """
+        if isinstance(candle, dict):
+            candle = Candle.from_dict(candle)
+        values = (candle.open, candle.high, candle.low, candle.close, candle.volume, int(candle.datetime))
+        datetimes = self.datetimes
+        if not datetimes or datetimes[-1] < values[5]:
+            for column, value in zip(self._columns(), values):
+                column.append(value)
+            return
+        position = bisect_left(datetimes, values[5])
+        if position < len(datetimes) and datetimes[position] == values[5]:
+            for column, value in zip(self._columns(), values):
+                column[position] = value
+        else:
+            for column, value in zip(self._columns(), values):
+                column.insert(position, value)
+
+    def extend(self, candles):
+        """
+        :param candles: An iterable of Candle objects or candle dictionaries.
+        """
+        for candle in candles:
+            self.append(candle)
+
+    def __len__(self):
+        return len(self.datetimes)
+
+    def __iter__(self):
+        for values in zip(*self._columns()):
+            yield Candle(*values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            series = CandleSeries(self.symbol)
+            for name in ("datetimes", "opens", "highs", "lows", "closes", "volumes"):
+                setattr(series, name, getattr(self, name)[index])
+            return series
+        return Candle(*(column[index] for column in self._columns()))
+
+    def index_range(self, start=None, end=None):
+        """
+        :param start: Optional start in milliseconds since the epoch (inclusive).
+        :param end: Optional end in milliseconds since the epoch (inclusive).
+        :return: A tuple `(first, last)` of positions such that `self[first:last]` covers the range.
+        """
+        first = bisect_left(self.datetimes, start) if start is not None else 0
+        last = bisect_right(self.datetimes, end) if end is not None else len(self)
+        return first, max(first, last)
+
+    def between(self, start=None, end=None):
+        """
+        :param start: Optional start in milliseconds since the epoch (inclusive).
+        :param end: Optional end in milliseconds since the epoch (inclusive).
+        :return: A new CandleSeries with the candles in the range.
+        """
+        first, last = self.index_range(start, end)
+        return self[first:last]
+
+    @property
+    def nbytes(self):
+        """
+        :return: The number of bytes held by the six columns.
+        """
+        return sum(column.itemsize * len(column) for column in self._columns())
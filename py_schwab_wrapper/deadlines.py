@@ -0,0 +1,75 @@
+# py_schwab_wrapper/deadlines.py
+# Per-endpoint timeouts and caller-supplied deadlines that bound a call through retries and token refresh.
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# (connect, read) timeouts in seconds by endpoint family, see metrics.endpoint_family. The connect
+# timeout sits just above a multiple of 3 seconds, the TCP retransmission window.
+DEFAULT_TIMEOUTS = {
+    "default": (3.05, 10.0),
+    "oauth/token": (3.05, 10.0),
+    "marketdata/quotes": (3.05, 5.0),
+    "marketdata/pricehistory": (3.05, 30.0),
+    "marketdata/chains": (3.05, 30.0),
+    "trader/accounts/orders": (3.05, 15.0),
+}
+
+_deadline = ContextVar("schwab_deadline", default=None)  # Absolute time.monotonic() value
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a call cannot finish within the deadline set by `deadline()`.
+
+    `sent` is True when the last request may have reached Schwab before the budget ran out, which
+    matters for orders: the order may have been placed.
+    """
+
+    def __init__(self, message, sent=False):
+        super().__init__(message)
+        self.sent = sent
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Bound every SchwabAPI call made inside the block, on this thread or through `run_concurrently`,
+    to finish within `seconds`: connect and read timeouts are shortened to the time left, retries
+    stop when the next attempt cannot start in time, and token refreshes share the same budget.
+
+    Nested deadlines can only shorten the budget.
+
+    :param seconds: The budget in seconds.
+    """
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires_at if current is None else min(current, expires_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """
+    :return: Seconds left before the current deadline (negative once it has passed), or None without a deadline.
+    """
+    expires_at = _deadline.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def bound_timeout(timeout, left):
+    """
+    Shorten a `(connect, read)` timeout to the time left. The read timeout bounds each wait for
+    data rather than the whole download, so a response that keeps trickling in can overrun slightly.
+
+    :param timeout: A `(connect, read)` tuple.
+    :param left: Seconds left, or None without a deadline.
+    :return: The timeout to pass to requests.
+    """
+    if left is None:
+        return timeout
+    connect, read = timeout
+    return min(connect, left), min(read, left)
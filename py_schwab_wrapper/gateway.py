@@ -0,0 +1,537 @@
+# py_schwab_wrapper/gateway.py
+# A local gateway process that owns the token, quota, connection pool and cache for many thin clients.
+# POSIX only: clients connect over an AF_UNIX socket.
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, HTTPError, ReadTimeout, RequestException, Timeout
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .deadlines import DeadlineExceeded, deadline, remaining
+from .hooks import ON_ERROR
+from .metrics import CACHE_LOOKUPS, RATE_LIMIT_WAIT, endpoint_family
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "schwab-gateway.sock")
+
+# Only the data APIs are forwarded; the oauth routes stay private to the gateway
+FORWARDED_PREFIXES = ("/marketdata/", "/trader/")
+METRICS_PATH = "/gateway/metrics"
+
+# Seconds a successful GET is served from the gateway's cache, by endpoint family. Account and
+# order state is never cached.
+DEFAULT_CACHE_TTLS = {
+    "marketdata/quotes": 1.0,
+    "marketdata/chains": 5.0,
+    "marketdata/pricehistory": 15.0,
+}
+
+# Response headers passed back to clients
+RELAYED_HEADERS = ("Content-Type", "Location", "Retry-After")
+
+CACHE_HEADER = "X-Gateway-Cache"        # hit, coalesced or miss
+ERROR_HEADER = "X-Gateway-Error"        # Set when the upstream call failed without a response
+DEADLINE_HEADER = "X-Gateway-Deadline"  # Seconds left before the client's deadline
+
+# Upstream failures without a response, and the exceptions thin clients raise for them
+CONNECT_TIMEOUT = "connect_timeout"
+READ_TIMEOUT = "read_timeout"
+CONNECTION = "connection"
+_ERRORS = {CONNECT_TIMEOUT: ConnectTimeout, READ_TIMEOUT: ReadTimeout, CONNECTION: ConnectionError}
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket. Callers that find it empty reserve the next free slot and sleep
+    until then, so queued requests are spaced evenly instead of retrying in a burst.
+    """
+
+    def __init__(self, requests_per_minute=120, burst=None):
+        """
+        :param requests_per_minute: The sustained rate. Schwab allows 120 per minute.
+        :param burst: Requests allowed back to back after an idle period. Default is a tenth of a
+                      minute's budget.
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst or max(1, requests_per_minute // 10)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """
+        Take one request from the budget, waiting if needed.
+
+        :param timeout: The longest acceptable wait in seconds, or None to wait as long as it takes.
+        :return: The seconds waited, or None if the wait would have exceeded `timeout`. Nothing is taken then.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if timeout is not None and wait > timeout:
+                return None
+            self._tokens -= 1  # Negative while requests are queued
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class _Call:
+    # One upstream GET shared by every client that asked for it while it was in flight
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+class SchwabGateway:
+    """
+    Serves the Schwab API to local processes over a Unix domain socket.
+
+    The gateway owns a single SchwabAPI, so however many strategy processes connect there is one
+    token refresh, one connection pool and one request budget. GETs are served from a short-lived
+    cache where the endpoint family allows it, identical GETs in flight at the same time are sent
+    upstream once, and every upstream call waits for the rate limiter. Each client request makes at
+    most one upstream call: thin clients retry GETs through the gateway, so every retry is paced
+    too. Orders and other writes are never retried.
+
+    Clients speak plain HTTP/1.1 on the socket; `SchwabAPI(gateway=path)` does that for you. The
+    socket is created with mode 0600, so only the user running the gateway can place orders
+    through it. Prometheus metrics are served at `/gateway/metrics`.
+    """
+
+    def __init__(self, api, socket_path=DEFAULT_SOCKET, requests_per_minute=120, burst=None, cache_ttls=None,
+                 max_cache_entries=4096, max_wait=30.0):
+        """
+        :param api: The SchwabAPI that sends upstream. Its metrics and hooks see all gateway traffic.
+        :param socket_path: Where to listen. A stale socket file from a previous run is replaced.
+        :param requests_per_minute: The upstream request budget shared by all clients.
+        :param burst: See RateLimiter.
+        :param cache_ttls: Seconds to cache successful GETs, by endpoint family, merged over DEFAULT_CACHE_TTLS.
+                           Use 0 to disable caching for a family.
+        :param max_cache_entries: The most responses kept. Expired entries are dropped first, then the oldest.
+        :param max_wait: The longest a request waits for the rate limiter before being answered with 429.
+        """
+        self.api = api
+        self.socket_path = socket_path
+        self.limiter = RateLimiter(requests_per_minute, burst)
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS, **(cache_ttls or {}))
+        self.max_cache_entries = max_cache_entries
+        self.max_wait = max_wait
+        self._cache = {}     # (path, query) -> (expires_at, response)
+        self._inflight = {}  # (path, query) -> _Call
+        self._lock = threading.Lock()
+        self._connections = set()  # Open client sockets, closed on stop
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        Listen on the socket and serve from a background thread.
+        """
+        self._prepare_socket()
+        server = _UnixHTTPServer(self.socket_path, self._handler_class(), bind_and_activate=False)
+        try:
+            server.server_bind()
+            os.chmod(self.socket_path, 0o600)
+            server.server_activate()
+        except OSError:
+            server.server_close()
+            raise
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="schwab-gateway", daemon=True)
+        self._thread.start()
+        logger.info(f"Gateway listening on {self.socket_path}")
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)  # Kept-alive clients reconnect to the next gateway
+            except OSError:
+                pass
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _prepare_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)  # Left behind by a gateway that did not shut down cleanly
+        else:
+            raise OSError(f"A gateway is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def handle(self, method, target, body=b"", headers=None):
+        """
+        Serve one client request.
+
+        :param method: The HTTP method.
+        :param target: The request path and query string, e.g. '/marketdata/v1/quotes?symbols=QQQ'.
+        :param body: The request body.
+        :param headers: Request headers. Content-Type is forwarded, and X-Gateway-Deadline bounds the call.
+        :return: A tuple `(status, headers, body_bytes)`.
+        """
+        headers = headers or {}
+        method = method.upper()
+        parts = urlsplit(target)
+        path = parts.path
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+        if method == "GET" and path == METRICS_PATH:
+            return 200, {"Content-Type": "text/plain; version=0.0.4"}, self.api.metrics.to_prometheus().encode("utf-8")
+        if not path.startswith(FORWARDED_PREFIXES):
+            return _error(404, "Not Found")
+
+        budget = headers.get(DEADLINE_HEADER)
+        try:
+            budget = float(budget) if budget else None
+        except ValueError:
+            return _error(400, f"Invalid {DEADLINE_HEADER} header: {budget!r}")
+        with deadline(budget) if budget is not None else nullcontext():
+            if method != "GET":
+                return self._forward(method, path, query, body, headers.get("Content-Type"))
+            return self._get(path, query)
+
+    def _get(self, path, query):
+        key = (path, query)
+        cached = self._cached(key)
+        if cached is not None:
+            return self._served(cached, "hit", path)
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+        if not leader:
+            if not call.done.wait(remaining()):
+                return _error(504, "Deadline exceeded waiting for a coalesced request",
+                              {ERROR_HEADER: READ_TIMEOUT})
+            return self._served(call.result, "coalesced", path)
+
+        call.result = _error(502, "Gateway error")
+        try:
+            call.result = self._forward("GET", path, query)
+            ttl = self.cache_ttls.get(endpoint_family(path), 0)
+            if ttl > 0 and call.result[0] == 200:
+                self._store(key, call.result, ttl)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+        return self._served(call.result, "miss", path)
+
+    def _served(self, result, how, path):
+        self.api.metrics.inc(CACHE_LOOKUPS, cache="gateway", result=how)
+        status, headers, body = result
+        return status, dict(headers, **{CACHE_HEADER: how}), body
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def _store(self, key, result, ttl):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._cache) >= self.max_cache_entries:
+                for stale in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                    del self._cache[stale]
+                while len(self._cache) >= self.max_cache_entries:
+                    del self._cache[next(iter(self._cache))]
+            self._cache.pop(key, None)  # Reinsert so iteration order stays oldest first
+            self._cache[key] = (now + ttl, result)
+
+    def _forward(self, method, path, query, body=b"", content_type=None):
+        # Send one request upstream through the owned client
+        api = self.api
+        url = f"{api.base_url}{path}" + (f"?{query}" if query else "")
+        family = endpoint_family(url)
+        left = remaining()
+        waited = self.limiter.acquire(self.max_wait if left is None else max(0.0, min(self.max_wait, left)))
+        if waited is None:
+            return _error(429, "Gateway request budget exhausted", {"Retry-After": "1"})
+        api.metrics.observe(RATE_LIMIT_WAIT, waited, family=family)
+
+        try:
+            api.ensure_valid_token()
+            if method == "GET":
+                # One attempt per limiter slot; the thin client retries through the gateway
+                response = api.get_with_retry(url, retries=1)
+            else:
+                # Writes are never retried: a timed out order may still have been placed
+                trace = api.hooks.trace(method, url)
+                try:
+                    response = api._send(trace, data=body or None,
+                                         headers={"Content-Type": content_type} if content_type else None)
+                except RequestException as e:
+                    trace.error = e
+                    api.hooks.emit(ON_ERROR, trace)
+                    raise
+        except HTTPError as e:
+            response = e.response
+        except DeadlineExceeded as e:
+            return _error(504, str(e), {ERROR_HEADER: READ_TIMEOUT if e.sent else CONNECT_TIMEOUT})
+        except ConnectTimeout as e:
+            return _error(504, str(e), {ERROR_HEADER: CONNECT_TIMEOUT})
+        except Timeout as e:
+            return _error(504, str(e), {ERROR_HEADER: READ_TIMEOUT})
+        except RequestException as e:
+            return _error(502, str(e), {ERROR_HEADER: CONNECTION})
+
+        headers = {name: response.headers[name] for name in RELAYED_HEADERS if name in response.headers}
+        return response.status_code, headers, response.content
+
+    def _handler_class(self):
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with gateway._lock:
+                    gateway._connections.add(self.connection)
+
+            def finish(self):
+                with gateway._lock:
+                    gateway._connections.discard(self.connection)
+                super().finish()
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                try:
+                    status, headers, payload = gateway.handle(self.command, self.path, body, self.headers)
+                except Exception as e:
+                    logger.exception(f"Gateway failed to serve {self.command} {self.path}")
+                    status, headers, payload = _error(500, str(e))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def address_string(self):
+                return gateway.socket_path  # Unix socket peers have no address
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+def _error(status, title, headers=None):
+    body = json.dumps({"errors": [{"status": status, "title": title}]}).encode("utf-8")
+    return status, dict(headers or {}, **{"Content-Type": "application/json"}), body
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class GatewayAdapter(BaseAdapter):
+    """
+    A requests transport adapter that sends through a SchwabGateway's Unix socket instead of the network.
+
+    Each thread keeps one connection open. When the gateway's upstream call failed without a
+    response, the same requests exception is raised here (ConnectTimeout, ReadTimeout or
+    ConnectionError), so callers such as OrderJournal can still tell an order that was never sent
+    from one whose outcome is unknown. The time left before the current `deadline()` is passed to
+    the gateway.
+
+    Mount it with `SchwabAPI(gateway=socket_path)`.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        """
+        :param socket_path: The gateway's socket.
+        """
+        super().__init__()
+        self.socket_path = socket_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        parts = urlsplit(request.url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = {name: value for name, value in request.headers.items() if name.lower() != "authorization"}
+        left = remaining()
+        if left is not None:
+            headers[DEADLINE_HEADER] = f"{max(left, 0.0):.3f}"
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+
+        for attempt in range(2):
+            connection, reused = self._connection(connect_timeout)
+            phase = "connect"
+            try:
+                if connection.sock is None:
+                    connection.connect()
+                phase = "send"
+                connection.request(request.method, target, body=body, headers=headers)
+                connection.sock.settimeout(read_timeout)
+                response = connection.getresponse()
+                content = response.read()
+                break
+            except socket.timeout as e:
+                self._discard()
+                raise (ConnectTimeout if phase == "connect" else ReadTimeout)(e, request=request)
+            except (ConnectionRefusedError, FileNotFoundError) as e:
+                self._discard()
+                raise ConnectionError(f"No gateway listening on {self.socket_path}: {e}", request=request)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self._discard()
+                if reused and request.method == "GET" and attempt == 0:
+                    continue  # The gateway closed an idle connection; a GET is safe to send again
+                raise ConnectionError(e, request=request)
+            except (OSError, http.client.HTTPException) as e:
+                self._discard()
+                raise ConnectionError(e, request=request)
+
+        if response.will_close:
+            self._discard()
+        error = response.getheader(ERROR_HEADER)
+        if error in _ERRORS:
+            raise _ERRORS[error](f"Gateway upstream error: {content.decode('utf-8', 'replace')}", request=request)
+        return self._build_response(request, response, content)
+
+    def _connection(self, connect_timeout):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and connection.sock is not None and select.select([connection.sock], [], [], 0)[0]:
+            self._discard()  # An idle connection is only readable once the gateway has closed it
+            connection = None
+        if connection is not None:
+            return connection, True
+        connection = _UnixConnection(self.socket_path, connect_timeout)
+        self._local.connection = connection
+        with self._lock:
+            self._connections.append(connection)
+        return connection, False
+
+    def _discard(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            return
+        self._local.connection = None
+        connection.close()
+        with self._lock:
+            self._connections.remove(connection)
+
+    def _build_response(self, request, response, content):
+        built = Response()
+        built.status_code = response.status
+        built.headers = CaseInsensitiveDict(response.getheaders())
+        built.encoding = get_encoding_from_headers(built.headers)
+        built._content = content
+        built.reason = response.reason
+        built.url = request.url
+        built.request = request
+        built.connection = self
+        return built
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+
+def main(argv=None):
+    """
+    Run a gateway until SIGINT or SIGTERM, with credentials from SCHWAB_CLIENT_ID and
+    SCHWAB_CLIENT_SECRET and the token from token.json in the working directory.
+    """
+    from .schwab_api import SchwabAPI
+
+    parser = argparse.ArgumentParser(prog="python -m py_schwab_wrapper.gateway", description="Serve the Schwab API to local processes over a Unix socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket to listen on")
+    parser.add_argument("--requests-per-minute", type=int, default=120, help="Upstream request budget")
+    parser.add_argument("--max-wait", type=float, default=30.0,
+                        help="Seconds a request may wait for the budget before getting a 429")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    client_id = os.getenv("SCHWAB_CLIENT_ID")
+    client_secret = os.getenv("SCHWAB_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        parser.error("SCHWAB_CLIENT_ID and SCHWAB_CLIENT_SECRET must be set")
+
+    api = SchwabAPI(client_id, client_secret)
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+    with SchwabGateway(api, args.socket, requests_per_minute=args.requests_per_minute, max_wait=args.max_wait):
+        stopping.wait()
+    logger.info("Gateway stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# py_schwab_wrapper/hooks.py
+# Request lifecycle hooks with nanosecond timestamps for every phase of an HTTP call.
+
+import itertools
+import logging
+import time
+
+from .metrics import endpoint_family
+
+logger = logging.getLogger(__name__)
+
+BEFORE_SEND = "before_send"
+AFTER_HEADERS = "after_headers"
+AFTER_BODY = "after_body"
+AFTER_DECODE = "after_decode"
+ON_RETRY = "on_retry"
+ON_ERROR = "on_error"
+
+PHASES = (BEFORE_SEND, AFTER_HEADERS, AFTER_BODY, AFTER_DECODE, ON_RETRY, ON_ERROR)
+
+
+class RequestTrace:
+    """
+    One HTTP attempt as seen by the hooks.
+
+    Retries of the same call share a `request_id` and increase `attempt`. `timestamps` maps every
+    phase the attempt reached to a `time.perf_counter_ns()` value.
+    """
+
+    __slots__ = ("request_id", "method", "url", "family", "params", "attempt",
+                 "status", "response_bytes", "error", "timestamps")
+
+    def __init__(self, request_id, method, url, params=None, attempt=0):
+        self.request_id = request_id
+        self.method = method
+        self.url = url
+        self.family = endpoint_family(url)
+        self.params = params
+        self.attempt = attempt
+        self.status = None
+        self.response_bytes = None
+        self.error = None
+        self.timestamps = {}
+
+    def duration(self, start, end):
+        """
+        :return: Nanoseconds between two phases, or None if either was not reached.
+        """
+        if start in self.timestamps and end in self.timestamps:
+            return self.timestamps[end] - self.timestamps[start]
+        return None
+
+    def breakdown(self):
+        """
+        Split the attempt into the time spent waiting for headers (connection setup plus server time),
+        downloading the body and decoding it.
+
+        :return: A dictionary with `wait`, `download` and `decode` in seconds, for the phases reached.
+        """
+        spans = (("wait", BEFORE_SEND, AFTER_HEADERS), ("download", AFTER_HEADERS, AFTER_BODY),
+                 ("decode", AFTER_BODY, AFTER_DECODE))
+        result = {}
+        for name, start, end in spans:
+            elapsed = self.duration(start, end)
+            if elapsed is not None:
+                result[name] = elapsed / 1e9
+        return result
+
+    def __repr__(self):
+        return (f"RequestTrace(request_id={self.request_id}, method={self.method!r}, family={self.family!r}, "
+                f"attempt={self.attempt}, status={self.status})")
+
+
+class RequestHooks:
+    """
+    Callbacks fired at each phase of every request a SchwabAPI client sends.
+
+    Every callback receives the RequestTrace of the attempt, already stamped with the phase time.
+    Callbacks run on the calling thread, in registration order; an exception raised by a callback is
+    logged and never interrupts the request.
+    """
+
+    def __init__(self):
+        self._callbacks = {phase: () for phase in PHASES}
+        self._ids = itertools.count(1)
+
+    def add(self, phase, callback):
+        """
+        :param phase: One of PHASES, e.g. AFTER_BODY.
+        :param callback: Callable receiving a RequestTrace.
+        :return: The callback, so it can be removed later.
+        """
+        if phase not in self._callbacks:
+            raise ValueError(f"Unknown phase: {phase}")
+        self._callbacks[phase] = self._callbacks[phase] + (callback,)  # Emitting threads iterate a stable tuple
+        return callback
+
+    def remove(self, phase, callback):
+        self._callbacks[phase] = tuple(registered for registered in self._callbacks[phase] if registered is not callback)
+
+    def add_listener(self, listener):
+        """
+        Register every method of `listener` named after a phase, e.g. an object with `after_body(trace)`.
+        """
+        for phase in PHASES:
+            callback = getattr(listener, phase, None)
+            if callable(callback):
+                self.add(phase, callback)
+
+    def remove_listener(self, listener):
+        for phase in PHASES:
+            callback = getattr(listener, phase, None)
+            if callable(callback):
+                self._callbacks[phase] = tuple(registered for registered in self._callbacks[phase]
+                                               if registered != callback)
+
+    def trace(self, method, url, params=None, attempt=0, request_id=None):
+        """
+        :param request_id: The id of the call being retried, or None to start a new call.
+        :return: A new RequestTrace.
+        """
+        return RequestTrace(request_id or next(self._ids), method, url, params, attempt)
+
+    def emit(self, phase, trace):
+        trace.timestamps[phase] = time.perf_counter_ns()
+        for callback in self._callbacks[phase]:
+            try:
+                callback(trace)
+            except Exception as e:
+                logger.error(f"Request hook failed in {phase} for {trace.method} {trace.family}: {e}")
@@ -0,0 +1,133 @@
+# py_schwab_wrapper/http2.py
+# Optional HTTP/2 transport: a requests adapter that sends through a multiplexing httpx client.
+
+import logging
+
+from requests.adapters import BaseAdapter
+from requests.exceptions import (ChunkedEncodingError, ConnectionError, ConnectTimeout, ContentDecodingError,
+                                 InvalidSchema, ReadTimeout)
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+
+def _import_httpx():
+    try:
+        import httpx
+        import h2  # noqa: F401  httpx needs it to speak HTTP/2
+    except ImportError:
+        raise ImportError("The HTTP/2 transport requires the 'httpx[http2]' package: pip install py_schwab_wrapper[http2]")
+    return httpx
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    A requests transport adapter that sends through one shared `httpx.Client` with HTTP/2 enabled.
+
+    Concurrent requests to the same host are multiplexed as streams over a few connections instead
+    of needing a pooled connection each, and response compression (gzip and deflate, plus brotli
+    or zstd when installed) is negotiated. Responses and exceptions are converted to their requests
+    equivalents, so SchwabAPI's retries, token refresh, hooks and metrics behave exactly as with the
+    default transport. Servers that do not offer HTTP/2, including plain `http://` ones, are spoken
+    to over HTTP/1.1.
+
+    Mount it with `SchwabAPI(..., http2=True)`, or `adapters={'https://': HTTP2Adapter()}`.
+    """
+
+    def __init__(self, max_connections=4, keepalive_expiry=30.0, verify=True, http1=True, client=None):
+        """
+        :param max_connections: The most connections open at once. Each HTTP/2 connection carries many
+                                concurrent requests.
+        :param keepalive_expiry: Seconds an idle connection stays open.
+        :param verify: TLS verification, as for httpx: True, False, a CA bundle path or an SSLContext.
+        :param http1: Whether HTTP/1.1 may be used for servers without HTTP/2. With False, plain
+                      `http://` URLs use HTTP/2 with prior knowledge.
+        :param client: Optional `httpx.Client` to send through instead of building one. It is not
+                       closed with the adapter.
+        """
+        super().__init__()
+        self._httpx = _import_httpx()
+        self._owns_client = client is None
+        self.client = client or self._httpx.Client(
+            http1=http1,
+            http2=True,
+            verify=verify,
+            limits=self._httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                      keepalive_expiry=keepalive_expiry),
+        )
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """
+        Send a prepared request. TLS verification, client certificates and proxies are settings of
+        the httpx client; the per-request `verify`, `cert` and `proxies` arguments are ignored.
+        """
+        httpx = self._httpx
+        outgoing = self.client.build_request(request.method, request.url, headers=request.headers, content=request.body,
+                                             timeout=self._timeout(timeout))
+        try:
+            response = self.client.send(outgoing, stream=True)
+        except httpx.ConnectTimeout as e:
+            raise ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise ReadTimeout(e, request=request)
+        except httpx.UnsupportedProtocol as e:
+            raise InvalidSchema(e, request=request)
+        except httpx.TransportError as e:
+            raise ConnectionError(e, request=request)
+        return self._build_response(request, response)
+
+    def _timeout(self, timeout):
+        # requests passes a number of seconds, a (connect, read) tuple or None
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return self._httpx.Timeout(timeout)
+
+    def _build_response(self, request, response):
+        built = Response()
+        built.status_code = response.status_code
+        built.headers = CaseInsensitiveDict(response.headers.items())
+        built.encoding = get_encoding_from_headers(built.headers)
+        built.raw = _StreamedBody(response, self._httpx)
+        built.reason = response.reason_phrase
+        built.url = request.url
+        built.request = request
+        built.connection = self
+        built.http_version = response.http_version  # e.g. 'HTTP/2', for checking what was negotiated
+        return built
+
+    def close(self):
+        if self._owns_client:
+            self.client.close()
+
+
+class _StreamedBody:
+    """
+    The part of urllib3's response interface that `requests.Response` reads bodies through.
+    Read errors are converted the way requests converts urllib3's.
+    """
+
+    def __init__(self, response, httpx):
+        self._response = response
+        self._httpx = httpx
+
+    def stream(self, chunk_size=None, decode_content=True):
+        httpx = self._httpx
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except httpx.DecodingError as e:
+            raise ContentDecodingError(e)
+        except httpx.TimeoutException as e:
+            raise ConnectionError(e)
+        except httpx.TransportError as e:
+            raise ChunkedEncodingError(e)
+        finally:
+            self._response.close()
+
+    def close(self):
+        self._response.close()
+
+    def release_conn(self):
+        self._response.close()
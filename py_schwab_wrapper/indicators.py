@@ -0,0 +1,297 @@
+# py_schwab_wrapper/indicators.py
+# Incremental technical indicators over candles from get_price_history or a live bar source.
+
+from array import array
+from bisect import bisect_right
+
+from .candles import Candle, CandleSeries
+from .market_calendar import get_default_calendar
+
+NAN = float("nan")
+
+# Candle fields an EMA can average, in `_step` argument order
+_FIELDS = ("high", "low", "close", "volume")
+
+
+class Indicator:
+    """
+    Base class for indicators that keep O(1) state per bar.
+
+    Subclasses implement `_step(high, low, close, volume, datetime)`, which consumes one bar and
+    returns the indicator value (NaN until enough bars have been seen). `update` feeds a single
+    candle and `batch` feeds a whole series column by column, so both paths produce the same values.
+    """
+
+    def _step(self, high, low, close, volume, datetime):
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def update(self, candle):
+        """
+        :param candle: A Candle or a dictionary in the get_price_history candle schema.
+        :return: The indicator value after the candle.
+        """
+        if isinstance(candle, dict):
+            candle = Candle.from_dict(candle)
+        self.value = self._step(candle.high, candle.low, candle.close, candle.volume, candle.datetime)
+        return self.value
+
+    def batch(self, series):
+        """
+        Feed every candle of a series and return the indicator value after each one.
+
+        :param series: A CandleSeries, or a get_price_history response.
+        :return: An `array('d')` aligned with the series.
+        """
+        if not isinstance(series, CandleSeries):
+            series = CandleSeries.from_price_history(series)
+        step = self._step
+        values = array("d", [NAN]) * len(series)
+        for index, bar in enumerate(zip(series.highs, series.lows, series.closes, series.volumes, series.datetimes)):
+            values[index] = step(*bar)
+        if values:
+            self.value = values[-1]
+        return values
+
+
+class EMA(Indicator):
+    """
+    Exponential moving average, seeded with the simple average of the first `period` values.
+    """
+
+    def __init__(self, period, field="close"):
+        """
+        :param period: The number of bars.
+        :param field: The candle field to average: 'high', 'low', 'close' or 'volume'.
+        """
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        if field not in _FIELDS:
+            raise ValueError(f"Unsupported field: {field}")
+        self.period = period
+        self.field = field
+        self._field_index = _FIELDS.index(field)
+        self.alpha = 2.0 / (period + 1)
+        self.reset()
+
+    def reset(self):
+        self.value = NAN
+        self._ema = NAN
+        self._count = 0
+        self._sum = 0.0
+
+    def _step(self, high, low, close, volume, datetime):
+        price = (high, low, close, volume)[self._field_index]
+        if self._count < self.period:
+            self._count += 1
+            self._sum += price
+            if self._count < self.period:
+                return NAN
+            self._ema = self._sum / self.period
+        else:
+            self._ema += self.alpha * (price - self._ema)
+        return self._ema
+
+
+class VWAP(Indicator):
+    """
+    Volume-weighted average of the typical price (high + low + close) / 3, reset at the start of every trading day.
+    """
+
+    def __init__(self, calendar=None):
+        """
+        :param calendar: A MarketCalendar used to find trading day boundaries. Default is the shared calendar.
+        """
+        self.calendar = calendar or get_default_calendar()
+        self.reset()
+
+    def reset(self):
+        self.value = NAN
+        self._price_volume = 0.0
+        self._volume = 0.0
+        self._next_reset = None
+
+    def _step(self, high, low, close, volume, datetime):
+        if self._next_reset is None or datetime >= self._next_reset:
+            # Only search the calendar when a bar crosses into the next day
+            day_starts = self.calendar.day_starts
+            index = bisect_right(day_starts, datetime)
+            self._next_reset = day_starts[index] if index < len(day_starts) else float("inf")
+            self._price_volume = 0.0
+            self._volume = 0.0
+        self._price_volume += (high + low + close) / 3.0 * volume
+        self._volume += volume
+        return self._price_volume / self._volume if self._volume else NAN
+
+
+class ATR(Indicator):
+    """
+    Average true range with Wilder's smoothing.
+    """
+
+    def __init__(self, period=14):
+        """
+        :param period: The number of bars.
+        """
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.value = NAN
+        self._atr = NAN
+        self._previous_close = None
+        self._count = 0
+        self._sum = 0.0
+
+    def _step(self, high, low, close, volume, datetime):
+        previous = self._previous_close
+        true_range = high - low if previous is None else max(high, previous) - min(low, previous)
+        self._previous_close = close
+        if self._count < self.period:
+            self._count += 1
+            self._sum += true_range
+            if self._count < self.period:
+                return NAN
+            self._atr = self._sum / self.period
+        else:
+            self._atr = (self._atr * (self.period - 1) + true_range) / self.period
+        return self._atr
+
+
+class RSI(Indicator):
+    """
+    Relative strength index with Wilder's smoothing.
+    """
+
+    def __init__(self, period=14):
+        """
+        :param period: The number of price changes.
+        """
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.value = NAN
+        self._previous_close = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def _step(self, high, low, close, volume, datetime):
+        previous = self._previous_close
+        self._previous_close = close
+        if previous is None:
+            return NAN
+        change = close - previous
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self._count < self.period:
+            self._count += 1
+            self._gain += gain / self.period
+            self._loss += loss / self.period
+            if self._count < self.period:
+                return NAN
+        else:
+            self._gain = (self._gain * (self.period - 1) + gain) / self.period
+            self._loss = (self._loss * (self.period - 1) + loss) / self.period
+        if not self._loss:
+            return 100.0 if self._gain else 50.0
+        return 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+
+
+class IndicatorEngine:
+    """
+    Keeps a set of indicators per symbol up to date as candles arrive.
+
+    Candles at or before the last one applied to a symbol are skipped, so the engine can be fed the
+    full get_price_history response on every poll and only the new bars cost anything.
+    """
+
+    def __init__(self, factories):
+        """
+        :param factories: A dictionary mapping an indicator name to a callable that creates it,
+                          e.g. `{"ema20": lambda: EMA(20), "rsi": RSI}`.
+        """
+        self.factories = factories
+        self._indicators = {}
+        self._last_datetime = {}
+
+    def _for_symbol(self, symbol):
+        indicators = self._indicators.get(symbol)
+        if indicators is None:
+            indicators = {name: factory() for name, factory in self.factories.items()}
+            self._indicators[symbol] = indicators
+        return indicators
+
+    def warm_up(self, symbol, history):
+        """
+        Initialize the indicators of a symbol from stored history, replacing any previous state.
+
+        :param symbol: The ticker symbol.
+        :param history: A CandleSeries or a get_price_history response.
+        :return: A dictionary mapping indicator name to an `array('d')` aligned with the history.
+        """
+        series = history if isinstance(history, CandleSeries) else CandleSeries.from_price_history(history)
+        indicators = self._for_symbol(symbol)
+        for indicator in indicators.values():
+            indicator.reset()
+        if len(series):
+            self._last_datetime[symbol] = series.datetimes[-1]
+        return {name: indicator.batch(series) for name, indicator in indicators.items()}
+
+    def update(self, symbol, candle):
+        """
+        Apply one new candle.
+
+        :param symbol: The ticker symbol.
+        :param candle: A Candle or a dictionary in the get_price_history candle schema.
+        :return: A dictionary with the current indicator values, or None if the candle was already applied.
+        """
+        if isinstance(candle, dict):
+            candle = Candle.from_dict(candle)
+        last = self._last_datetime.get(symbol)
+        if last is not None and candle.datetime <= last:
+            return None
+        self._last_datetime[symbol] = candle.datetime
+        return {name: indicator.update(candle) for name, indicator in self._for_symbol(symbol).items()}
+
+    def on_bar(self, symbol, candle):
+        """
+        Callback with the `(symbol, candle)` signature used by BarAggregator.
+        """
+        self.update(symbol, candle)
+
+    def update_history(self, symbol, price_history):
+        """
+        Apply the candles of a get_price_history response that are newer than the last one applied.
+
+        :param symbol: The ticker symbol.
+        :param price_history: A get_price_history response or a CandleSeries.
+        :return: A dictionary with the current indicator values.
+        """
+        last = self._last_datetime.get(symbol)
+        if isinstance(price_history, CandleSeries):
+            first = bisect_right(price_history.datetimes, last) if last is not None else 0
+            new_candles = price_history[first:]
+        else:
+            # Scan back from the end so the cost depends on the number of new candles, not the history length
+            candles = price_history.get("candles", []) if isinstance(price_history, dict) else price_history
+            first = len(candles)
+            while first > 0 and (last is None or candles[first - 1]["datetime"] > last):
+                first -= 1
+            new_candles = candles[first:]
+        for candle in new_candles:
+            self.update(symbol, candle)
+        return self.values(symbol)
+
+    def values(self, symbol):
+        """
+        :return: A dictionary mapping indicator name to its current value for a symbol.
+        """
+        return {name: indicator.value for name, indicator in self._for_symbol(symbol).items()}
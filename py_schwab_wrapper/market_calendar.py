@@ -0,0 +1,285 @@
+# py_schwab_wrapper/market_calendar.py
+# US equity market calendar with precomputed session boundaries.
+
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time as dt_time, timedelta
+import pytz
+
+EASTERN = pytz.timezone("America/New_York")
+
+REGULAR_OPEN = dt_time(9, 30)
+REGULAR_CLOSE = dt_time(16, 0)
+EARLY_CLOSE = dt_time(13, 0)
+# Schwab serves extended hours data from 7:00 to 20:00 Eastern
+EXTENDED_OPEN = dt_time(7, 0)
+EXTENDED_CLOSE = dt_time(20, 0)
+EARLY_EXTENDED_CLOSE = dt_time(17, 0)
+
+# One-off closures (national days of mourning) that no rule can derive
+SPECIAL_CLOSURES = (
+    date(2018, 12, 5),
+    date(2025, 1, 9),
+)
+
+
+def _easter(year):
+    # Anonymous Gregorian algorithm
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year, month, weekday):
+    last = date(year, month + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    # Saturday holidays are observed on Friday, Sunday holidays on Monday
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year):
+    """
+    Full-day NYSE holidays for a year.
+
+    :param year: The calendar year.
+    :return: A set of dates.
+    """
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),       # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),       # Washington's Birthday
+        _easter(year) - timedelta(days=2), # Good Friday
+        _last_weekday(year, 5, 0),         # Memorial Day
+        _observed(date(year, 7, 4)),       # Independence Day
+        _nth_weekday(year, 9, 0, 1),       # Labor Day
+        _nth_weekday(year, 11, 3, 4),      # Thanksgiving
+        _observed(date(year, 12, 25)),     # Christmas
+    }
+    # New Year's Day falling on a Saturday is not observed on the previous Friday
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    holidays.update(day for day in SPECIAL_CLOSURES if day.year == year)
+    return holidays
+
+
+def nyse_early_closes(year):
+    """
+    Days on which the regular session closes at 13:00 Eastern.
+
+    :param year: The calendar year.
+    :return: A set of dates.
+    """
+    holidays = nyse_holidays(year)
+    candidates = {
+        date(year, 7, 3),                                         # Day before Independence Day
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),         # Day after Thanksgiving
+        date(year, 12, 24),                                       # Christmas Eve
+    }
+    return {day for day in candidates if day.weekday() < 5 and day not in holidays}
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _epoch_ms(day, at, offset_ms):
+    local_ms = (day.toordinal() - _EPOCH_ORDINAL) * 86400000 + (at.hour * 3600 + at.minute * 60) * 1000
+    return local_ms - offset_ms
+
+
+def _utc_offset_ms(day):
+    # Daylight saving time changes on Sunday mornings, so one lookup covers a whole trading week
+    offset = EASTERN.localize(datetime.combine(day, dt_time(12, 0))).utcoffset()
+    return int(offset.total_seconds() * 1000)
+
+
+class MarketCalendar:
+    """
+    Trading sessions for a range of years, precomputed as sorted epoch-millisecond arrays.
+
+    Lookups such as `is_open` or `previous_session` are binary searches over those arrays, so
+    they cost O(log n) and never touch timezone conversion.
+    """
+
+    def __init__(self, start_year=None, end_year=None, extra_holidays=()):
+        """
+        :param start_year: First year covered. Default is five years before the current one.
+        :param end_year: Last year covered. Default is two years after the current one.
+        :param extra_holidays: Additional closure dates not covered by the NYSE rules.
+        """
+        current_year = datetime.now(EASTERN).year
+        self.start_year = start_year if start_year is not None else current_year - 5
+        self.end_year = end_year if end_year is not None else current_year + 2
+        extra_holidays = set(extra_holidays)
+
+        self.dates = []
+        self.day_starts = array("q")       # Midnight Eastern of every trading day
+        self.opens = array("q")
+        self.closes = array("q")
+        self.extended_opens = array("q")
+        self.extended_closes = array("q")
+
+        self.range_start = _epoch_ms(date(self.start_year, 1, 1), dt_time(0, 0), _utc_offset_ms(date(self.start_year, 1, 1)))
+        self.range_end = _epoch_ms(date(self.end_year + 1, 1, 1), dt_time(0, 0), _utc_offset_ms(date(self.end_year + 1, 1, 1)))
+
+        for year in range(self.start_year, self.end_year + 1):
+            holidays = nyse_holidays(year) | extra_holidays
+            early_closes = nyse_early_closes(year)
+            day = date(year, 1, 1)
+            offset_ms = _utc_offset_ms(day)
+            while day.year == year:
+                if day.weekday() == 0:
+                    offset_ms = _utc_offset_ms(day)
+                if day.weekday() < 5 and day not in holidays:
+                    early = day in early_closes
+                    self.dates.append(day)
+                    self.day_starts.append(_epoch_ms(day, dt_time(0, 0), offset_ms))
+                    self.opens.append(_epoch_ms(day, REGULAR_OPEN, offset_ms))
+                    self.closes.append(_epoch_ms(day, EARLY_CLOSE if early else REGULAR_CLOSE, offset_ms))
+                    self.extended_opens.append(_epoch_ms(day, EXTENDED_OPEN, offset_ms))
+                    self.extended_closes.append(_epoch_ms(day, EARLY_EXTENDED_CLOSE if early else EXTENDED_CLOSE, offset_ms))
+                day += timedelta(days=1)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _bounds(self, extended):
+        return (self.extended_opens, self.extended_closes) if extended else (self.opens, self.closes)
+
+    def _now_ms(self, timestamp):
+        timestamp = int(time.time() * 1000) if timestamp is None else int(timestamp)
+        if not self.range_start <= timestamp < self.range_end:
+            raise ValueError(f"Timestamp {timestamp} is outside the calendar range {self.start_year}-{self.end_year}")
+        return timestamp
+
+    def _check_range(self, index):
+        if index < 0 or index >= len(self.dates):
+            raise ValueError(f"No trading session in the calendar range {self.start_year}-{self.end_year}")
+        return index
+
+    def is_trading_day(self, day):
+        """
+        :param day: A date.
+        :return: True if the market has a session on that date.
+        """
+        index = bisect_left(self.dates, day)
+        return index < len(self.dates) and self.dates[index] == day
+
+    def session_index(self, timestamp=None, extended=False):
+        """
+        :param timestamp: Milliseconds since the epoch. Default is now.
+        :param extended: Whether pre- and post-market hours count as part of the session.
+        :return: The index of the session containing `timestamp`, or None if the market is closed.
+        """
+        timestamp = self._now_ms(timestamp)
+        opens, closes = self._bounds(extended)
+        index = bisect_right(opens, timestamp) - 1
+        if index >= 0 and timestamp < closes[index]:
+            return index
+        return None
+
+    def is_open(self, timestamp=None, extended=False):
+        """
+        :param timestamp: Milliseconds since the epoch. Default is now.
+        :param extended: Whether pre- and post-market hours count as open.
+        :return: True if the market is open at `timestamp`.
+        """
+        return self.session_index(timestamp, extended) is not None
+
+    def session(self, index, extended=False):
+        """
+        :return: A tuple `(open_ms, close_ms)` for the session at `index`.
+        """
+        opens, closes = self._bounds(extended)
+        return opens[index], closes[index]
+
+    def trading_session(self, timestamp=None, extended=False):
+        """
+        The session of the trading day containing `timestamp`, or of the last trading day before it
+        when `timestamp` falls on a weekend or holiday.
+
+        :return: A tuple `(open_ms, close_ms)`.
+        """
+        index = self._check_range(bisect_right(self.day_starts, self._now_ms(timestamp)) - 1)
+        return self.session(index, extended)
+
+    def previous_session(self, timestamp=None, extended=False):
+        """
+        :return: A tuple `(open_ms, close_ms)` for the last session that closed at or before `timestamp`.
+        """
+        opens, closes = self._bounds(extended)
+        index = self._check_range(bisect_right(closes, self._now_ms(timestamp)) - 1)
+        return opens[index], closes[index]
+
+    def next_session(self, timestamp=None, extended=False):
+        """
+        :return: A tuple `(open_ms, close_ms)` for the first session opening after `timestamp`.
+        """
+        opens, closes = self._bounds(extended)
+        index = self._check_range(bisect_right(opens, self._now_ms(timestamp)))
+        return opens[index], closes[index]
+
+    def seconds_until_open(self, timestamp=None, extended=False):
+        """
+        :return: 0 if the market is open, otherwise the seconds until the next session opens.
+        """
+        timestamp = self._now_ms(timestamp)
+        if self.is_open(timestamp, extended):
+            return 0.0
+        return (self.next_session(timestamp, extended)[0] - timestamp) / 1000.0
+
+    def cache_ttl(self, ttl, timestamp=None, extended=False):
+        """
+        How long market data fetched at `timestamp` stays fresh: `ttl` while the market is open,
+        and until the next open while it is closed.
+
+        :param ttl: The time-to-live in seconds to use during a session.
+        :return: A time-to-live in seconds.
+        """
+        return max(ttl, self.seconds_until_open(timestamp, extended))
+
+
+_default_calendar = None
+_default_calendar_lock = threading.Lock()
+
+
+def get_default_calendar():
+    """
+    :return: A process-wide MarketCalendar, built on first use.
+    """
+    global _default_calendar
+    with _default_calendar_lock:
+        if _default_calendar is None:
+            _default_calendar = MarketCalendar()
+        return _default_calendar
+
+
+def to_eastern_isoformat(timestamp):
+    """
+    :param timestamp: Milliseconds since the epoch.
+    :return: An ISO-8601 string in Eastern time, e.g. 2024-08-23T09:30:00-04:00.
+    """
+    return datetime.fromtimestamp(timestamp / 1000, EASTERN).isoformat()
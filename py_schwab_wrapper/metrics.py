@@ -0,0 +1,212 @@
+# py_schwab_wrapper/metrics.py
+# In-process request metrics with Prometheus text export.
+
+from array import array
+from bisect import bisect_left
+import re
+import threading
+from urllib.parse import urlsplit
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS = "schwab_requests_total"
+REQUEST_DURATION = "schwab_request_duration_seconds"
+RETRIES = "schwab_retries_total"
+THROTTLED = "schwab_throttled_total"
+RESPONSE_BYTES = "schwab_response_bytes_total"
+DECODE_DURATION = "schwab_decode_duration_seconds"
+TOKEN_REFRESHES = "schwab_token_refreshes_total"
+TOKEN_REFRESH_DURATION = "schwab_token_refresh_duration_seconds"
+CACHE_LOOKUPS = "schwab_cache_lookups_total"
+DEADLINES_EXCEEDED = "schwab_deadlines_exceeded_total"
+RATE_LIMIT_WAIT = "schwab_rate_limit_wait_seconds"
+
+HELP = {
+    REQUESTS: "HTTP requests sent, by endpoint family, method and status.",
+    REQUEST_DURATION: "Time from sending a request to receiving the full response.",
+    RETRIES: "Attempts that failed and were retried, by endpoint family and reason.",
+    THROTTLED: "Responses with status 429 Too Many Requests.",
+    RESPONSE_BYTES: "Response body bytes received.",
+    DECODE_DURATION: "Time spent decoding JSON response bodies.",
+    TOKEN_REFRESHES: "Token refresh attempts, by outcome.",
+    TOKEN_REFRESH_DURATION: "Time spent refreshing the access token.",
+    CACHE_LOOKUPS: "Lookups in client-side caches, by cache and result (hit, miss or coalesced).",
+    DEADLINES_EXCEEDED: "Calls that failed because their deadline passed, by endpoint family.",
+    RATE_LIMIT_WAIT: "Time requests waited for the gateway's rate limiter, by endpoint family.",
+}
+
+# Path segments that identify an account, order or symbol rather than an endpoint
+_VARIABLE_SEGMENT = re.compile(r"^([0-9A-F]{32,}|\d+|\$?[A-Z0-9./]+)$")
+
+
+def endpoint_family(url):
+    """
+    Group a URL into a low-cardinality endpoint family.
+
+    :param url: A request URL, e.g. https://api.schwabapi.com/trader/v1/accounts/ABC/orders/123.
+    :return: The family name, e.g. 'trader/accounts/orders'.
+    """
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+    if len(segments) >= 2 and segments[1] == "v1":
+        api, segments = segments[0], segments[2:]
+    elif segments and segments[0] == "v1":
+        api, segments = "", segments[1:]
+    else:
+        api = ""
+    kept = [segment for segment in segments if not _VARIABLE_SEGMENT.match(segment)]
+    return "/".join(part for part in [api] + kept if part) or "unknown"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram. Observations cost one binary search and one increment.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = array("q", [0]) * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        :return: A list of `(upper_bound, cumulative_count)` pairs ending with `(float('inf'), count)`.
+        """
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, fraction):
+        """
+        :return: The upper bound of the bucket holding the given quantile, or 0.0 without observations.
+        """
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        for bound, total in self.cumulative():
+            if total >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms keyed by metric name and labels.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param buckets: Upper bounds, in seconds, used for every histogram.
+        """
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def counter(self, name, **labels):
+        """
+        :return: The value of a counter, or 0 if it was never incremented.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def total(self, name, **labels):
+        """
+        :return: The sum of every counter with `name` whose labels include the given ones.
+        """
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(value for (counter, key), value in self._counters.items()
+                       if counter == name and wanted <= set(key))
+
+    def histogram(self, name, **labels):
+        """
+        :return: The Histogram for the name and labels, or None if nothing was observed.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            return self._histograms.get(key)
+
+    def snapshot(self):
+        """
+        :return: A dictionary with `counters` and `histograms`, each mapping `(name, labels)` to a plain value
+                 (histograms as a dictionary with buckets, sum and count).
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: {"buckets": histogram.cumulative(), "sum": histogram.sum, "count": histogram.count}
+                for key, histogram in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_prometheus(self):
+        """
+        :return: Every metric in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name in sorted({name for name, _ in snapshot["counters"]}):
+            _header(lines, name, "counter")
+            for (metric, labels), value in sorted(snapshot["counters"].items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for name in sorted({name for name, _ in snapshot["histograms"]}):
+            _header(lines, name, "histogram")
+            for (metric, labels), histogram in sorted(snapshot["histograms"].items()):
+                if metric != name:
+                    continue
+                for bound, total in histogram["buckets"]:
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {total}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(histogram['sum'])}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _header(lines, name, kind):
+    if name in HELP:
+        lines.append(f"# HELP {name} {HELP[name]}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
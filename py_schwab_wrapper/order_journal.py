@@ -0,0 +1,305 @@
+# py_schwab_wrapper/order_journal.py
+# Write-ahead journal that makes order submission safe to retry.
+
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from requests.exceptions import ConnectionError, ConnectTimeout, HTTPError, Timeout
+from .deadlines import DeadlineExceeded
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Journal states
+PENDING = "PENDING"        # Written before the order leaves the process
+SUBMITTED = "SUBMITTED"    # Schwab acknowledged the POST
+UNKNOWN = "UNKNOWN"        # The POST timed out or the connection dropped; outcome unknown
+CONFIRMED = "CONFIRMED"    # Found on the account while reconciling an UNKNOWN submission
+NOT_FOUND = "NOT_FOUND"    # Reconciliation finished without finding the order
+REJECTED = "REJECTED"      # Schwab rejected the order
+NOT_SENT = "NOT_SENT"      # Every attempt failed to connect, so the order was never placed
+
+OPEN_STATES = (PENDING, UNKNOWN, NOT_FOUND)
+
+
+def _number(value):
+    if value is None:
+        return None
+    try:
+        return round(float(value), 6)
+    except (TypeError, ValueError):
+        return value
+
+
+def order_fingerprint(order):
+    """
+    Build a comparable fingerprint for an order payload or an order returned by `get_orders`.
+
+    Schwab does not echo client-side identifiers back, so reconciliation matches on the fields
+    that are present in both the submitted payload and the stored order.
+
+    :param order: An order payload (as sent to `post_order`) or an order returned by `get_orders`.
+    :return: A hashable tuple describing the order.
+    """
+    legs = tuple(sorted(
+        (
+            leg.get("instrument", {}).get("symbol"),
+            leg.get("instruction"),
+            _number(leg.get("quantity")),
+        )
+        for leg in order.get("orderLegCollection", [])
+    ))
+    return (
+        order.get("orderType"),
+        order.get("orderStrategyType", "SINGLE"),
+        _number(order.get("price")),
+        _number(order.get("stopPrice")),
+        legs,
+    )
+
+
+def order_id_from_location(location):
+    """
+    :param location: The Location header of a 201 order response, e.g.
+                     'https://api.schwabapi.com/trader/v1/accounts/HASH/orders/1001'.
+    :return: The new order's id, or None if the header is missing or does not end in one.
+    """
+    order_id = (location or "").rstrip("/").rsplit("/", 1)[-1]
+    return int(order_id) if order_id.isdigit() else None
+
+
+def _parse_entered_time(value):
+    # Schwab returns timestamps such as 2024-09-24T18:57:53+0000
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z").timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class OrderJournal:
+    """
+    Local write-ahead journal for order submissions.
+
+    Every submission is tagged with a client-side identifier and written to disk before it is
+    sent. When a POST times out, the journal reconciles against `get_orders` for a narrow window
+    around the submission and either confirms the order or resubmits it.
+    """
+
+    def __init__(self, path="order_journal.jsonl", reconcile_window=60, reconcile_attempts=3,
+                 reconcile_delay=2.0, max_submissions=2, connect_retry_delay=1.0):
+        """
+        :param path: The JSON lines file used to persist journal events.
+        :param reconcile_window: Seconds of slack around the submission time used when searching orders.
+        :param reconcile_attempts: How many times to look for the order before declaring it not found.
+        :param reconcile_delay: Seconds to wait between reconciliation lookups.
+        :param max_submissions: Maximum number of times a single order is sent to Schwab.
+        :param connect_retry_delay: Seconds to wait before sending again after a connection could not be made.
+        """
+        self.path = path
+        self.reconcile_window = reconcile_window
+        self.reconcile_attempts = reconcile_attempts
+        self.reconcile_delay = reconcile_delay
+        self.max_submissions = max_submissions
+        self.connect_retry_delay = connect_retry_delay
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as journal_file:
+            for line_number, line in enumerate(journal_file, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final write is expected after a crash; anything else is worth knowing about
+                    logger.error(f"Skipping unreadable order journal line {line_number} in {self.path}")
+                    continue
+                self._apply(event)
+
+    def _apply(self, event):
+        entry = self.entries.setdefault(event["client_order_id"], {"client_order_id": event["client_order_id"]})
+        entry.update({k: v for k, v in event.items() if k != "ts"})
+        entry["updated_at"] = event["ts"]
+        return entry
+
+    def _record(self, client_order_id, state, **fields):
+        event = {"client_order_id": client_order_id, "state": state, "ts": time.time()}
+        event.update(fields)
+        with self._lock:
+            with open(self.path, "a") as journal_file:
+                journal_file.write(json.dumps(event) + "\n")
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+            return dict(self._apply(event))
+
+    def open_entries(self):
+        """
+        :return: Journal entries whose outcome is not settled (PENDING, UNKNOWN or NOT_FOUND).
+        """
+        return [dict(entry) for entry in self.entries.values() if entry["state"] in OPEN_STATES]
+
+    def submit(self, api, account_hash, order_payload, client_order_id=None):
+        """
+        Submit an order through `api.post_order`, recording every step in the journal.
+
+        A timeout, dropped connection or 5xx response is reconciled against `get_orders`; the order
+        is only resubmitted when reconciliation does not find it on the account.
+
+        :param api: A `SchwabAPI` instance.
+        :param account_hash: The hashed account identifier.
+        :param order_payload: A dictionary containing the entire order payload as required by the API.
+        :param client_order_id: Optional client-side identifier. A random one is generated if omitted.
+        :return: The journal entry for the order, with `state` set to SUBMITTED or CONFIRMED.
+        :raises HTTPError: If Schwab rejects the order (4xx).
+        :raises RequestException: If the outcome is still unknown after `max_submissions` attempts, or the
+                                  order could never be sent (the entry is then NOT_SENT).
+        :raises DeadlineExceeded: If the caller's deadline passes. The entry is left UNKNOWN when the order
+                                  may have been placed, PENDING otherwise, for `recover` to settle.
+        """
+        client_order_id = client_order_id or uuid.uuid4().hex
+        if client_order_id in self.entries:
+            raise ValueError(f"Client order id {client_order_id} is already in the journal")
+
+        self._record(client_order_id, PENDING, account_hash=account_hash, payload=order_payload,
+                     first_sent_at=time.time(), submissions=0)
+        return self._send(api, client_order_id)
+
+    def _send(self, api, client_order_id):
+        entry = self.entries[client_order_id]
+        last_exception = None
+
+        ambiguous = False  # Whether any attempt may have reached Schwab
+
+        while entry["submissions"] < self.max_submissions:
+            self._record(client_order_id, PENDING, submissions=entry["submissions"] + 1)
+            try:
+                response = api._post_order(entry["account_hash"], entry["payload"])
+            except HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else None
+                if status_code is not None and status_code < 500:
+                    self._record(client_order_id, REJECTED, status_code=status_code, error=str(e))
+                    raise
+                # A server or proxy error does not tell whether the order was accepted
+                ambiguous = True
+                last_exception = e
+                if self._reconcile_unknown(api, client_order_id, e):
+                    return dict(self.entries[client_order_id])
+                continue
+            except DeadlineExceeded as e:
+                # No budget is left to reconcile or resubmit
+                if e.sent:
+                    self._record(client_order_id, UNKNOWN, error=str(e))
+                raise
+            except ConnectTimeout as e:
+                # The connection was never established, so the order cannot have been placed
+                last_exception = e
+                if entry["submissions"] < self.max_submissions:
+                    logger.error(f"Order {client_order_id} could not connect: {e}. Resubmitting...")
+                    time.sleep(self.connect_retry_delay)
+                continue
+            except (Timeout, ConnectionError) as e:
+                ambiguous = True
+                last_exception = e
+                if self._reconcile_unknown(api, client_order_id, e):
+                    return dict(self.entries[client_order_id])
+                continue
+
+            order_id = order_id_from_location(response.headers.get("Location"))
+            logger.info(f"Order {client_order_id} submitted as Schwab order {order_id}.")
+            return self._record(client_order_id, SUBMITTED, order_id=order_id, status_code=response.status_code)
+
+        if isinstance(last_exception, ConnectTimeout):
+            # The last attempt was never sent; earlier ambiguous ones were reconciled as not found
+            self._record(client_order_id, NOT_FOUND if ambiguous else NOT_SENT, error=str(last_exception))
+        else:
+            self._record(client_order_id, UNKNOWN, error=str(last_exception))
+        raise last_exception
+
+    def _reconcile_unknown(self, api, client_order_id, error):
+        # Record an ambiguous outcome and look for the order; True when it was found on the account
+        self._record(client_order_id, UNKNOWN, error=str(error))
+        logger.error(f"Order {client_order_id} outcome unknown: {error}. Reconciling...")
+        if self.reconcile(api, client_order_id) is not None:
+            return True
+        logger.info(f"Order {client_order_id} not found on the account. Resubmitting...")
+        return False
+
+    def reconcile(self, api, client_order_id):
+        """
+        Look for a journaled order on the account using `get_orders` over a narrow time window.
+
+        Orders already claimed by other journal entries are ignored, so two identical submissions
+        are never confirmed against the same Schwab order. When an identical order was acknowledged
+        without an order id, the oldest matching order is left to it.
+
+        :param api: A `SchwabAPI` instance.
+        :param client_order_id: The client-side identifier of the journal entry.
+        :return: The matching order from `get_orders`, or None if it was not found.
+        """
+        entry = self.entries[client_order_id]
+        fingerprint = order_fingerprint(entry["payload"])
+        earliest = entry["first_sent_at"] - self.reconcile_window
+
+        for attempt in range(self.reconcile_attempts):
+            if attempt:
+                time.sleep(self.reconcile_delay)
+
+            others = [e for cid, e in self.entries.items() if cid != client_order_id]
+            claimed = {e.get("order_id") for e in others}
+            # Identical orders Schwab acknowledged without a Location header each own one match
+            unattributed = sum(1 for e in others if e["state"] == SUBMITTED and e.get("order_id") is None
+                               and e.get("account_hash") == entry["account_hash"]
+                               and order_fingerprint(e["payload"]) == fingerprint)
+            orders = api.get_orders(
+                entry["account_hash"],
+                from_entered_time=datetime.fromtimestamp(earliest, timezone.utc).isoformat(),
+                to_entered_time=datetime.fromtimestamp(time.time() + self.reconcile_window, timezone.utc).isoformat(),
+            )
+            matches = []
+            for order in orders or []:
+                entered_at = _parse_entered_time(order.get("enteredTime"))
+                if order.get("orderId") in claimed or (entered_at is not None and entered_at < earliest):
+                    continue
+                if order_fingerprint(order) == fingerprint:
+                    matches.append((entered_at if entered_at is not None else float("inf"), order))
+            matches.sort(key=lambda match: match[0])
+            if len(matches) > unattributed:
+                order = matches[unattributed][1]
+                self._record(client_order_id, CONFIRMED, order_id=order.get("orderId"))
+                logger.info(f"Order {client_order_id} confirmed as Schwab order {order.get('orderId')}.")
+                return order
+
+        self._record(client_order_id, NOT_FOUND)
+        return None
+
+    def recover(self, api, resubmit=False):
+        """
+        Reconcile every unsettled entry, typically after a restart.
+
+        :param api: A `SchwabAPI` instance.
+        :param resubmit: Whether orders that cannot be found should be sent again, as long as they
+                         have been sent fewer than `max_submissions` times.
+        :return: The updated journal entries that were recovered.
+        """
+        recovered = []
+        for entry in self.open_entries():
+            client_order_id = entry["client_order_id"]
+            if self.reconcile(api, client_order_id) is None and resubmit:
+                if self.entries[client_order_id]["submissions"] >= self.max_submissions:
+                    # The cap counts attempts made before the restart too
+                    logger.error(f"Order {client_order_id} was already sent {self.max_submissions} times. Not resubmitting.")
+                else:
+                    try:
+                        self._send(api, client_order_id)
+                    except (HTTPError, Timeout, ConnectionError) as e:
+                        logger.error(f"Resubmitting order {client_order_id} failed: {e}")
+            recovered.append(dict(self.entries[client_order_id]))
+        return recovered
@@ -0,0 +1,148 @@
+# py_schwab_wrapper/order_tracker.py
+# Incremental order book built on top of get_orders.
+
+import time
+from datetime import datetime, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Order statuses after which Schwab no longer changes an order
+TERMINAL_STATUSES = frozenset(["FILLED", "CANCELED", "REJECTED", "EXPIRED", "REPLACED"])
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _entered_at(order):
+    # Schwab returns timestamps such as 2024-09-24T18:57:53+0000
+    try:
+        return datetime.strptime(order.get("enteredTime"), "%Y-%m-%dT%H:%M:%S%z").timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def flatten_orders(orders):
+    """
+    Yield every order in `orders` together with its nested child orders (e.g. the legs of an OCO).
+
+    :param orders: A list of orders as returned by `get_orders`.
+    :return: A generator of order dictionaries.
+    """
+    stack = list(reversed(orders or []))
+    while stack:
+        order = stack.pop()
+        yield order
+        stack.extend(reversed(order.get("childOrderStrategies", [])))
+
+
+class OrderTracker:
+    """
+    Keeps a local order book for one account, keyed by orderId.
+
+    The first poll loads the default `get_orders` session window. Later polls make one `get_orders`
+    request for the orders entered since the previous poll, widened back to the oldest order that is
+    still open, so the request count stays at one per poll however many orders are resting. Open
+    orders without an entered time are refreshed individually, at most `max_order_refreshes` per poll.
+    """
+
+    def __init__(self, api, account_hash, lookback=60, on_status_change=None, max_order_refreshes=5):
+        """
+        :param api: A `SchwabAPI` instance.
+        :param account_hash: The hashed account identifier.
+        :param lookback: Seconds of overlap between consecutive polls, covering clock skew and late entries.
+        :param on_status_change: Optional callback receiving `(order, previous_status)` for every transition.
+        :param max_order_refreshes: The most open orders refreshed with `get_order` in one poll. The rest
+                                    are refreshed on later polls.
+        """
+        self.api = api
+        self.account_hash = account_hash
+        self.lookback = lookback
+        self.max_order_refreshes = max_order_refreshes
+        self._refreshed_at = {}  # orderId -> time of its last get_order refresh
+        self.orders = {}
+        self.last_poll = None
+        self._listeners = []
+        if on_status_change is not None:
+            self.subscribe(on_status_change)
+
+    def subscribe(self, callback, statuses=None):
+        """
+        Register a callback for status transitions.
+
+        :param callback: Callable receiving `(order, previous_status)`. `previous_status` is None for new orders.
+        :param statuses: Optional iterable of statuses (e.g. ['FILLED', 'CANCELED']) that trigger the callback.
+        """
+        self._listeners.append((callback, frozenset(statuses) if statuses is not None else None))
+
+    def open_orders(self):
+        """
+        :return: The tracked orders whose status is not terminal.
+        """
+        return [order for order in self.orders.values() if order.get("status") not in TERMINAL_STATUSES]
+
+    def poll(self, now=None):
+        """
+        Refresh the order book and fire callbacks for every status transition.
+
+        :param now: Optional current time in seconds since the epoch. Defaults to `time.time()`.
+        :return: A list of `(order, previous_status)` tuples for the orders that changed.
+        """
+        now = time.time() if now is None else now
+
+        if self.last_poll is None:
+            fetched = list(flatten_orders(self.api.get_orders(self.account_hash)))
+        else:
+            open_orders = self.open_orders()
+            start = min([self.last_poll] + [entered_at for entered_at in map(_entered_at, open_orders)
+                                            if entered_at is not None])
+            fetched = list(flatten_orders(self.api.get_orders(
+                self.account_hash,
+                from_entered_time=_iso(start - self.lookback),
+                to_entered_time=_iso(now + self.lookback),
+            )))
+
+            # Open orders the window missed, such as those without an entered time, are fetched one by one
+            seen = {order.get("orderId") for order in fetched}
+            missing = [order for order in open_orders if order.get("orderId") not in seen]
+            missing.sort(key=lambda order: self._refreshed_at.get(order["orderId"], 0))  # Longest waiting first
+            for order in missing[:self.max_order_refreshes]:
+                if order.get("orderId") in seen:
+                    continue  # Arrived with a refreshed parent
+                self._refreshed_at[order["orderId"]] = now
+                refreshed = list(flatten_orders([self.api.get_order(self.account_hash, order["orderId"])]))
+                seen.update(child.get("orderId") for child in refreshed)  # Children come with their parent
+                fetched.extend(refreshed)
+            if len(missing) > self.max_order_refreshes:
+                logger.info(f"Refreshed {self.max_order_refreshes} of {len(missing)} open orders missing from "
+                            f"the order window. The rest follow on later polls.")
+
+        self.last_poll = now
+        return self._apply(fetched)
+
+    def _apply(self, fetched):
+        changes = []
+        for order in fetched:
+            order_id = order.get("orderId")
+            if order_id is None:
+                continue
+            previous = self.orders.get(order_id)
+            previous_status = previous.get("status") if previous is not None else None
+            self.orders[order_id] = order
+            if previous is None or previous_status != order.get("status"):
+                changes.append((order, previous_status))
+
+        for order, previous_status in changes:
+            self._notify(order, previous_status)
+        return changes
+
+    def _notify(self, order, previous_status):
+        for callback, statuses in self._listeners:
+            if statuses is not None and order.get("status") not in statuses:
+                continue
+            try:
+                callback(order, previous_status)
+            except Exception as e:
+                # A failing listener must not stop the others or break the poll loop
+                logger.error(f"Order tracker callback failed for order {order.get('orderId')}: {e}")
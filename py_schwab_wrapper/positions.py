@@ -0,0 +1,223 @@
+# py_schwab_wrapper/positions.py
+# Compact positions/balances snapshots with incremental diffs.
+
+import time
+from array import array
+from collections import namedtuple
+
+# Numeric columns kept for every position, in table order
+POSITION_COLUMNS = ("quantity", "average_price", "market_value", "day_pnl", "open_pnl")
+
+# currentBalances fields kept for every account
+BALANCE_FIELDS = ("liquidationValue", "cashBalance", "buyingPower", "availableFunds", "longMarketValue",
+                  "shortMarketValue")
+
+PositionChange = namedtuple("PositionChange", [
+    "account_number", "symbol", "change",
+    "quantity", "quantity_change",
+    "market_value", "market_value_change",
+    "day_pnl", "day_pnl_change",
+    "open_pnl", "open_pnl_change",
+])
+
+ADDED = "ADDED"
+REMOVED = "REMOVED"
+CHANGED = "CHANGED"
+
+
+def _position_row(position):
+    long_quantity = position.get("longQuantity", 0.0) or 0.0
+    short_quantity = position.get("shortQuantity", 0.0) or 0.0
+    return (
+        float(long_quantity) - float(short_quantity),
+        float(position.get("averagePrice", 0.0) or 0.0),
+        float(position.get("marketValue", 0.0) or 0.0),
+        float(position.get("currentDayProfitLoss", 0.0) or 0.0),
+        float(position.get("longOpenProfitLoss", 0.0) or 0.0) + float(position.get("shortOpenProfitLoss", 0.0) or 0.0),
+    )
+
+
+class PositionsSnapshot:
+    """
+    Positions of one or more accounts stored as a keyed, column-oriented table.
+
+    Rows are keyed by `(account_number, symbol)`; every numeric column is a contiguous
+    `array('d')`, so diffs between snapshots run column by column instead of walking the
+    nested account JSON.
+    """
+
+    def __init__(self, keys, columns, balances=None, taken_at=None):
+        """
+        :param keys: A list of `(account_number, symbol)` tuples, one per row.
+        :param columns: A dictionary mapping each name in POSITION_COLUMNS to an `array('d')`.
+        :param balances: A dictionary mapping account_number to a dictionary of balance fields.
+        :param taken_at: The time of the snapshot in seconds since the epoch.
+        """
+        self.keys = keys
+        self.index = {key: row for row, key in enumerate(keys)}
+        self.columns = columns
+        self.balances = balances or {}
+        self.taken_at = time.time() if taken_at is None else taken_at
+
+    @classmethod
+    def from_accounts(cls, accounts, taken_at=None):
+        """
+        Build a snapshot from account payloads requested with `fields='positions'`.
+
+        :param accounts: A list of account JSON objects, or a dictionary keyed by account number
+                         as returned by `SchwabAPI.get_account_details`.
+        :param taken_at: The time of the snapshot in seconds since the epoch.
+        :return: A PositionsSnapshot.
+        """
+        if isinstance(accounts, dict):
+            accounts = list(accounts.values())
+
+        keys = []
+        columns = {name: array("d") for name in POSITION_COLUMNS}
+        ordered_columns = [columns[name] for name in POSITION_COLUMNS]
+        balances = {}
+
+        for account in accounts:
+            securities_account = account.get("securitiesAccount", account)
+            account_number = securities_account.get("accountNumber")
+            current_balances = securities_account.get("currentBalances", {})
+            balances[account_number] = {
+                field: current_balances[field] for field in BALANCE_FIELDS if field in current_balances
+            }
+
+            for position in securities_account.get("positions", []):
+                symbol = position.get("instrument", {}).get("symbol")
+                keys.append((account_number, symbol))
+                for column, value in zip(ordered_columns, _position_row(position)):
+                    column.append(value)
+
+        return cls(keys, columns, balances=balances, taken_at=taken_at)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def row(self, account_number, symbol):
+        """
+        :return: A dictionary with the numeric columns of one position, or None if it is not held.
+        """
+        row = self.index.get((account_number, symbol))
+        if row is None:
+            return None
+        return {name: self.columns[name][row] for name in POSITION_COLUMNS}
+
+    def diff(self, previous, columns=("quantity", "market_value", "day_pnl", "open_pnl"), tolerance=1e-9):
+        """
+        Compare this snapshot with an earlier one.
+
+        :param previous: The earlier PositionsSnapshot, or None to report every position as added.
+        :param columns: The columns whose change marks a position as CHANGED. Use ('quantity',) to
+                        ignore price-driven changes.
+        :param tolerance: Absolute changes smaller than this are ignored.
+        :return: A list of PositionChange tuples for added, removed and changed positions.
+        """
+        if previous is None:
+            aligned = [-1] * len(self.keys)
+            empty = array("d", bytes(8 * len(self.keys)))
+            previous_columns = {name: empty for name in POSITION_COLUMNS}
+        else:
+            aligned = [previous.index.get(key, -1) for key in self.keys]
+            # Previous values re-ordered to this snapshot's rows; positions that are new read as 0.0
+            previous_columns = {
+                name: array("d", [values[row] if row >= 0 else 0.0 for row in aligned])
+                for name, values in previous.columns.items()
+            }
+
+        deltas = {
+            name: array("d", [c - p for c, p in zip(self.columns[name], previous_columns[name])])
+            for name in POSITION_COLUMNS
+        }
+        changed = [False] * len(self.keys)
+        for name in columns:
+            changed = [flag or abs(delta) > tolerance for flag, delta in zip(changed, deltas[name])]
+
+        changes = []
+        for row, key in enumerate(self.keys):
+            if aligned[row] < 0:
+                change = ADDED
+            elif changed[row]:
+                change = CHANGED
+            else:
+                continue
+            changes.append(PositionChange(
+                key[0], key[1], change,
+                self.columns["quantity"][row], deltas["quantity"][row],
+                self.columns["market_value"][row], deltas["market_value"][row],
+                self.columns["day_pnl"][row], deltas["day_pnl"][row],
+                self.columns["open_pnl"][row], deltas["open_pnl"][row],
+            ))
+
+        if previous is not None:
+            for row, key in enumerate(previous.keys):
+                if key in self.index:
+                    continue
+                quantity = previous.columns["quantity"][row]
+                market_value = previous.columns["market_value"][row]
+                day_pnl = previous.columns["day_pnl"][row]
+                open_pnl = previous.columns["open_pnl"][row]
+                changes.append(PositionChange(
+                    key[0], key[1], REMOVED,
+                    0.0, -quantity, 0.0, -market_value, 0.0, -day_pnl, 0.0, -open_pnl,
+                ))
+        return changes
+
+    def balance_changes(self, previous, tolerance=1e-9):
+        """
+        :param previous: The earlier PositionsSnapshot.
+        :return: A dictionary mapping account_number to {field: change} for balances that moved.
+        """
+        changes = {}
+        for account_number, balances in self.balances.items():
+            before = previous.balances.get(account_number, {}) if previous is not None else {}
+            moved = {
+                field: value - before.get(field, 0.0)
+                for field, value in balances.items()
+                if abs(value - before.get(field, 0.0)) > tolerance
+            }
+            if moved:
+                changes[account_number] = moved
+        return changes
+
+
+class PositionsService:
+    """
+    Fetches positions for every account (concurrently, through `get_account_details`) and
+    reports only what changed since the previous refresh.
+    """
+
+    def __init__(self, api, account_numbers=None, max_workers=8):
+        """
+        :param api: A `SchwabAPI` instance.
+        :param account_numbers: The account numbers to include. Default is every account.
+        :param max_workers: The maximum number of accounts queried at the same time.
+        """
+        self.api = api
+        self.account_numbers = account_numbers
+        self.max_workers = max_workers
+        self.snapshot = None
+        self.previous = None
+
+    def fetch(self):
+        """
+        :return: A new PositionsSnapshot, without replacing the current one.
+        """
+        accounts = self.api.get_account_details(fields="positions", account_numbers=self.account_numbers,
+                                                max_workers=self.max_workers)
+        return PositionsSnapshot.from_accounts(accounts)
+
+    def refresh(self, columns=("quantity", "market_value", "day_pnl", "open_pnl"), tolerance=1e-9):
+        """
+        Fetch a new snapshot and diff it against the previous one.
+
+        :param columns: The columns whose change marks a position as CHANGED.
+        :param tolerance: Absolute changes smaller than this are ignored.
+        :return: A list of PositionChange tuples. The first refresh reports every position as ADDED.
+        """
+        snapshot = self.fetch()
+        changes = snapshot.diff(self.snapshot, columns=columns, tolerance=tolerance)
+        self.previous, self.snapshot = self.snapshot, snapshot
+        return changes
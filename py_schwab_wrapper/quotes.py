@@ -0,0 +1,86 @@
+# py_schwab_wrapper/quotes.py
+# Columnar view over the quotes endpoint response.
+
+from array import array
+
+# Numeric fields of the `quote` section stored as columns
+QUOTE_COLUMNS = (
+    "bidPrice", "askPrice", "lastPrice", "mark", "openPrice", "highPrice", "lowPrice", "closePrice",
+    "netChange", "netPercentChange", "totalVolume", "bidSize", "askSize", "lastSize",
+    "quoteTime", "tradeTime",
+)
+
+NAN = float("nan")
+
+
+class QuoteTable:
+    """
+    Quotes for many symbols stored column by column.
+
+    Every field in QUOTE_COLUMNS is a contiguous `array('d')` aligned with `symbols`; a field a
+    quote does not carry is stored as NaN.
+    """
+
+    def __init__(self, symbols, columns, asset_types=None):
+        """
+        :param symbols: A list of symbols, one per row.
+        :param columns: A dictionary mapping each name in QUOTE_COLUMNS to an `array('d')`.
+        :param asset_types: Optional list with the assetMainType of every row.
+        """
+        self.symbols = symbols
+        self.columns = columns
+        self.asset_types = asset_types or [None] * len(symbols)
+        self.index = {symbol: row for row, symbol in enumerate(symbols)}
+
+    @classmethod
+    def from_quotes(cls, quotes):
+        """
+        Build a table from the JSON returned by `SchwabAPI.get_quotes`.
+
+        :param quotes: A dictionary mapping symbol to its quote payload. The `errors` key is ignored.
+        :return: A QuoteTable.
+        """
+        symbols = []
+        asset_types = []
+        columns = {name: array("d") for name in QUOTE_COLUMNS}
+        ordered = [(name, columns[name]) for name in QUOTE_COLUMNS]
+
+        for symbol, payload in quotes.items():
+            if symbol == "errors" or not isinstance(payload, dict):
+                continue
+            quote = payload.get("quote", {})
+            symbols.append(symbol)
+            asset_types.append(payload.get("assetMainType"))
+            for name, column in ordered:
+                value = quote.get(name)
+                column.append(NAN if value is None else value)
+
+        return cls(symbols, columns, asset_types)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def column(self, name):
+        """
+        :param name: A field name from QUOTE_COLUMNS, e.g. 'lastPrice'.
+        :return: The `array('d')` holding that field for every symbol.
+        """
+        return self.columns[name]
+
+    def row(self, symbol):
+        """
+        :return: A dictionary with every column for one symbol, or None if the symbol is not in the table.
+        """
+        row = self.index.get(symbol)
+        if row is None:
+            return None
+        return {name: self.columns[name][row] for name in QUOTE_COLUMNS}
+
+    def last_prices(self):
+        """
+        :return: A dictionary mapping symbol to lastPrice.
+        """
+        return dict(zip(self.symbols, self.columns["lastPrice"]))
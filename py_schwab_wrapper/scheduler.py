@@ -0,0 +1,124 @@
+# py_schwab_wrapper/scheduler.py
+# Plans price history fetches aligned to bar closes and spread across the request quota.
+
+import threading
+import time
+import logging
+
+from .market_calendar import get_default_calendar
+
+logger = logging.getLogger(__name__)
+
+
+class BarScheduler:
+    """
+    Schedules one fetch per symbol after every bar close.
+
+    Fetches start `settle_delay` seconds after the bar closes (so Schwab has the bar) and are
+    spaced `60 / requests_per_minute` seconds apart, so a large universe never bursts past the
+    quota. Bars are aligned to the session open and closed sessions are skipped entirely.
+    """
+
+    def __init__(self, symbols, interval=300, settle_delay=2.0, requests_per_minute=120, calendar=None,
+                 extended=False, clock=time.time, sleep=None):
+        """
+        :param symbols: The symbols to fetch after every bar close.
+        :param interval: Bar length in seconds. Default is 300 (5-minute bars).
+        :param settle_delay: Seconds to wait after a bar closes before the first fetch.
+        :param requests_per_minute: Request budget used to space fetches. Schwab allows 120 per minute.
+        :param calendar: A MarketCalendar. Default is the shared calendar.
+        :param extended: Whether to schedule bars during pre- and post-market hours.
+        :param clock: Callable returning the current time in seconds (for tests).
+        :param sleep: Callable used to wait (for tests). Default waits on the run's stop event, so
+                      setting it interrupts a wait of any length.
+        """
+        if interval <= 0 or requests_per_minute <= 0:
+            raise ValueError("interval and requests_per_minute must be positive")
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.settle_delay = settle_delay
+        self.spacing = 60.0 / requests_per_minute
+        self.calendar = calendar or get_default_calendar()
+        self.extended = extended
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = {"cycles": 0, "fetches": 0, "errors": 0, "last_lag": 0.0, "max_lag": 0.0, "total_lag": 0.0}
+
+        if len(self.symbols) * self.spacing + settle_delay > interval:
+            logger.warning(f"{len(self.symbols)} symbols need {len(self.symbols) * self.spacing:.0f} seconds per bar at "
+                           f"{requests_per_minute} requests per minute, longer than the {interval} second bar.")
+
+    def next_bar_close(self, now=None):
+        """
+        :param now: Time in seconds since the epoch. Default is now.
+        :return: The next bar close (in seconds since the epoch) within a trading session.
+        """
+        now = self.clock() if now is None else now
+        now_ms = int(now * 1000)
+        interval_ms = int(self.interval * 1000)
+
+        if self.calendar.is_open(now_ms, self.extended):
+            session_open, session_close = self.calendar.trading_session(now_ms, self.extended)
+            elapsed = now_ms - session_open
+            bar_close = session_open + (elapsed // interval_ms + 1) * interval_ms
+        else:
+            session_open, session_close = self.calendar.next_session(now_ms, self.extended)
+            bar_close = session_open + interval_ms
+        # The last bar of a session closes with the session, even if it is shorter
+        return min(bar_close, session_close) / 1000.0
+
+    def plan(self, now=None):
+        """
+        :param now: Time in seconds since the epoch. Default is now.
+        :return: A list of `(fire_time, symbol)` tuples for the next bar close, in firing order.
+        """
+        first = self.next_bar_close(now) + self.settle_delay
+        return [(first + i * self.spacing, symbol) for i, symbol in enumerate(self.symbols)]
+
+    def run(self, fetch, stop_event=None, max_cycles=None):
+        """
+        Call `fetch(symbol)` for every symbol after every bar close until stopped.
+
+        :param fetch: Callable receiving a symbol. Exceptions are logged and counted, not raised.
+        :param stop_event: Optional threading.Event that stops the loop when set.
+        :param max_cycles: Optional number of bar closes to process before returning.
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set() and (max_cycles is None or self.stats["cycles"] < max_cycles):
+            for fire_time, symbol in self.plan():
+                delay = fire_time - self.clock()
+                if delay > 0:
+                    if self.sleep is None:
+                        stop_event.wait(delay)
+                    else:
+                        self.sleep(delay)
+                if stop_event.is_set():
+                    return
+                self._record_lag(self.clock() - fire_time)
+                try:
+                    fetch(symbol)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Scheduled fetch for {symbol} failed: {e}")
+            self.stats["cycles"] += 1
+
+    def _record_lag(self, lag):
+        lag = max(lag, 0.0)
+        self.stats["fetches"] += 1
+        self.stats["last_lag"] = lag
+        self.stats["total_lag"] += lag
+        self.stats["max_lag"] = max(self.stats["max_lag"], lag)
+
+    def lag_report(self):
+        """
+        :return: A dictionary with fetch counts and the last, mean and max schedule lag in seconds.
+        """
+        fetches = self.stats["fetches"]
+        return {
+            "cycles": self.stats["cycles"],
+            "fetches": fetches,
+            "errors": self.stats["errors"],
+            "last_lag": self.stats["last_lag"],
+            "mean_lag": self.stats["total_lag"] / fetches if fetches else 0.0,
+            "max_lag": self.stats["max_lag"],
+        }
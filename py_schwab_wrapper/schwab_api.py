@@ -2,22 +2,39 @@
 
 import time
 import json
-from requests.exceptions import RequestException, HTTPError, Timeout, ConnectionError
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import base64
-from datetime import datetime, timezone
-import requests
+from datetime import datetime, timezone, timedelta
 import warnings
-import pytz
-from requests.exceptions import HTTPError
+# requests and the pytz-backed market calendar are imported where they are first used, so importing
+# this module and constructing a lazy client stay cheap for short-lived workers
 from .utils.parameter_utils import get_inverse_instruction
+from .utils.concurrency_utils import run_concurrently
+from .utils.option_chain_utils import plan_expiry_shards, merge_options_chains
+from .quotes import QuoteTable
+from .deadlines import DEFAULT_TIMEOUTS, DeadlineExceeded, bound_timeout, remaining
+from .hooks import RequestHooks, BEFORE_SEND, AFTER_HEADERS, AFTER_BODY, AFTER_DECODE, ON_RETRY, ON_ERROR
+from .metrics import (MetricsRegistry, endpoint_family, REQUESTS, REQUEST_DURATION, RETRIES, THROTTLED,
+                      RESPONSE_BYTES, DECODE_DURATION, TOKEN_REFRESHES, TOKEN_REFRESH_DURATION, CACHE_LOOKUPS,
+                      DEADLINES_EXCEEDED)
 import logging
 
 # Create a logger specific to your library
 logger = logging.getLogger(__name__)  # __name__ ensures the logger is module-specific
 
+def _to_datetime(value):
+    # Accept datetimes as well as ISO-8601 strings such as 2024-09-24T18:57:53Z
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
 class SchwabAPI:
-    def __init__(self, client_id, client_secret, base_url='https://api.schwabapi.com', load_token_func=None, save_token_func=None):
-        if not client_id or not client_secret:
+    def __init__(self, client_id=None, client_secret=None, base_url='https://api.schwabapi.com', load_token_func=None,
+                 save_token_func=None, market_calendar=None, adapters=None, metrics=None, hooks=None, lazy=False,
+                 http2=False, timeouts=None, gateway=None):
+        if gateway is None and (not client_id or not client_secret):
             raise ValueError("client_id and client_secret are required for Schwab API access")
 
         self.client_id = client_id
@@ -29,9 +46,72 @@ class SchwabAPI:
         self.load_token_func = load_token_func or self.load_token
         self.save_token_func = save_token_func or self.save_token
         
-        self.session = requests.Session()
-        self.token = self.load_token_func()  # Call the provided or default method
-        self.ensure_valid_token()
+        self._adapters = dict(adapters or {})  # URL prefix -> transport adapter, mounted on every new session
+        # (connect, read) timeouts by endpoint family, e.g. {'marketdata/pricehistory': (3.05, 60)}
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self._http2 = http2  # Whether base_url requests go through an HTTP2Adapter, built with the first session
+        # Socket of a SchwabGateway that holds the token and sends upstream; this client is then a thin client
+        self.gateway = gateway
+        self._session = None  # Created on first use
+        self._token_lock = threading.RLock()  # Concurrent helpers share the token
+        self._account_hashes = None  # accountNumber -> hashValue, resolved on first use
+        self._market_calendar = market_calendar
+        self.metrics = metrics or MetricsRegistry()  # Pass a shared registry to aggregate several clients
+        self.hooks = hooks or RequestHooks()  # Lifecycle callbacks for tracing and profiling
+        self.token = None
+        if not lazy and gateway is None:
+            # A lazy client defers loading and refreshing the token to its first API call
+            self.token = self.load_token_func()  # Call the provided or default method
+            self.ensure_valid_token()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._token_lock:
+                if self._session is None:
+                    self._session = self._new_session()
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def _new_session(self):
+        import requests
+
+        if self.gateway is not None and self.base_url not in self._adapters:
+            from .gateway import GatewayAdapter
+
+            self._adapters[self.base_url] = GatewayAdapter(self.gateway)
+        elif self._http2 and self.base_url not in self._adapters:
+            from .http2 import HTTP2Adapter
+
+            self._adapters[self.base_url] = HTTP2Adapter()
+        session = requests.Session()
+        for prefix, adapter in self._adapters.items():
+            session.mount(prefix, adapter)
+        return session
+
+    def mount(self, prefix, adapter):
+        """
+        Route requests whose URL starts with `prefix` through a transport adapter, e.g. a
+        RecordingAdapter from `py_schwab_wrapper.testing`. The adapter survives token refreshes.
+
+        :param prefix: The URL prefix, e.g. 'https://'.
+        :param adapter: A `requests.adapters.BaseAdapter`.
+        """
+        self._adapters[prefix] = adapter
+        if self._session is not None:
+            self._session.mount(prefix, adapter)
+
+    @property
+    def market_calendar(self):
+        # The shared default calendar is only built when something needs it
+        if self._market_calendar is None:
+            from .market_calendar import get_default_calendar
+
+            self._market_calendar = get_default_calendar()
+        return self._market_calendar
 
     # Default file-based load_token method
     def load_token(self):
@@ -55,12 +135,19 @@ class SchwabAPI:
 
 
     def ensure_valid_token(self):
-        if 'expires_at' not in self.token or self.token['expires_at'] < time.time():
-            self.refresh_token()
-        # Add the access token to the session headers
-        self.session.headers.update({'Authorization': f'Bearer {self.token["access_token"]}'})
+        if self.gateway is not None:
+            return  # The gateway authenticates upstream requests
+        with self._token_lock:
+            if self.token is None:
+                self.token = self.load_token_func()  # First call of a lazy client
+            if 'expires_at' not in self.token or self.token['expires_at'] < time.time():
+                self.refresh_token()
+            # Add the access token to the session headers
+            self.session.headers.update({'Authorization': f'Bearer {self.token["access_token"]}'})
 
     def refresh_token(self):
+        from requests.exceptions import RequestException
+
         token = self.load_token_func()  # Use load_token_func
         refresh_token = token.get('refresh_token')
         auth_str = f"{self.client_id}:{self.client_secret}"
@@ -85,7 +172,12 @@ class SchwabAPI:
                         'refresh_token': refresh_token
                     }
 
-                    response = requests.post(self.token_url, headers=headers, data=payload)
+                    started = time.perf_counter()
+                    trace = self.hooks.trace("POST", self.token_url)
+                    # The explicit Authorization header replaces the session's expired bearer token
+                    response = self._send(trace, headers=headers, data=payload)
+                    self.metrics.observe(TOKEN_REFRESH_DURATION, time.perf_counter() - started)
+                    self.metrics.inc(TOKEN_REFRESHES, outcome=str(response.status_code))
 
                     if response.status_code == 200:
                         new_token = response.json()
@@ -93,8 +185,9 @@ class SchwabAPI:
                             expires_in = new_token.get('expires_in')
                             if expires_in:
                                 new_token['expires_at'] = time.time() + int(expires_in)
+                            self.token = new_token  # Custom save_token_func implementations may not set it
                             self.save_token_func(new_token)  # Use save_token_func
-                            self.session = requests.Session()
+                            self.session.headers.update({'Authorization': f'Bearer {new_token["access_token"]}'})
                             logger.info('Token refreshed and saved successfully!')
                         else:
                             logger.error(f'Unexpected token response: {new_token}')
@@ -105,6 +198,9 @@ class SchwabAPI:
                     else:
                         logger.error(f'Unexpected error: {response.status_code}')
                 except RequestException as e:
+                    trace.error = e
+                    self.hooks.emit(ON_ERROR, trace)
+                    self.metrics.inc(TOKEN_REFRESHES, outcome="network_error")
                     logger.error(f'Network error: {e}')
                 except ValueError as e:
                     logger.error(f'Error parsing token response: {e}')
@@ -113,44 +209,138 @@ class SchwabAPI:
 
 
     def get_account_info(self):
+        from requests.exceptions import HTTPError, RequestException
+
         url = f"{self.base_url}/accounts"
+        self.ensure_valid_token()
+        trace = self.hooks.trace("GET", url)
         try:
-            self.ensure_valid_token()
-            response = self.session.get(url)
+            response = self._send(trace)
             response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as http_err:
-            if response.status_code == 401:
-                logger.error("Unauthorized request. Please check credentials.")
-            else:
-                logger.error(f"HTTP error occurred: {http_err}")
+        except RequestException as e:
+            trace.error = e
+            self.hooks.emit(ON_ERROR, trace)
+            if isinstance(e, HTTPError):
+                if e.response.status_code == 401:
+                    logger.error("Unauthorized request. Please check credentials.")
+                else:
+                    logger.error(f"HTTP error occurred: {e}")
             raise  # Re-raise the error for upstream handling
+        return self._decode(response)
 
     def get_with_retry(self, url, params=None, retries=3):
+        from requests.exceptions import RequestException, HTTPError, Timeout, ConnectionError
+
+        trace = None
         last_exception = None
         for attempt in range(retries):
+            trace = self.hooks.trace("GET", url, params=params, attempt=attempt,
+                                     request_id=trace.request_id if trace else None)
             try:
-                response = self.session.get(url, params=params)
+                response = self._send(trace, params=params)
                 response.raise_for_status()  # Raise HTTPError for bad responses (4xx, 5xx)
                 return response  # Return the full Response object
             except HTTPError as e:
+                trace.error = e
                 if e.response.status_code == 401:  # Do not retry on 401 Unauthorized
                     logger.error(f"Unauthorized (401) error: {e}. Not retrying.")
+                    self.hooks.emit(ON_ERROR, trace)
                     raise e
                 last_exception = e
+                if e.response.status_code == 429:
+                    self.metrics.inc(THROTTLED, family=trace.family)
+                self._record_retry(trace, str(e.response.status_code), retries)
                 logger.error(f"Attempt {attempt + 1} failed with HTTP status {e.response.status_code}: {e}. Retrying...")
-                time.sleep(1)  # Delay before retrying
+                if attempt + 1 < retries:
+                    self._pause(1, trace, e)  # Delay before retrying
             except (Timeout, ConnectionError) as e:
+                trace.error = e
                 last_exception = e
+                reason = "timeout" if isinstance(e, Timeout) else "connection"
+                self.metrics.inc(REQUESTS, family=trace.family, method="GET", status=reason)
+                self._record_retry(trace, reason, retries)
                 logger.error(f"Attempt {attempt + 1} failed: {e}. Retrying...")
-                time.sleep(1)  # Delay before retrying
+                if attempt + 1 < retries:
+                    self._pause(1, trace, e)  # Delay before retrying
             except RequestException as e:
                 # For other kinds of request exceptions, raise immediately without retrying
+                trace.error = e
                 logger.error(f"RequestException encountered: {e}.")
+                self.hooks.emit(ON_ERROR, trace)
                 raise e  # Re-raise the exception immediately
         # If all retries are exhausted, raise the last encountered exception
+        if trace is not None:
+            self.hooks.emit(ON_ERROR, trace)
         raise last_exception if last_exception else Exception("Failed after multiple retry attempts")
 
+    def _send(self, trace, **kwargs):
+        """
+        Send one attempt, firing the before_send, after_headers and after_body hooks.
+
+        The body is streamed so the time to headers and the download time are measured separately.
+        The trace is kept on the response as `response.trace` for the after_decode hook. Timeouts come
+        from `self.timeouts`, shortened to the time left before the current deadline.
+        """
+        from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+
+        left = remaining()
+        if left is not None and left <= 0:
+            raise self._deadline_exceeded(trace, "before sending")
+        base_timeout = self._timeout_for(trace.family)
+        timeout = bound_timeout(base_timeout, left)
+        self.hooks.emit(BEFORE_SEND, trace)
+        try:
+            response = self.session.request(trace.method, trace.url, stream=True, timeout=timeout, **kwargs)
+            trace.status = response.status_code
+            self.hooks.emit(AFTER_HEADERS, trace)
+            trace.response_bytes = len(response.content)
+        except (Timeout, ConnectionError) as e:
+            # A timeout shortened by the deadline, or any failure once it has passed, ends the call
+            if left is not None and ((isinstance(e, Timeout) and timeout != base_timeout) or remaining() <= 0):
+                raise self._deadline_exceeded(trace, f"after {type(e).__name__}",
+                                              sent=not isinstance(e, ConnectTimeout)) from e
+            raise
+        self.hooks.emit(AFTER_BODY, trace)
+        response.trace = trace
+        self.metrics.observe(REQUEST_DURATION, trace.duration(BEFORE_SEND, AFTER_BODY) / 1e9, family=trace.family)
+        self.metrics.inc(REQUESTS, family=trace.family, method=trace.method, status=str(trace.status))
+        self.metrics.inc(RESPONSE_BYTES, trace.response_bytes, family=trace.family)
+        return response
+
+    def _timeout_for(self, family):
+        return self.timeouts.get(family) or self.timeouts["default"]
+
+    def _pause(self, delay, trace, error):
+        # Sleep before a retry, unless the deadline would pass before the retry could finish
+        left = remaining()
+        if left is not None and left <= delay:
+            raise self._deadline_exceeded(trace, "before retrying", sent=True) from error
+        time.sleep(delay)
+
+    def _deadline_exceeded(self, trace, detail, sent=False):
+        error = DeadlineExceeded(f"Deadline exceeded {detail}: {trace.method} {trace.family} (attempt {trace.attempt + 1})",
+                                 sent=sent)
+        trace.error = error
+        self.metrics.inc(DEADLINES_EXCEEDED, family=trace.family)
+        self.hooks.emit(ON_ERROR, trace)
+        logger.error(str(error))
+        return error
+
+    def _record_retry(self, trace, reason, retries):
+        if trace.attempt + 1 < retries:
+            self.metrics.inc(RETRIES, family=trace.family, reason=reason)
+            self.hooks.emit(ON_RETRY, trace)
+
+    def _decode(self, response):
+        # response.json() with the decode time recorded per endpoint family
+        started = time.perf_counter()
+        payload = response.json()
+        self.metrics.observe(DECODE_DURATION, time.perf_counter() - started, family=endpoint_family(response.url))
+        trace = getattr(response, "trace", None)
+        if trace is not None:
+            self.hooks.emit(AFTER_DECODE, trace)
+        return payload
+
     def get_price_history(self, symbol, period_type=None, period=None, frequency_type=None, frequency=None, 
                         need_extended_hours_data=None, need_previous_close=None, start_date=None, end_date=None, 
                         periodType=None, frequencyType=None, needExtendedHoursData=None, needPreviousClose=None,
@@ -170,7 +360,8 @@ class SchwabAPI:
         :param need_extended_hours_data: Whether to include extended hours data. Boolean. Default is None.
         :param need_previous_close: Whether to include the previous close price. Boolean. Default is None.
         :param start_date: The start date for the price history in milliseconds since the epoch. Default is None.
-        :param end_date: The end date for the price history in milliseconds since the epoch. Default is None.
+        :param end_date: The end date for the price history in milliseconds since the epoch. Default is None, or the
+                         close of the current trading session when `start_date` is given.
         :param periodType: (Deprecated) Use `period_type` instead.
         :param frequencyType: (Deprecated) Use `frequency_type` instead.
         :param needExtendedHoursData: (Deprecated) Use `need_extended_hours_data` instead.
@@ -221,12 +412,15 @@ class SchwabAPI:
             params['needPreviousClose'] = str(need_previous_close).lower()
         if start_date is not None:
             params['startDate'] = start_date
+            if end_date is None:
+                # Schwab would otherwise end at the previous business day's close; use the current session instead
+                end_date = self.market_calendar.trading_session(extended=bool(need_extended_hours_data))[1]
         if end_date is not None:
             params['endDate'] = end_date
         
         response = self.get_with_retry(url, params=params)
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def get_account_numbers(self):
         """
@@ -240,15 +434,115 @@ class SchwabAPI:
         response = self.get_with_retry(url)
         response.raise_for_status()
 
-        return response.json()
+        return self._decode(response)
     
+    def get_user_preference(self):
+        """
+        Get the user preferences, including the `streamerInfo` required by the streaming client.
+
+        :return: A JSON response containing the user preferences.
+        """
+        self.ensure_valid_token()
+        url = f"{self.base_url}/trader/v1/userPreference"
+
+        response = self.get_with_retry(url)
+        response.raise_for_status()
+        return self._decode(response)
+
+    def get_account_hashes(self, refresh=False):
+        """
+        Get the hashed identifier of every account, resolved once and cached.
+
+        :param refresh: Whether to call `get_account_numbers` again instead of using the cache.
+        :return: A dictionary mapping accountNumber to hashValue.
+        """
+        with self._token_lock:
+            hit = self._account_hashes is not None and not refresh
+            self.metrics.inc(CACHE_LOOKUPS, cache="account_hashes", result="hit" if hit else "miss")
+            if not hit:
+                self._account_hashes = {
+                    account['accountNumber']: account['hashValue'] for account in self.get_account_numbers()
+                }
+            return dict(self._account_hashes)
+
+    def get_account(self, account_hash, fields=None):
+        """
+        Get the balances (and optionally positions) of a specific account.
+
+        :param account_hash: The hashed account identifier.
+        :param fields: Extra fields to include, e.g. 'positions'. Optional.
+        :return: A JSON response containing the account.
+        :raises HTTPError: If the request fails.
+        """
+        self.ensure_valid_token()
+        url = f"{self.base_url}/trader/v1/accounts/{account_hash}"
+        params = {'fields': fields} if fields is not None else None
+
+        response = self.get_with_retry(url, params=params)
+        response.raise_for_status()
+        return self._decode(response)
+
+    def for_each_account(self, func, *args, account_numbers=None, max_workers=8, return_exceptions=False, **kwargs):
+        """
+        Call an account-scoped method for several accounts concurrently.
+
+        :param func: A callable taking the account hash as its first argument, e.g. `api.get_orders`.
+        :param args: Extra positional arguments passed to `func` after the account hash.
+        :param account_numbers: The account numbers to include. Default is every account.
+        :param max_workers: The maximum number of accounts queried at the same time.
+        :param return_exceptions: If True, a failing account stores its exception instead of raising.
+        :param kwargs: Extra keyword arguments passed to `func`.
+        :return: A dictionary mapping accountNumber to the result of `func`.
+        """
+        account_hashes = self.get_account_hashes()
+        if account_numbers is not None:
+            if any(number not in account_hashes for number in account_numbers):
+                account_hashes = self.get_account_hashes(refresh=True)  # Accounts may have been linked since
+            unknown = [number for number in account_numbers if number not in account_hashes]
+            if unknown:
+                raise ValueError(f"Unknown account numbers: {', '.join(unknown)}")
+            account_hashes = {number: account_hashes[number] for number in account_numbers}
+
+        tasks = {
+            number: (lambda account_hash=account_hash: func(account_hash, *args, **kwargs))
+            for number, account_hash in account_hashes.items()
+        }
+        return run_concurrently(tasks, max_workers=max_workers, return_exceptions=return_exceptions)
+
+    def get_orders_for_accounts(self, account_numbers=None, max_workers=8, return_exceptions=False, **kwargs):
+        """
+        Retrieve orders for several accounts concurrently. Accepts the same filters as `get_orders`.
+
+        :param account_numbers: The account numbers to include. Default is every account.
+        :param max_workers: The maximum number of accounts queried at the same time.
+        :param return_exceptions: If True, a failing account stores its exception instead of raising.
+        :return: A dictionary mapping accountNumber to its list of orders.
+        """
+        return self.for_each_account(self.get_orders, account_numbers=account_numbers, max_workers=max_workers,
+                                     return_exceptions=return_exceptions, **kwargs)
+
+    def get_account_details(self, fields=None, account_numbers=None, max_workers=8, return_exceptions=False):
+        """
+        Retrieve balances (and optionally positions) for several accounts concurrently.
+
+        :param fields: Extra fields to include, e.g. 'positions'. Optional.
+        :param account_numbers: The account numbers to include. Default is every account.
+        :param max_workers: The maximum number of accounts queried at the same time.
+        :param return_exceptions: If True, a failing account stores its exception instead of raising.
+        :return: A dictionary mapping accountNumber to its account JSON.
+        """
+        return self.for_each_account(self.get_account, account_numbers=account_numbers, max_workers=max_workers,
+                                     return_exceptions=return_exceptions, fields=fields)
+
     def get_orders(self, account_hash, from_entered_time=None, to_entered_time=None, max_results=None, status=None):
         """
         Retrieve orders for a specific account within a given time range.
 
         :param account_hash: The hashed account identifier.
-        :param from_entered_time: The starting time for the order search (ISO-8601 format). Default is today at 9:30 AM.
-        :param to_entered_time: The ending time for the order search (ISO-8601 format). Default is today at 4:00 PM.
+        :param from_entered_time: The starting time for the order search (ISO-8601 format). Default is the open of
+                                  today's session (or of the previous session on weekends and holidays).
+        :param to_entered_time: The ending time for the order search (ISO-8601 format). Default is the close of that
+                                session (1:00 PM on early-close days).
         :param max_results: The maximum number of orders to retrieve. Optional. Schwab's default is 3000
         :param status: Filter orders by status (e.g., 'FILLED', 'CANCELED', etc). Optional.
         :return: A JSON response containing the orders.
@@ -259,16 +553,19 @@ class SchwabAPI:
 
         # Ensure mandatory parameters are provided
         if account_hash is None:
+            from requests.exceptions import HTTPError
+
             raise HTTPError("400 Client Error: Mandatory parameter 'account_hash' is missing.")
 
-        # Set default times if not provided
-        eastern = pytz.timezone('America/New_York')
-        now = datetime.now(eastern)
+        # Set default times if not provided, using the precomputed market calendar
+        if from_entered_time is None or to_entered_time is None:
+            from .market_calendar import to_eastern_isoformat
 
-        if from_entered_time is None:
-            from_entered_time = now.replace(hour=9, minute=30, second=0, microsecond=0).isoformat()
-        if to_entered_time is None:
-            to_entered_time = now.replace(hour=16, minute=0, second=0, microsecond=0).isoformat()
+            session_open, session_close = self.market_calendar.trading_session()
+            if from_entered_time is None:
+                from_entered_time = to_eastern_isoformat(session_open)
+            if to_entered_time is None:
+                to_entered_time = to_eastern_isoformat(session_close)
 
         # Build URL
         url = f"{self.base_url}/trader/v1/accounts/{account_hash}/orders"
@@ -285,7 +582,86 @@ class SchwabAPI:
 
         response = self.get_with_retry(url, params=params)
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
+
+    def get_orders_history(self, account_hash, from_entered_time, to_entered_time, status=None, max_results=3000,
+                           window=timedelta(days=1), min_window=timedelta(minutes=1), max_workers=4):
+        """
+        Retrieve every order in a long time range by splitting it into windows fetched concurrently.
+
+        A single `get_orders` call is capped at `max_results` orders. Any window that hits the cap is
+        halved and fetched again, so busy periods are not silently truncated. Results from all
+        windows are merged by orderId.
+
+        :param account_hash: The hashed account identifier.
+        :param from_entered_time: The start of the range, as a datetime or ISO-8601 string.
+        :param to_entered_time: The end of the range, as a datetime or ISO-8601 string.
+        :param status: Filter orders by status (e.g., 'FILLED', 'CANCELED', etc). Optional.
+        :param max_results: The maximum number of orders Schwab returns per call (Schwab's default is 3000).
+        :param window: The initial window size as a timedelta. Default is one day.
+        :param min_window: Windows are not split below this size. Default is one minute.
+        :param max_workers: The number of windows fetched at the same time.
+        :return: A list of orders, newest first.
+        :raises HTTPError: If any window fails.
+        """
+        start = _to_datetime(from_entered_time)
+        end = _to_datetime(to_entered_time)
+        if end <= start:
+            raise ValueError("to_entered_time must be after from_entered_time")
+
+        windows = []
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + window, end)
+            windows.append((window_start, window_end))
+            window_start = window_end
+
+        merged = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submit(window_start, window_end):
+                # Each window runs in a copy of the caller's context, so a deadline applies to it
+                future = executor.submit(contextvars.copy_context().run, self.get_orders, account_hash,
+                                         window_start.isoformat(), window_end.isoformat(), max_results, status)
+                pending[future] = (window_start, window_end)
+
+            pending = {}
+            for window_start, window_end in windows:
+                submit(window_start, window_end)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window_start, window_end = pending.pop(future)
+                    orders = future.result()
+                    for order in orders:
+                        merged[order.get('orderId')] = order
+
+                    if len(orders) >= max_results:
+                        if window_end - window_start > min_window:
+                            middle = window_start + (window_end - window_start) / 2
+                            logger.info(f"Order window {window_start.isoformat()} - {window_end.isoformat()} hit the {max_results} order cap. Splitting...")
+                            submit(window_start, middle)
+                            submit(middle, window_end)
+                        else:
+                            logger.error(f"Order window {window_start.isoformat()} - {window_end.isoformat()} is still capped at {max_results} orders. Results may be incomplete.")
+
+        return sorted(merged.values(), key=lambda order: order.get('enteredTime', ''), reverse=True)
+
+    def get_order(self, account_hash, order_id):
+        """
+        Retrieve a single order for a specific account.
+
+        :param account_hash: The hashed account identifier.
+        :param order_id: The Schwab order id.
+        :return: A JSON response containing the order.
+        :raises HTTPError: If the request fails.
+        """
+        self.ensure_valid_token()
+        url = f"{self.base_url}/trader/v1/accounts/{account_hash}/orders/{order_id}"
+
+        response = self.get_with_retry(url)
+        response.raise_for_status()
+        return self._decode(response)
 
     def post_order(self, account_hash, order_payload):
         """
@@ -296,6 +672,21 @@ class SchwabAPI:
         :return: The API response as a JSON object, or None if the response does not contain JSON.
         :raises HTTPError: If the request fails.
         """
+        response = self._post_order(account_hash, order_payload)
+
+        # Attempt to parse JSON if the response is not empty
+        if response.status_code == 201:
+            return None  # Returning None because a 201 status typically has no content
+        try:
+            return self._decode(response)
+        except ValueError:
+            # Response is not JSON, returning the raw response text
+            logger.error("Response did not contain JSON, returning raw text.")
+            return response.text
+
+    def _post_order(self, account_hash, order_payload):
+        # Send an order once and return the raw response, whose Location header names the new order
+        from requests.exceptions import RequestException
 
         self.ensure_valid_token()
 
@@ -307,18 +698,15 @@ class SchwabAPI:
         logger.debug("Order payload being sent:", json.dumps(order_payload, indent=4))
 
         # Use the session's post method without retries
-        response = self.session.post(url, json=order_payload)
-        response.raise_for_status()
-
-        # Attempt to parse JSON if the response is not empty
-        if response.status_code == 201:
-            return None  # Returning None because a 201 status typically has no content
+        trace = self.hooks.trace("POST", url)
         try:
-            return response.json()
-        except ValueError:
-            # Response is not JSON, returning the raw response text
-            logger.error("Response did not contain JSON, returning raw text.")
-            return response.text
+            response = self._send(trace, json=order_payload)
+            response.raise_for_status()
+        except RequestException as e:
+            trace.error = e
+            self.hooks.emit(ON_ERROR, trace)
+            raise
+        return response
 
     def place_single_order(self, account_hash, order_type, quantity, 
                            symbol, price=None, duration="DAY", session="NORMAL", 
@@ -372,30 +760,19 @@ class SchwabAPI:
         return self.post_order(account_hash, order_payload)
 
 
-    def place_first_triggers_oco_order(self, account_hash, order_type, quantity, symbol, instruction, price=None, 
-                                    stop_loss=None, profit_target=None, duration="DAY", session="NORMAL", asset_type="EQUITY",
-                                    **kwargs):
+    def build_first_triggers_oco_payload(self, order_type, quantity, symbol, instruction, price=None, stop_loss=None,
+                                         profit_target=None, duration="DAY", session="NORMAL", asset_type="EQUITY",
+                                         **kwargs):
         """
-        Place a First Triggers OCO (One-Cancels-the-Other) order with stop loss and profit target.
+        Build the payload `place_first_triggers_oco_order` sends, without sending it.
 
-        :param account_hash: The hashed account identifier.
-        :param order_type: The type of the initial order (e.g., 'MARKET', 'LIMIT').
-        :param quantity: The number of shares to buy/sell.
-        :param symbol: The symbol of the security to trade.
-        :param instruction: The main instruction value (e.g., 'BUY', 'SELL_SHORT').
-        :param price: The price at which to execute the primary order (used for LIMIT orders).
-        :param stop_loss: The stop loss price.
-        :param profit_target: The profit target price.
-        :param duration: The duration the order should remain active (default is 'DAY').
-        :param session: The session in which the order should be placed (default is 'NORMAL').
-        :param asset_type: The type of asset to trade 'EQUITY' or 'OPTION' (default is 'EQUITY')
-        :return: The API response as a JSON object.
+        Takes the same parameters as `place_first_triggers_oco_order`, minus the account.
+
+        :return: The order payload as a dictionary.
         """
-        self.ensure_valid_token()
         if stop_loss is None or profit_target is None:
             raise ValueError("Must provide both stop loss AND profit target for OCO")
 
-
         # Invert the instruction for stop loss and profit target
         inverse_instruction = get_inverse_instruction(instruction=instruction, asset_type=asset_type)
 
@@ -463,9 +840,98 @@ class SchwabAPI:
         # Add additional kwargs (e.g., taxLotMethod)
         order_payload.update(kwargs)
 
+        return order_payload
+
+    def place_first_triggers_oco_order(self, account_hash, order_type, quantity, symbol, instruction, price=None, 
+                                    stop_loss=None, profit_target=None, duration="DAY", session="NORMAL", asset_type="EQUITY",
+                                    **kwargs):
+        """
+        Place a First Triggers OCO (One-Cancels-the-Other) order with stop loss and profit target.
+
+        :param account_hash: The hashed account identifier.
+        :param order_type: The type of the initial order (e.g., 'MARKET', 'LIMIT').
+        :param quantity: The number of shares to buy/sell.
+        :param symbol: The symbol of the security to trade.
+        :param instruction: The main instruction value (e.g., 'BUY', 'SELL_SHORT').
+        :param price: The price at which to execute the primary order (used for LIMIT orders).
+        :param stop_loss: The stop loss price.
+        :param profit_target: The profit target price.
+        :param duration: The duration the order should remain active (default is 'DAY').
+        :param session: The session in which the order should be placed (default is 'NORMAL').
+        :param asset_type: The type of asset to trade 'EQUITY' or 'OPTION' (default is 'EQUITY')
+        :return: The API response as a JSON object.
+        """
+        self.ensure_valid_token()
+        order_payload = self.build_first_triggers_oco_payload(order_type, quantity, symbol, instruction, price=price,
+                                                              stop_loss=stop_loss, profit_target=profit_target,
+                                                              duration=duration, session=session,
+                                                              asset_type=asset_type, **kwargs)
+
         # Send the order
         return self.post_order(account_hash, order_payload)
 
+    # Quotes Support
+    def get_quotes(self, symbols, fields=None, indicative=None, batch_size=500, max_workers=4):
+        """
+        Fetch quotes for any number of symbols.
+
+        Symbols are packed into batches of `batch_size`, the batches are fetched concurrently and the
+        responses are merged into a single dictionary keyed by symbol.
+
+        :param symbols: A list of symbols, or a comma-separated string (e.g. 'QQQ,SPY').
+        :param fields: Sections to include, e.g. 'quote,reference'. Default is every section.
+        :param indicative: Whether to include indicative symbol quotes for ETFs. Boolean. Optional.
+        :param batch_size: The maximum number of symbols per request.
+        :param max_workers: The maximum number of batches fetched at the same time.
+        :return: A dictionary mapping symbol to its quote. Invalid symbols from every batch are merged
+                 under `errors`.
+        :raises HTTPError: If any batch fails.
+        """
+        if isinstance(symbols, str):
+            symbols = symbols.split(',')
+        symbols = list(dict.fromkeys(symbol.strip() for symbol in symbols if symbol.strip()))
+        batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+        self.ensure_valid_token()
+        url = f"{self.base_url}/marketdata/v1/quotes"
+
+        def fetch(batch):
+            params = {'symbols': ','.join(batch)}
+            if fields is not None:
+                params['fields'] = fields
+            if indicative is not None:
+                params['indicative'] = str(indicative).lower()
+            response = self.get_with_retry(url, params=params)
+            response.raise_for_status()
+            return self._decode(response)
+
+        results = run_concurrently(
+            {i: (lambda batch=batch: fetch(batch)) for i, batch in enumerate(batches)},
+            max_workers=max_workers
+        )
+
+        merged = {}
+        errors = {}
+        for i in range(len(batches)):
+            for key, value in results[i].items():
+                if key == 'errors':
+                    for error_type, error_symbols in value.items():
+                        errors.setdefault(error_type, []).extend(error_symbols)
+                else:
+                    merged[key] = value
+        if errors:
+            merged['errors'] = errors
+        return merged
+
+    def get_quote_table(self, symbols, fields='quote', batch_size=500, max_workers=4):
+        """
+        Fetch quotes like `get_quotes` and return them as a columnar QuoteTable.
+
+        :return: A QuoteTable with one row per valid symbol.
+        """
+        return QuoteTable.from_quotes(self.get_quotes(symbols, fields=fields, batch_size=batch_size,
+                                                      max_workers=max_workers))
+
     # Options Chain Support
     def get_options_chain(self, symbol, contract_type="ALL", strike_count=None, 
                         include_underlying_quote=False, strategy="SINGLE", 
@@ -502,4 +968,64 @@ class SchwabAPI:
 
         response.raise_for_status()
 
-        return response.json()
\ No newline at end of file
+        return self._decode(response)
+
+    def get_options_chain_sharded(self, symbol, from_date, to_date, shard_days=7, split_contract_types=False,
+                                  max_workers=4, shard_retries=2, on_shard=None, contract_type="ALL", **kwargs):
+        """
+        Fetch a large option chain as several smaller requests and merge them into one chain.
+
+        The expiration range is split into shards of `shard_days` (and optionally into separate CALL
+        and PUT requests). Shards are fetched concurrently, and a shard that fails is retried on its
+        own instead of redoing the whole chain.
+
+        :param symbol: The underlying symbol (e.g. '$SPX').
+        :param from_date: The first expiration date (date, datetime or 'yyyy-MM-dd' string).
+        :param to_date: The last expiration date (inclusive).
+        :param shard_days: The number of calendar days of expirations per shard.
+        :param split_contract_types: Whether to request calls and puts separately when contract_type is 'ALL'.
+        :param max_workers: The maximum number of shards fetched at the same time.
+        :param shard_retries: How many extra rounds failed shards get.
+        :param on_shard: Optional callable receiving each shard's chain as soon as it arrives.
+        :param contract_type: 'CALL', 'PUT' or 'ALL' (default).
+        :param kwargs: Any other `get_options_chain` parameter (e.g. strike_count, range_).
+        :return: The merged option chain.
+        :raises HTTPError: If a shard still fails after `shard_retries` extra rounds.
+        """
+        contract_types = ["CALL", "PUT"] if split_contract_types and contract_type == "ALL" else [contract_type]
+        shards = [
+            (shard_from, shard_to, shard_contract_type)
+            for shard_from, shard_to in plan_expiry_shards(from_date, to_date, shard_days)
+            for shard_contract_type in contract_types
+        ]
+
+        def fetch(shard):
+            shard_from, shard_to, shard_contract_type = shard
+            chain = self.get_options_chain(symbol, contract_type=shard_contract_type, from_date=shard_from,
+                                           to_date=shard_to, **kwargs)
+            if on_shard is not None:
+                on_shard(chain)
+            return chain
+
+        results = {}
+        pending = dict(enumerate(shards))
+        for attempt in range(shard_retries + 1):
+            outcomes = run_concurrently(
+                {i: (lambda shard=shard: fetch(shard)) for i, shard in pending.items()},
+                max_workers=max_workers,
+                return_exceptions=True
+            )
+            failed = {}
+            for i, outcome in outcomes.items():
+                if isinstance(outcome, Exception):
+                    logger.error(f"Option chain shard {pending[i]} failed on attempt {attempt + 1}: {outcome}")
+                    failed[i] = outcome
+                else:
+                    results[i] = outcome
+            if not failed:
+                break
+            pending = {i: shards[i] for i in failed}
+        else:
+            raise next(iter(failed.values()))
+
+        return merge_options_chains([results[i] for i in sorted(results)])
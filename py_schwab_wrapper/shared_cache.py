@@ -0,0 +1,472 @@
+# py_schwab_wrapper/shared_cache.py
+# Market data cache in shared memory, so processes on one host fetch each candle series or chain once.
+# POSIX only: cross-process locking uses fcntl.
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+from .candles import CandleSeries
+from .metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+SERIES = 1
+JSON = 2
+
+_INDEX_MAGIC = b"SCHWABC2"
+_INDEX_HEADER = struct.Struct("<8sQQ")    # magic, slots, last generation handed out
+_SLOT = struct.Struct("<QQQd")            # seq, key hash, generation, expires at (epoch seconds)
+_ENTRY_MAGIC = b"SMDC"
+_ENTRY_HEADER = struct.Struct("<4sB3xIIQQ")  # magic, kind, key length, symbol length, rows, payload length
+
+_COLUMNS = ("datetimes", "opens", "highs", "lows", "closes", "volumes")
+
+
+class _Segment(shared_memory.SharedMemory):
+    # A segment still exported to a zero-copy series cannot be closed; leave it to the OS at exit
+    def __del__(self):
+        try:
+            self.close()
+        except (BufferError, OSError):
+            pass
+
+
+def _open_segment(name, create=False, size=0):
+    """
+    Open a segment without letting this process's resource tracker own it.
+
+    Before Python 3.13, every process that creates or attaches to a segment registers it with its
+    resource tracker, which unlinks it when that process exits and pulls the data from under every
+    other process (bpo-39959). Segments here outlive their writer, so they are unregistered and
+    removed explicitly by `unlink`.
+    """
+    if sys.version_info >= (3, 13):
+        return _Segment(name=name, create=create, size=size, track=False)
+    segment = _Segment(name=name, create=create, size=size)
+    from multiprocessing import resource_tracker
+
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def _unlink(segment):
+    if sys.version_info < (3, 13):
+        from multiprocessing import resource_tracker
+
+        resource_tracker.register(segment._name, "shared_memory")  # unlink() unregisters it again
+    segment.unlink()
+
+
+def _key_hash(key):
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1  # 0 marks an empty slot
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def make_key(kind, symbol, **params):
+    """
+    :return: A cache key for a request, e.g. 'pricehistory:QQQ:frequency=1&frequency_type=minute'.
+    """
+    query = "&".join(f"{name}={value}" for name, value in sorted(params.items()) if value is not None)
+    return f"{kind}:{symbol}:{query}"
+
+
+class SharedMarketDataCache:
+    """
+    A cross-process cache of candle series and option chains in `multiprocessing.shared_memory`.
+
+    A small index segment maps key hashes to entry segments. Each entry is written once by the
+    process that fetched it; other processes attach to it by name. Candle series come back as
+    zero-copy, read-only CandleSeries whose columns are views over the shared segment, so neither
+    the HTTP request nor the JSON decoding is repeated. Option chains are stored as JSON and decoded
+    once per process.
+
+    Freshness follows the market calendar: `ttl` seconds while the market is open, and until the
+    next open while it is closed. Fetches of the same key are serialized across processes with a
+    file lock, so a cold key costs one API call however many processes ask for it.
+
+    Values returned by the cache are shared; treat them as read-only (copy a series with
+    `CandleSeries.from_price_history(series.to_dicts())` to modify it).
+    """
+
+    def __init__(self, namespace="schwab", slots=1024, ttl=60, extended=True, calendar=None, lock_dir=None):
+        """
+        :param namespace: Name shared by cooperating processes. Keep it short: segment names are
+                          limited to 31 characters on macOS.
+        :param slots: Capacity of the index. Only used by the process that creates it.
+        :param ttl: Seconds an entry stays fresh during a session.
+        :param extended: Whether pre- and post-market count as open for freshness.
+        :param calendar: MarketCalendar used for freshness. Default is the shared calendar.
+        :param lock_dir: Directory for the lock files. Default is a folder in the temp directory.
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.extended = extended
+        self._calendar = calendar
+        self.lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), f"py_schwab_wrapper-{namespace}")
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self.hits = 0    # Lookups through get_price_history/get_options_chain answered without a fetch
+        self.misses = 0
+        self._attached = {}  # key hash -> (generation, segment, value)
+        self._retired = []   # Replaced segments still exported to series handed out earlier
+        self._lock = threading.Lock()
+        with self._file_lock("index"):
+            try:
+                self._index = _open_segment(f"{namespace}_index")
+            except FileNotFoundError:
+                self._index = _open_segment(f"{namespace}_index", create=True,
+                                            size=_INDEX_HEADER.size + slots * _SLOT.size)
+                self._index.buf[:_INDEX_HEADER.size] = _INDEX_HEADER.pack(_INDEX_MAGIC, slots, 0)
+        magic, self.slots, _ = _INDEX_HEADER.unpack_from(self._index.buf)
+        if magic != _INDEX_MAGIC:
+            raise ValueError(f"Shared memory segment {namespace}_index is not a market data cache index")
+
+    @property
+    def calendar(self):
+        if self._calendar is None:
+            from .market_calendar import get_default_calendar
+
+            self._calendar = get_default_calendar()
+        return self._calendar
+
+    def get_price_history(self, api, symbol, ttl=None, **params):
+        """
+        Candles for `symbol` from the cache, or fetched through `api.get_price_history` and shared.
+
+        :param api: A SchwabAPI instance, used on a miss.
+        :param symbol: The ticker symbol.
+        :param ttl: Optional time-to-live in seconds overriding the cache default.
+        :param params: Keyword arguments for `get_price_history`, e.g. frequency_type='minute'.
+        :return: A read-only CandleSeries.
+        """
+        key = make_key("pricehistory", symbol, **params)
+        return self._get_or_fetch(api, key, SERIES, symbol, ttl,
+                                  lambda: CandleSeries.from_price_history(api.get_price_history(symbol, **params), symbol))
+
+    def get_options_chain(self, api, symbol, ttl=None, **params):
+        """
+        An option chain from the cache, or fetched through `api.get_options_chain` and shared.
+
+        :param api: A SchwabAPI instance, used on a miss.
+        :param symbol: The underlying symbol.
+        :param ttl: Optional time-to-live in seconds overriding the cache default.
+        :param params: Keyword arguments for `get_options_chain`, e.g. contract_type='CALL'.
+        :return: The chain dictionary. Shared within this process; do not modify it.
+        """
+        key = make_key("chains", symbol, **params)
+        return self._get_or_fetch(api, key, JSON, symbol, ttl, lambda: api.get_options_chain(symbol, **params))
+
+    def _get_or_fetch(self, api, key, kind, symbol, ttl, fetch):
+        value = self.get(key)
+        hit = value is not None
+        if not hit:
+            with self._file_lock(f"{_key_hash(key):016x}"):
+                value = self.get(key)  # Another process may have fetched it while this one waited
+                hit = value is not None
+                if not hit:
+                    fetched = fetch()
+                    self.put(key, fetched, kind=kind, symbol=symbol, ttl=ttl)
+                    value = self.get(key)
+                    if value is None:  # Already stale, e.g. with a ttl of 0
+                        value = fetched
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics = getattr(api, "metrics", None)
+        if metrics is not None:
+            metrics.inc(CACHE_LOOKUPS, cache="shared_memory", result="hit" if hit else "miss")
+        return value
+
+    def get(self, key):
+        """
+        :param key: A key built with `make_key`.
+        :return: The cached value, or None if it is missing or stale.
+        """
+        key_hash = _key_hash(key)
+        found = self._find(key_hash)
+        if found is None:
+            return None
+        _, generation, expires_at = found
+        if expires_at <= time.time():
+            return None
+        return self._attach(key, key_hash, generation)
+
+    def put(self, key, value, kind=None, symbol=None, ttl=None):
+        """
+        Publish a value to every process using the cache.
+
+        :param key: A key built with `make_key`.
+        :param value: A CandleSeries (or get_price_history response), or a JSON-serializable value.
+        :param kind: SERIES or JSON. Default is SERIES for a CandleSeries or a dictionary with candles,
+                     JSON otherwise.
+        :param symbol: Optional symbol stored with a series.
+        :param ttl: Optional time-to-live in seconds overriding the cache default.
+        """
+        if kind is None:
+            kind = SERIES if isinstance(value, CandleSeries) or (isinstance(value, dict) and "candles" in value) else JSON
+        if kind == SERIES and not isinstance(value, CandleSeries):
+            value = CandleSeries.from_price_history(value, symbol)
+        key_bytes = key.encode("utf-8")
+        symbol_bytes = ((value.symbol if kind == SERIES else None) or symbol or "").encode("utf-8")
+        if kind == SERIES:
+            rows = len(value)
+            payload = [memoryview(getattr(value, name)).cast("B") for name in _COLUMNS]
+        else:
+            rows = 0
+            payload = [json.dumps(value).encode("utf-8")]
+        payload_length = sum(len(part) for part in payload)
+        offset = _align(_ENTRY_HEADER.size + len(key_bytes) + len(symbol_bytes))
+        ttl = self.calendar.cache_ttl(self.ttl if ttl is None else ttl, extended=self.extended)
+        key_hash = _key_hash(key)
+
+        with self._file_lock("index"):
+            slot, previous_hash, previous_generation = self._claim(key_hash)
+            generation = self._next_generation()
+            name = self._segment_name(key_hash, generation)
+            try:
+                segment = _open_segment(name, create=True, size=max(1, offset + payload_length))
+            except FileExistsError:  # Left behind by a process that died mid-write
+                _unlink(_open_segment(name))
+                segment = _open_segment(name, create=True, size=max(1, offset + payload_length))
+            buf = segment.buf
+            _ENTRY_HEADER.pack_into(buf, 0, _ENTRY_MAGIC, kind, len(key_bytes), len(symbol_bytes), rows, payload_length)
+            start = _ENTRY_HEADER.size
+            buf[start:start + len(key_bytes)] = key_bytes
+            buf[start + len(key_bytes):start + len(key_bytes) + len(symbol_bytes)] = symbol_bytes
+            for part in payload:
+                buf[offset:offset + len(part)] = part
+                offset += len(part)
+            del buf
+            segment.close()
+            self._write_slot(slot, key_hash, generation, time.time() + ttl)
+            if previous_hash:
+                # Processes that attached to the previous segment keep their mapping
+                self._unlink_segment(self._segment_name(previous_hash, previous_generation))
+        logger.debug(f"Shared {key} for {ttl:.0f} seconds in {name}")
+
+    def invalidate(self, key):
+        """
+        Mark an entry stale for every process and remove its segment. Processes that already attached
+        to it keep their mapping.
+        """
+        key_hash = _key_hash(key)
+        with self._file_lock("index"):
+            found = self._find(key_hash)
+            if found is not None:
+                slot, generation, _ = found
+                self._retire_slot(slot, key_hash, generation)
+
+    def sweep(self):
+        """
+        Remove the segments of every expired entry. Writes already remove the expired entries they
+        come across; call this periodically on a long-running host where many keys go unused.
+
+        :return: The number of segments removed.
+        """
+        removed = 0
+        now = time.time()
+        with self._file_lock("index"):
+            for slot in range(self.slots):
+                _, key_hash, generation, expires_at = self._read_slot(slot)
+                if key_hash and 0.0 < expires_at <= now:
+                    self._retire_slot(slot, key_hash, generation)
+                    removed += 1
+        return removed
+
+    def close(self):
+        """
+        Detach this process. Series handed out earlier keep their segments mapped.
+        """
+        with self._lock:
+            segments = [segment for _, segment, _ in self._attached.values()] + self._retired
+            self._attached.clear()
+            self._retired = []
+        for segment in segments:
+            try:
+                segment.close()
+            except BufferError:
+                pass
+        self._index.close()
+
+    def unlink(self):
+        """
+        Remove the index, every entry segment and the lock files. Call it from one process when
+        the cache is no longer used by any of them.
+        """
+        with self._file_lock("index"):
+            for slot in range(self.slots):
+                _, key_hash, generation, _ = self._read_slot(slot)
+                if key_hash:
+                    self._unlink_segment(self._segment_name(key_hash, generation))
+            _unlink(self._index)
+        self.close()
+        for name in os.listdir(self.lock_dir):
+            if name.endswith(".lock"):
+                try:
+                    os.remove(os.path.join(self.lock_dir, name))
+                except OSError:
+                    pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _segment_name(self, key_hash, generation):
+        return f"{self.namespace}_{key_hash:016x}_{generation:x}"
+
+    def _next_generation(self):
+        # Generations come from one counter in the index header, so a key that is rewritten after
+        # being evicted never reuses a number another process still has attached. Callers hold the
+        # index lock.
+        magic, slots, generation = _INDEX_HEADER.unpack_from(self._index.buf)
+        generation += 1
+        _INDEX_HEADER.pack_into(self._index.buf, 0, magic, slots, generation)
+        return generation
+
+    def _retire_slot(self, slot, key_hash, generation):
+        # Unlink an entry's segment and keep the slot as a stale marker, so probe chains stay intact.
+        # An expiry of 0 means the segment is already gone. Callers hold the index lock.
+        self._unlink_segment(self._segment_name(key_hash, generation))
+        self._write_slot(slot, key_hash, generation, 0.0)
+
+    def _unlink_segment(self, name):
+        try:
+            _unlink(_open_segment(name))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _file_lock(self, name):
+        with open(os.path.join(self.lock_dir, f"{name}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _slot_offset(self, slot):
+        return _INDEX_HEADER.size + slot * _SLOT.size
+
+    def _read_slot(self, slot):
+        # Seqlock read: retry while a writer is mid-update (odd sequence) or finished one meanwhile
+        buf = self._index.buf
+        offset = self._slot_offset(slot)
+        while True:
+            seq, key_hash, generation, expires_at = _SLOT.unpack_from(buf, offset)
+            if not seq & 1 and _SLOT.unpack_from(buf, offset)[0] == seq:
+                return seq, key_hash, generation, expires_at
+            time.sleep(0)
+
+    def _write_slot(self, slot, key_hash, generation, expires_at):
+        # Callers hold the index lock
+        buf = self._index.buf
+        offset = self._slot_offset(slot)
+        seq = _SLOT.unpack_from(buf, offset)[0]
+        struct.pack_into("<Q", buf, offset, seq + 1)
+        struct.pack_into("<QQd", buf, offset + 8, key_hash, generation, expires_at)
+        struct.pack_into("<Q", buf, offset, seq + 2)
+
+    def _find(self, key_hash):
+        """
+        :return: `(slot, generation, expires_at)` for a key hash, or None if it is not in the index.
+        """
+        for probe in range(self.slots):
+            slot = (key_hash + probe) % self.slots
+            _, slot_hash, generation, expires_at = self._read_slot(slot)
+            if slot_hash == key_hash:
+                return slot, generation, expires_at
+            if slot_hash == 0:
+                return None
+        return None
+
+    def _claim(self, key_hash):
+        """
+        Find the slot to write a key to, evicting the entry closest to expiry when the index is full.
+        Expired entries passed on the way have their segments removed. Callers hold the index lock.
+
+        :return: `(slot, previous_hash, previous_generation)`. `previous_hash` is the key hash stored
+                 in the slot (this key's, or an evicted key's) and 0 for an empty slot.
+        """
+        now = time.time()
+        reusable = None
+        for probe in range(self.slots):
+            slot = (key_hash + probe) % self.slots
+            _, slot_hash, generation, expires_at = self._read_slot(slot)
+            if slot_hash == key_hash:
+                return slot, slot_hash, generation
+            if slot_hash == 0:
+                if reusable is None:
+                    return slot, 0, 0
+                break
+            if expires_at <= now:
+                if expires_at > 0.0:
+                    self._retire_slot(slot, slot_hash, generation)  # Expired; free its memory now
+                if reusable is None:
+                    reusable = slot
+        if reusable is None:
+            reusable = min(range(self.slots), key=lambda slot: self._read_slot(slot)[3])
+        _, slot_hash, generation, _ = self._read_slot(reusable)
+        return reusable, slot_hash, generation
+
+    def _attach(self, key, key_hash, generation):
+        with self._lock:
+            attached = self._attached.get(key_hash)
+            if attached is not None and attached[0] == generation:
+                return attached[2]
+        try:
+            segment = _open_segment(self._segment_name(key_hash, generation))
+        except FileNotFoundError:
+            return None  # Replaced between reading the index and attaching
+        value = self._decode(segment, key)
+        if value is None:
+            segment.close()
+            return None
+        with self._lock:
+            previous = self._attached.get(key_hash)
+            self._attached[key_hash] = (generation, segment, value)
+            if previous is not None:
+                self._retired.append(previous[1])
+            self._retired = [retired for retired in self._retired if not _try_close(retired)]
+        return value
+
+    def _decode(self, segment, key):
+        buf = segment.buf
+        magic, kind, key_length, symbol_length, rows, payload_length = _ENTRY_HEADER.unpack_from(buf)
+        start = _ENTRY_HEADER.size
+        if magic != _ENTRY_MAGIC or bytes(buf[start:start + key_length]) != key.encode("utf-8"):
+            return None  # A hash collision or a foreign segment
+        symbol = bytes(buf[start + key_length:start + key_length + symbol_length]).decode("utf-8") or None
+        offset = _align(start + key_length + symbol_length)
+        if kind == JSON:
+            return json.loads(bytes(buf[offset:offset + payload_length]))
+        series = CandleSeries(symbol)
+        for name in _COLUMNS:
+            end = offset + rows * 8
+            setattr(series, name, buf[offset:end].cast("q" if name == "datetimes" else "d").toreadonly())
+            offset = end
+        return series
+
+
+def _try_close(segment):
+    try:
+        segment.close()
+        return True
+    except BufferError:
+        return False
@@ -0,0 +1,298 @@
+# py_schwab_wrapper/streaming.py
+# Client for Schwab's WebSocket streamer (level-one quotes and chart bars).
+
+import asyncio
+import inspect
+import json
+import time
+from collections import namedtuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+LEVELONE_EQUITIES = "LEVELONE_EQUITIES"
+CHART_EQUITY = "CHART_EQUITY"
+
+# Streamer field numbers mapped to readable names
+LEVELONE_EQUITIES_FIELDS = {
+    0: "symbol", 1: "bidPrice", 2: "askPrice", 3: "lastPrice", 4: "bidSize", 5: "askSize",
+    8: "totalVolume", 9: "lastSize", 10: "highPrice", 11: "lowPrice", 12: "closePrice",
+    17: "openPrice", 18: "netChange", 33: "mark", 34: "quoteTime", 35: "tradeTime",
+}
+
+# Chart bars use the same names as the candles returned by get_price_history
+CHART_EQUITY_FIELDS = {
+    0: "symbol", 1: "open", 2: "high", 3: "low", 4: "close", 5: "volume", 6: "sequence", 7: "datetime", 8: "chartDay",
+}
+
+SERVICE_FIELDS = {
+    LEVELONE_EQUITIES: LEVELONE_EQUITIES_FIELDS,
+    CHART_EQUITY: CHART_EQUITY_FIELDS,
+}
+
+StreamEvent = namedtuple("StreamEvent", ["service", "symbol", "timestamp", "fields"])
+
+
+class StreamerError(Exception):
+    """Raised when the streamer rejects a login or the connection cannot be used."""
+
+
+def parse_message(message):
+    """
+    Turn the data section of a streamer message into StreamEvents with readable field names.
+
+    :param message: A decoded streamer message (the JSON object received over the socket).
+    :return: A list of StreamEvent tuples. Heartbeats and command responses produce no events.
+    """
+    events = []
+    for data in message.get("data", []):
+        service = data.get("service")
+        names = SERVICE_FIELDS.get(service, {})
+        for content in data.get("content", []):
+            fields = {names.get(_field_number(key), key): value for key, value in content.items()}
+            symbol = fields.pop("key", None) or fields.get("symbol")
+            fields["symbol"] = symbol
+            events.append(StreamEvent(service, symbol, data.get("timestamp"), fields))
+    return events
+
+
+def _field_number(key):
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        return key
+
+
+def _default_connect(url):
+    try:
+        import websockets
+    except ImportError:
+        raise ImportError("The streaming client requires the 'websockets' package: pip install py_schwab_wrapper[streaming]")
+    return websockets.connect(url, max_size=None)
+
+
+class SchwabStreamer:
+    """
+    Asyncio client for Schwab's WebSocket streamer.
+
+    Logs in with the access token managed by `SchwabAPI`, keeps track of subscriptions so they are
+    restored after a reconnect, watches for heartbeats and reconnects with exponential backoff.
+    Events are delivered to `on_event` and/or put on an asyncio queue.
+
+    The streamer needs the access token itself, so it cannot use a thin client of a SchwabGateway,
+    which never holds one. Give it a `SchwabAPI` with credentials instead.
+
+    Example::
+
+        streamer = SchwabStreamer(schwab_api, on_event=print)
+        await streamer.subscribe_quotes(['QQQ', 'SPY'])
+        await streamer.run()
+    """
+
+    def __init__(self, api, on_event=None, queue=None, heartbeat_timeout=30.0, reconnect_delay=1.0,
+                 max_reconnect_delay=30.0, connect=None):
+        """
+        :param api: A `SchwabAPI` instance used for the access token and streamer info.
+        :param on_event: Optional callable (or coroutine function) receiving every StreamEvent.
+        :param queue: Optional asyncio.Queue receiving every StreamEvent.
+        :param heartbeat_timeout: Seconds without any message before the connection is considered dead.
+        :param reconnect_delay: Initial delay in seconds before reconnecting.
+        :param max_reconnect_delay: Upper bound for the exponential reconnect backoff.
+        :param connect: Optional factory returning an async WebSocket connection for a URL (for tests).
+        :raises ValueError: If `api` is a thin client of a SchwabGateway.
+        """
+        if getattr(api, "gateway", None) is not None:
+            raise ValueError("SchwabStreamer needs the access token, which a gateway's thin client does not hold; "
+                             "create it with a SchwabAPI that has credentials")
+        self.api = api
+        self.on_event = on_event
+        self.queue = queue
+        self.heartbeat_timeout = heartbeat_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connect = connect or _default_connect
+
+        self.streamer_info = None
+        self.subscriptions = {}  # service -> {'keys': [symbols], 'fields': '0,1,2'}
+        self.connections = 0
+        self.last_message_at = None
+        self._websocket = None
+        self._request_id = 0
+        self._stopping = False
+
+    # Subscriptions
+
+    async def subscribe_quotes(self, symbols, fields=None):
+        """
+        Subscribe to level-one equity quotes.
+
+        :param symbols: A list of symbols (e.g. ['QQQ', 'SPY']).
+        :param fields: Optional list of field numbers. Defaults to every field in LEVELONE_EQUITIES_FIELDS.
+        """
+        await self.subscribe(LEVELONE_EQUITIES, symbols, fields or sorted(LEVELONE_EQUITIES_FIELDS))
+
+    async def unsubscribe_quotes(self, symbols):
+        await self.unsubscribe(LEVELONE_EQUITIES, symbols)
+
+    async def subscribe_chart_bars(self, symbols, fields=None):
+        """
+        Subscribe to one-minute equity chart bars.
+
+        :param symbols: A list of symbols (e.g. ['QQQ', 'SPY']).
+        :param fields: Optional list of field numbers. Defaults to every field in CHART_EQUITY_FIELDS.
+        """
+        await self.subscribe(CHART_EQUITY, symbols, fields or sorted(CHART_EQUITY_FIELDS))
+
+    async def unsubscribe_chart_bars(self, symbols):
+        await self.unsubscribe(CHART_EQUITY, symbols)
+
+    async def subscribe(self, service, symbols, fields):
+        """
+        Add symbols to a service subscription. Subscriptions made before `run` are sent after login.
+        """
+        subscription = self.subscriptions.setdefault(service, {"keys": [], "fields": ""})
+        command = "ADD" if subscription["keys"] else "SUBS"
+        new_keys = [symbol for symbol in symbols if symbol not in subscription["keys"]]
+        subscription["keys"].extend(new_keys)
+        subscription["fields"] = ",".join(str(field) for field in fields)
+        if self._websocket is not None and new_keys:
+            await self._send_request(service, command, {"keys": ",".join(new_keys), "fields": subscription["fields"]})
+
+    async def unsubscribe(self, service, symbols):
+        """
+        Remove symbols from a service subscription.
+        """
+        subscription = self.subscriptions.get(service)
+        if not subscription:
+            return
+        removed = [symbol for symbol in symbols if symbol in subscription["keys"]]
+        subscription["keys"] = [symbol for symbol in subscription["keys"] if symbol not in removed]
+        if not subscription["keys"]:
+            del self.subscriptions[service]
+        if self._websocket is not None and removed:
+            await self._send_request(service, "UNSUBS", {"keys": ",".join(removed)})
+
+    # Connection lifecycle
+
+    async def run(self):
+        """
+        Connect, log in and deliver events until `stop` is called, reconnecting whenever the
+        connection drops or heartbeats stop arriving.
+        """
+        delay = self.reconnect_delay
+        self._stopping = False
+        while not self._stopping:
+            connections = self.connections
+            try:
+                await self._run_connection()
+                delay = self.reconnect_delay
+            except StreamerError as e:
+                logger.error(f"Streamer error: {e}")
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.error(f"Streamer connection failed: {e}")
+            except Exception as e:
+                # websockets raises ConnectionClosed and friends; they are not imported eagerly
+                if self._stopping:
+                    break
+                logger.error(f"Streamer connection lost: {e}")
+
+            if self._stopping:
+                break
+            if self.connections > connections:
+                delay = self.reconnect_delay  # The login succeeded, so back off from the start again
+            logger.info(f"Reconnecting to the streamer in {delay} seconds...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def run_forever(self):
+        """
+        Blocking helper that runs the streamer on a new event loop.
+        """
+        asyncio.run(self.run())
+
+    async def stop(self):
+        """
+        Stop the streamer and close the connection.
+        """
+        self._stopping = True
+        websocket = self._websocket
+        if websocket is not None:
+            try:
+                await self._send_request("ADMIN", "LOGOUT", {})
+            except Exception:
+                pass
+            await websocket.close()
+
+    async def _run_connection(self):
+        loop = asyncio.get_running_loop()
+        # Token refreshes and the userPreference call are blocking; keep them off the event loop
+        await loop.run_in_executor(None, self.api.ensure_valid_token)
+        if self.streamer_info is None:
+            preferences = await loop.run_in_executor(None, self.api.get_user_preference)
+            self.streamer_info = preferences["streamerInfo"][0]
+
+        async with self.connect(self.streamer_info["streamerSocketUrl"]) as websocket:
+            self._websocket = websocket
+            try:
+                await self._login()
+                self.connections += 1
+                for service, subscription in list(self.subscriptions.items()):
+                    await self._send_request(service, "SUBS", {"keys": ",".join(subscription["keys"]),
+                                                               "fields": subscription["fields"]})
+                while not self._stopping:
+                    message = await self._receive()
+                    await self._handle(message)
+            finally:
+                self._websocket = None
+
+    async def _login(self):
+        request_id = await self._send_request("ADMIN", "LOGIN", {
+            "Authorization": self.api.token["access_token"],
+            "SchwabClientChannel": self.streamer_info.get("schwabClientChannel"),
+            "SchwabClientFunctionId": self.streamer_info.get("schwabClientFunctionId"),
+        })
+        while True:
+            message = await self._receive()
+            for response in message.get("response", []):
+                if response.get("command") == "LOGIN" and str(response.get("requestid")) == str(request_id):
+                    content = response.get("content", {})
+                    if content.get("code") != 0:
+                        raise StreamerError(f"Login failed with code {content.get('code')}: {content.get('msg')}")
+                    logger.info("Streamer login succeeded.")
+                    return
+            await self._handle(message)
+
+    async def _receive(self):
+        raw = await asyncio.wait_for(self._websocket.recv(), timeout=self.heartbeat_timeout)
+        self.last_message_at = time.time()
+        return json.loads(raw)
+
+    async def _send_request(self, service, command, parameters):
+        self._request_id += 1
+        request = {
+            "service": service,
+            "command": command,
+            "requestid": str(self._request_id),
+            "SchwabClientCustomerId": self.streamer_info.get("schwabClientCustomerId"),
+            "SchwabClientCorrelId": self.streamer_info.get("schwabClientCorrelId"),
+            "parameters": parameters,
+        }
+        await self._websocket.send(json.dumps({"requests": [request]}))
+        return self._request_id
+
+    async def _handle(self, message):
+        for response in message.get("response", []):
+            content = response.get("content", {})
+            if content.get("code") not in (None, 0):
+                logger.error(f"Streamer {response.get('service')} {response.get('command')} failed: {content.get('msg')}")
+
+        for event in parse_message(message):
+            if self.queue is not None:
+                self.queue.put_nowait(event)
+            if self.on_event is not None:
+                try:
+                    result = self.on_event(event)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Streamer event callback failed: {e}")
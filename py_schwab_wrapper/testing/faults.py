@@ -0,0 +1,94 @@
+# py_schwab_wrapper/testing/faults.py
+# Fault injection for the stand-in server: latency, rate limits, 5xx bursts, resets and token expiry.
+
+import json
+import math
+import random
+import threading
+
+RESET = "RESET"
+
+
+def fixed_latency(seconds):
+    """
+    :return: A latency function that always returns `seconds`.
+    """
+    return lambda rng: seconds
+
+
+def lognormal_latency(median, sigma=0.5):
+    """
+    A long-tailed latency distribution, typical of API response times.
+
+    :param median: The median latency in seconds.
+    :param sigma: The spread of the underlying normal distribution.
+    :return: A latency function for FaultInjector.
+    """
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+class FaultInjector:
+    """
+    Decides, request by request, whether the stand-in server misbehaves.
+
+    Faults only apply to the market data and trader routes; the token route stays healthy so
+    refreshes can recover from expired tokens. Decisions come from a seeded random generator,
+    so a run can be reproduced.
+    """
+
+    def __init__(self, latency=None, rate_limit=0.0, server_error=0.0, server_error_burst=1,
+                 connection_reset=0.0, expire_tokens_every=None, retry_after=None, seed=None):
+        """
+        :param latency: Optional function receiving a `random.Random` and returning a delay in seconds,
+                        e.g. `lognormal_latency(0.05)`.
+        :param rate_limit: Probability of answering 429 Too Many Requests.
+        :param server_error: Probability of starting a burst of 503 Service Unavailable responses.
+        :param server_error_burst: Number of consecutive requests a 503 burst lasts.
+        :param connection_reset: Probability of resetting the connection without a response.
+        :param expire_tokens_every: Revoke every issued access token after this many requests, as if
+                                    the tokens expired early. None never revokes.
+        :param retry_after: Optional Retry-After value, in seconds, sent with 429 responses.
+        :param seed: Seed for the random generator.
+        """
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.server_error = server_error
+        self.server_error_burst = server_error_burst
+        self.connection_reset = connection_reset
+        self.expire_tokens_every = expire_tokens_every
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.counts = {"requests": 0, "rate_limited": 0, "server_errors": 0, "resets": 0, "token_expiries": 0}
+        self._burst_left = 0
+        self._lock = threading.Lock()
+
+    def decide(self):
+        """
+        :return: A tuple `(fault, delay, expire_tokens)`. `fault` is None (serve normally), RESET, or a
+                 `(status, headers, body)` response; `delay` is seconds to wait before answering.
+        """
+        with self._lock:
+            self.counts["requests"] += 1
+            delay = self.latency(self.random) if self.latency else 0.0
+            expire = bool(self.expire_tokens_every) and self.counts["requests"] % self.expire_tokens_every == 0
+            if expire:
+                self.counts["token_expiries"] += 1
+
+            if self._burst_left > 0 or self.random.random() < self.server_error:
+                self._burst_left = (self._burst_left or self.server_error_burst) - 1
+                self.counts["server_errors"] += 1
+                return (503, {}, _error(503, "Service Unavailable")), delay, expire
+            roll = self.random.random()
+            if roll < self.rate_limit:
+                self.counts["rate_limited"] += 1
+                headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+                return (429, headers, _error(429, "Too Many Requests")), delay, expire
+            if roll < self.rate_limit + self.connection_reset:
+                self.counts["resets"] += 1
+                return RESET, delay, expire
+            return None, delay, expire
+
+
+def _error(status, title):
+    return json.dumps({"errors": [{"status": status, "title": title}]}).encode("utf-8")
@@ -0,0 +1,138 @@
+# py_schwab_wrapper/testing/load.py
+# Drives a SchwabAPI client at a fixed concurrency and reports throughput, latency and retries.
+
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values, fraction):
+    """
+    :param sorted_values: Values sorted in increasing order.
+    :param fraction: The percentile as a fraction, e.g. 0.99.
+    :return: The nearest-rank percentile, or 0.0 for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = min(max(1, math.ceil(fraction * len(sorted_values))), len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+class LoadReport:
+    """
+    The outcome of a load run.
+
+    `attempts` counts the HTTP requests the server saw, so `wasted_retries` is every request beyond
+    one per successful call: retries after faults plus the attempts of calls that failed anyway.
+    """
+
+    def __init__(self, elapsed, latencies, errors, attempts=None, refreshes=None):
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.attempts = attempts
+        self.refreshes = refreshes
+
+    @property
+    def successes(self):
+        return len(self.latencies)
+
+    @property
+    def failures(self):
+        return sum(self.errors.values())
+
+    @property
+    def calls(self):
+        return self.successes + self.failures
+
+    @property
+    def throughput(self):
+        return self.successes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def wasted_retries(self):
+        return self.attempts - self.successes if self.attempts is not None else None
+
+    def as_dict(self):
+        """
+        :return: The report as a JSON-serializable dictionary. Latencies are in seconds.
+        """
+        return {
+            "elapsed": self.elapsed,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "errors": dict(self.errors),
+            "throughput": self.throughput,
+            "p50": percentile(self.latencies, 0.50),
+            "p90": percentile(self.latencies, 0.90),
+            "p99": percentile(self.latencies, 0.99),
+            "max": self.latencies[-1] if self.latencies else 0.0,
+            "attempts": self.attempts,
+            "wasted_retries": self.wasted_retries,
+            "token_refreshes": self.refreshes,
+        }
+
+
+def run_load(call, concurrency=8, duration=None, total_calls=None, server=None):
+    """
+    Call `call()` from `concurrency` threads until `duration` seconds pass or `total_calls` calls finish.
+
+    :param call: Callable performing one logical operation, e.g. `lambda: api.get_quotes(["QQQ"])`.
+    :param concurrency: Number of threads calling at the same time.
+    :param duration: Optional run time in seconds.
+    :param total_calls: Optional number of calls to make.
+    :param server: Optional StandInServer, used to count HTTP attempts and token refreshes.
+    :return: A LoadReport. Successful calls contribute latencies; failures are counted by exception type.
+    """
+    if duration is None and total_calls is None:
+        raise ValueError("Provide a duration or a number of calls")
+
+    lock = threading.Lock()
+    latencies = []
+    errors = {}
+    issued = [0]
+    deadline = time.perf_counter() + duration if duration is not None else None
+    requests_before = len(server.requests) if server is not None else 0
+    tokens_before = server.tokens_issued if server is not None else 0
+
+    def claim():
+        with lock:
+            if total_calls is not None and issued[0] >= total_calls:
+                return False
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            issued[0] += 1
+            return True
+
+    def worker():
+        while claim():
+            started = time.perf_counter()
+            try:
+                call()
+            except Exception as e:
+                with lock:
+                    name = type(e).__name__
+                    errors[name] = errors.get(name, 0) + 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    attempts = refreshes = None
+    if server is not None:
+        attempts = sum(1 for _, path, _ in server.requests[requests_before:] if not path.startswith("/v1/oauth"))
+        refreshes = server.tokens_issued - tokens_before
+    report = LoadReport(elapsed, latencies, errors, attempts, refreshes)
+    logger.info(f"Load run finished: {report.as_dict()}")
+    return report
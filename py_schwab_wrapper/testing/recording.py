@@ -0,0 +1,192 @@
+# py_schwab_wrapper/testing/recording.py
+# Record real API traffic to compressed fixtures and replay it offline.
+
+import base64
+import gzip
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Response fields replaced before a recording is written, so fixtures never hold credentials
+REDACTED_FIELDS = ("access_token", "refresh_token", "id_token")
+REDACTED = "REDACTED"
+
+# Response headers kept in a recording
+RECORDED_HEADERS = ("Content-Type", "Location", "Retry-After")
+
+
+def request_key(method, url):
+    """
+    :param method: The HTTP method.
+    :param url: The full request URL.
+    :return: A `(method, path, query)` tuple with the query parameters sorted, independent of the host.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return method.upper(), parts.path, query
+
+
+def _redact(body):
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return body
+    if isinstance(payload, dict) and any(field in payload for field in REDACTED_FIELDS):
+        for field in REDACTED_FIELDS:
+            if field in payload:
+                payload[field] = REDACTED
+        return json.dumps(payload).encode("utf-8")
+    return body
+
+
+def load_recording(path):
+    """
+    :param path: A recording written by RecordingAdapter (gzip-compressed JSON lines).
+    :return: A list of entries with method, path, query, status, headers, body (bytes) and elapsed keys.
+    """
+    entries = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entry["body"] = base64.b64decode(entry["body"])
+                entries.append(entry)
+    return entries
+
+
+def save_recording(path, entries):
+    """
+    :param path: The file to write.
+    :param entries: Entries in the `load_recording` format.
+    """
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(dict(entry, body=base64.b64encode(entry["body"]).decode("ascii"))) + "\n")
+
+
+class ReplayIndex:
+    """
+    Looks up recorded responses by method, path and query.
+
+    Repeated requests get the recorded responses in order, and the last one again once they run
+    out. A request whose query was never recorded falls back to any recording of the same path.
+    """
+
+    def __init__(self, entries):
+        self._exact = {}
+        self._by_path = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        for entry in entries:
+            self._exact.setdefault((entry["method"], entry["path"], entry["query"]), []).append(entry)
+            self._by_path.setdefault((entry["method"], entry["path"]), []).append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._exact.values())
+
+    def find(self, method, path, query=""):
+        """
+        :return: The next recorded entry for the request, or None if nothing matches.
+        """
+        key = (method, path, query)
+        candidates = self._exact.get(key)
+        if candidates is None:
+            key = (method, path)
+            candidates = self._by_path.get(key)
+        if not candidates:
+            return None
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+        return candidates[min(position, len(candidates) - 1)]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    A requests transport adapter that records responses to a fixture file, or replays them.
+
+    In "record" mode requests go to the network and every response is kept (credentials redacted)
+    until `save` or `close` writes the recording. In "replay" mode nothing touches the network:
+    responses come from the recording, optionally after sleeping for the originally measured latency.
+    """
+
+    def __init__(self, path, mode="replay", replay_latency=True, latency_scale=1.0, **kwargs):
+        """
+        :param path: The recording file (gzip-compressed JSON lines).
+        :param mode: "record" or "replay".
+        :param replay_latency: Whether replayed responses wait for their recorded latency.
+        :param latency_scale: Multiplier applied to recorded latencies, e.g. 0 to replay at full speed.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid mode: {mode}")
+        super().__init__(**kwargs)
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+        self.entries = []
+        self._lock = threading.Lock()
+        self._index = ReplayIndex(load_recording(path)) if mode == "replay" else None
+
+    def send(self, request, **kwargs):
+        if self.mode == "record":
+            response = super().send(request, **kwargs)
+            self._record(request, response)
+            return response
+
+        method, path, query = request_key(request.method, request.url)
+        entry = self._index.find(method, path, query)
+        if entry is None:
+            raise LookupError(f"No recorded response for {method} {path}?{query}")
+        if self.replay_latency and entry.get("elapsed"):
+            time.sleep(entry["elapsed"] * self.latency_scale)
+        return self._build_response(request, entry)
+
+    def _record(self, request, response):
+        method, path, query = request_key(request.method, request.url)
+        entry = {
+            "method": method,
+            "path": path,
+            "query": query,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            "body": _redact(response.content),
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def _build_response(self, request, entry):
+        response = Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "Recorded"
+        response.elapsed = timedelta(seconds=entry.get("elapsed") or 0)
+        response.connection = self
+        return response
+
+    def save(self):
+        """
+        Write the recorded entries. Does nothing in replay mode.
+        """
+        if self.mode == "record":
+            with self._lock:
+                save_recording(self.path, self.entries)
+            logger.info(f"Saved {len(self.entries)} recorded responses to {self.path}")
+
+    def close(self):
+        self.save()
+        super().close()
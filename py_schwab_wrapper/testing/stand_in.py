@@ -0,0 +1,219 @@
+# py_schwab_wrapper/testing/stand_in.py
+# A local HTTP server standing in for the Schwab API, serving recorded fixtures.
+
+import json
+import logging
+import socket
+import struct
+import sys
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from .faults import RESET
+from .recording import ReplayIndex, load_recording, request_key
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATH = "/v1/oauth/token"
+SERVED_PREFIXES = ("/marketdata/v1/", "/trader/v1/")
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up before the response is written
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            logger.debug(f"Client {client_address} disconnected: {sys.exc_info()[1]}")
+        else:
+            super().handle_error(request, client_address)
+
+
+class StandInServer:
+    """
+    Serves `/v1/oauth/token`, `/marketdata/v1/*` and `/trader/v1/*` on a local port.
+
+    Responses come from routes added with `add_route` first, then from recordings made with
+    RecordingAdapter. The token route always issues a fresh token, and posting an order returns
+    201 with a Location header like the real API. Everything else is a 404. An optional
+    FaultInjector makes the market data and trader routes slow or unreliable.
+
+    Use it as a context manager, and point SchwabAPI at it with `base_url=server.base_url`.
+    """
+
+    def __init__(self, recordings=(), host="127.0.0.1", port=0, replay_latency=False, latency_scale=1.0,
+                 token_lifetime=1800, faults=None, check_auth=None):
+        """
+        :param recordings: Paths of recordings to serve.
+        :param host: The interface to listen on.
+        :param port: The port to listen on. Default is any free port.
+        :param replay_latency: Whether responses wait for their recorded latency.
+        :param latency_scale: Multiplier applied to recorded latencies.
+        :param token_lifetime: The `expires_in` value of issued tokens, in seconds.
+        :param faults: Optional FaultInjector.
+        :param check_auth: Whether requests need a bearer token issued by this server (401 otherwise).
+                           Default is True when `faults` can expire tokens.
+        """
+        entries = []
+        for path in recordings:
+            entries.extend(load_recording(path))
+        self.index = ReplayIndex(entries)
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+        self.token_lifetime = token_lifetime
+        self.routes = {}
+        self.requests = []
+        self.tokens_issued = 0
+        self.faults = faults
+        self.check_auth = check_auth if check_auth is not None else bool(faults and faults.expire_tokens_every)
+        self.valid_tokens = set()
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_route(self, method, path, body=None, status=200, headers=None):
+        """
+        Serve a fixed response for every request to `path`, whatever the query string.
+
+        :param method: The HTTP method, e.g. 'GET'.
+        :param path: The request path, e.g. '/marketdata/v1/quotes'.
+        :param body: A JSON-serializable body, bytes, or a callable receiving `(method, path, query, body)`
+                     and returning `(status, headers, body)`.
+        :param status: The status code when `body` is not callable.
+        :param headers: Optional response headers when `body` is not callable.
+        """
+        self.routes[(method.upper(), path)] = (body, status, headers or {})
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="schwab-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def issue_token(self):
+        """
+        :return: A new token response body.
+        """
+        access_token = f"stand-in-{uuid.uuid4().hex}"
+        with self._lock:
+            self.tokens_issued += 1
+            self.valid_tokens.add(access_token)
+        return {
+            "access_token": access_token,
+            "refresh_token": "stand-in-refresh",
+            "token_type": "Bearer",
+            "expires_in": self.token_lifetime,
+            "scope": "api",
+        }
+
+    def respond(self, method, path, query, body, authorization=None):
+        """
+        Resolve a request to a response.
+
+        :return: A tuple `(status, headers, body_bytes, delay_seconds)`. A status of None means the
+                 connection should be reset without a response.
+        """
+        delay = 0.0
+        if path.startswith(SERVED_PREFIXES):
+            if self.faults is not None:
+                fault, delay, expire = self.faults.decide()
+                if expire:
+                    with self._lock:
+                        self.valid_tokens.clear()
+                if fault == RESET:
+                    return None, {}, b"", delay
+                if fault is not None:
+                    status, headers, payload = fault
+                    return status, dict(headers, **{"Content-Type": "application/json"}), payload, delay
+            if self.check_auth and (authorization or "")[len("Bearer "):] not in self.valid_tokens:
+                return 401, {"Content-Type": "application/json"}, _encode({"errors": [{"status": 401, "title": "Unauthorized"}]}), delay
+
+        status, headers, payload, extra = self._resolve(method, path, query, body)
+        return status, headers, payload, delay + extra
+
+    def _resolve(self, method, path, query, body):
+        route = self.routes.get((method, path))
+        if route is not None:
+            payload, status, headers = route
+            if callable(payload):
+                status, headers, payload = payload(method, path, query, body)
+            return status, headers, _encode(payload), 0.0
+
+        if method == "POST" and path == TOKEN_PATH:
+            return 200, {"Content-Type": "application/json"}, _encode(self.issue_token()), 0.0
+
+        if path.startswith(SERVED_PREFIXES):
+            entry = self.index.find(method, path, query)
+            if entry is not None:
+                delay = entry.get("elapsed", 0.0) * self.latency_scale if self.replay_latency else 0.0
+                return entry["status"], entry["headers"], entry["body"], delay
+            if method == "POST" and path.startswith("/trader/v1/accounts/") and path.endswith("/orders"):
+                order_id = int(time.time() * 1000)
+                return 201, {"Location": f"{self.base_url}{path}/{order_id}"}, b"", 0.0
+
+        return 404, {"Content-Type": "application/json"}, _encode({"errors": [{"status": 404, "title": "Not Found"}]}), 0.0
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                method, path, query = request_key(self.command, self.path)
+                with server._lock:
+                    server.requests.append((method, path, query))
+                status, headers, payload, delay = server.respond(method, path, query, body,
+                                                                 self.headers.get("Authorization"))
+                if delay:
+                    time.sleep(delay)
+                if status is None:
+                    # Close with a TCP reset instead of a response
+                    self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                    self.close_connection = True
+                    return
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if not any(name.lower() == "content-type" for name in headers):
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+def _encode(payload):
+    if payload is None:
+        return b""
+    if isinstance(payload, bytes):
+        return payload
+    return json.dumps(payload).encode("utf-8")
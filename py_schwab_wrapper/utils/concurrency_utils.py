@@ -0,0 +1,35 @@
+# concurrency_utils.py
+# Contains helpers used to run independent API calls concurrently.
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_concurrently(tasks, max_workers=8, return_exceptions=False):
+    """
+    Run independent callables on a thread pool and collect their results by key.
+
+    Each callable runs in a copy of the caller's context, so a `deadline()` set around the call applies to it.
+
+    :param tasks: A dictionary mapping a key to a callable taking no arguments.
+    :param max_workers: The maximum number of callables running at the same time.
+    :param return_exceptions: If True, a failing callable stores its exception as the result for its key.
+                              If False (default), the first exception (in key order) is raised.
+    :return: A dictionary mapping each key to the result of its callable.
+    """
+    if not tasks:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        futures = {key: executor.submit(contextvars.copy_context().run, task) for key, task in tasks.items()}
+
+    results = {}
+    for key, future in futures.items():
+        exception = future.exception()
+        if exception is not None:
+            if not return_exceptions:
+                raise exception
+            results[key] = exception
+        else:
+            results[key] = future.result()
+    return results
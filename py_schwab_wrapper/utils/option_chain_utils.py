@@ -0,0 +1,81 @@
+# option_chain_utils.py
+# Contains utils used to split option chain requests into shards and merge the results.
+
+from datetime import date, datetime, timedelta
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def plan_expiry_shards(from_date, to_date, shard_days=7):
+    """
+    Split an expiration date range into consecutive, non-overlapping shards.
+
+    :param from_date: The first expiration date (date, datetime or 'yyyy-MM-dd' string).
+    :param to_date: The last expiration date (inclusive).
+    :param shard_days: The number of calendar days covered by each shard.
+    :return: A list of (from_date, to_date) tuples formatted as 'yyyy-MM-dd' strings.
+    """
+    if shard_days < 1:
+        raise ValueError("shard_days must be at least 1")
+    start = _to_date(from_date)
+    end = _to_date(to_date)
+    if end < start:
+        raise ValueError("to_date must not be before from_date")
+
+    shards = []
+    while start <= end:
+        shard_end = min(start + timedelta(days=shard_days - 1), end)
+        shards.append((start.isoformat(), shard_end.isoformat()))
+        start = shard_end + timedelta(days=1)
+    return shards
+
+
+def merge_options_chains(chains):
+    """
+    Merge option chain responses for the same underlying into a single chain.
+
+    Top-level fields come from the first chain; expiration maps are merged and
+    `numberOfContracts` is recounted from the merged maps.
+
+    :param chains: A list of option chain JSON responses, e.g. one per shard.
+    :return: A single option chain dictionary.
+    """
+    if not chains:
+        return {}
+
+    merged = {key: value for key, value in chains[0].items() if key not in ("callExpDateMap", "putExpDateMap")}
+    for map_name in ("callExpDateMap", "putExpDateMap"):
+        merged_map = {}
+        for chain in chains:
+            for expiration, strikes in chain.get(map_name, {}).items():
+                merged_map.setdefault(expiration, {}).update(strikes)
+        merged[map_name] = dict(sorted(merged_map.items()))
+
+    merged["numberOfContracts"] = len(flatten_options_chain(merged))
+    if any(chain.get("isChainTruncated") for chain in chains):
+        merged["isChainTruncated"] = True
+    if any(chain.get("status") not in (None, "SUCCESS") for chain in chains):
+        merged["status"] = next(chain["status"] for chain in chains if chain.get("status") not in (None, "SUCCESS"))
+    return merged
+
+
+def flatten_options_chain(chain):
+    """
+    Flatten the nested expiration and strike maps of an option chain into a single list.
+
+    :param chain: An option chain JSON response.
+    :return: A list of the contract dictionaries (calls first, then puts), in map order.
+    """
+    return [
+        contract
+        for map_name in ("callExpDateMap", "putExpDateMap")
+        for strikes in chain.get(map_name, {}).values()
+        for contracts in strikes.values()
+        for contract in contracts
+    ]
@@ -12,7 +12,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/CodeAndCandlesticks/py-schwab-wrapper", 
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*", "tests", "tests.*"]),
     install_requires=[
         "requests",
         "python-dotenv",
@@ -20,10 +20,21 @@ setup(
         "flask",
         "requests-oauthlib"
     ],
+    extras_require={
+        "streaming": ["websockets"],
+        "http2": ["httpx[http2]"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
+        "Programming Language :: Python :: 3.13",
         "License :: OSI Approved :: MIT License", 
-        "Operating System :: OS Independent",
+        "Operating System :: POSIX",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.8',
 )
\ No newline at end of file
@@ -0,0 +1,53 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from py_schwab_wrapper.schwab_api import SchwabAPI
+
+@pytest.fixture
+def schwab_api(monkeypatch, requests_mock):
+    # Mock the token refresh POST request
+    requests_mock.post(
+        "https://api.schwabapi.com/v1/oauth/token",
+        json={
+            "expires_in": 1800,
+            "token_type": "Bearer",
+            "scope": "api",
+            "refresh_token": "mock_refresh_token",
+            "access_token": "mock_access_token",
+            "id_token": "mock_id_token",
+            "expires_at": 1726754346.9192016
+        }
+    )
+    
+    # Mock the load_token function to return a test token
+    def mock_load_token(self):
+        return {
+            "expires_in": 1800,
+            "token_type": "Bearer",
+            "scope": "api",
+            "refresh_token": "mock_refresh_token",
+            "access_token": "mock_access_token",
+            "id_token": "mock_id_token",
+            "expires_at": 1726754346.9192016
+        }
+    
+    # Mock the save_token function to do nothing (prevent writing to file)
+    def mock_save_token(self, token_data):
+        pass  # Do nothing
+
+    def mock_ensure_valid_token(self):
+        pass
+
+    def mock_refresh_token(self):
+        pass
+    
+    # Correct paths for both load_token and save_token
+    monkeypatch.setattr('py_schwab_wrapper.schwab_api.SchwabAPI.load_token', mock_load_token)
+    monkeypatch.setattr('py_schwab_wrapper.schwab_api.SchwabAPI.save_token', mock_save_token)
+    monkeypatch.setattr('py_schwab_wrapper.schwab_api.SchwabAPI.ensure_valid_token', mock_ensure_valid_token)
+    monkeypatch.setattr('py_schwab_wrapper.schwab_api.SchwabAPI.refresh_token', mock_refresh_token)
+    
+    api = SchwabAPI(client_id="test_client_id", client_secret="test_client_secret")
+
+    return api
@@ -0,0 +1,67 @@
+import json
+import os
+import pytest
+from py_schwab_wrapper.backtest import simulate_first_triggers_oco, summarize, sweep_brackets, STOP, LIMIT, EXPIRED, OPEN
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "test_data")
+MINUTE = 60000
+START = 1724423400000  # 2024-08-23 09:30 ET
+
+def make_candles(bars, start=START):
+    # bars: (open, high, low, close)
+    return [{"open": o, "high": h, "low": l, "close": c, "volume": 100, "datetime": start + i * MINUTE}
+            for i, (o, h, l, c) in enumerate(bars)]
+
+def test_long_bracket_hits_target_with_inverse_instruction():
+    candles = make_candles([(100, 101, 99, 100), (100, 101, 99.5, 100.5), (100.5, 103, 100, 102.5)])
+
+    trade, = simulate_first_triggers_oco(candles, [0], stop_loss=98.0, profit_target=102.0)
+
+    assert (trade.entry_index, trade.entry_price) == (1, 100)
+    assert (trade.exit_index, trade.exit_price, trade.exit_reason) == (2, 102.0, LIMIT)
+    assert trade.exit_instruction == "SELL"
+    assert trade.pnl == 2.0
+
+def test_stop_gaps_through_and_wins_ambiguous_bars():
+    candles = make_candles([(100, 101, 99, 100), (100, 100, 99, 99.5), (97, 98, 96, 97.5)])
+    short = make_candles([(100, 101, 99, 100), (100, 103, 97, 100)])
+
+    long_trade, = simulate_first_triggers_oco(candles, [0], stop_loss=98.0, profit_target=102.0)
+    short_trade, = simulate_first_triggers_oco(short, [0], stop_loss=102.0, profit_target=98.0, instruction="SELL_SHORT")
+    optimistic, = simulate_first_triggers_oco(short, [0], stop_loss=102.0, profit_target=98.0,
+                                             instruction="SELL_SHORT", stop_first=False)
+
+    assert (long_trade.exit_price, long_trade.exit_reason) == (97, STOP)
+    assert (short_trade.exit_price, short_trade.exit_reason, short_trade.exit_instruction) == (102.0, STOP, "BUY_TO_COVER")
+    assert short_trade.pnl == -2.0
+    assert (optimistic.exit_reason, optimistic.pnl) == (LIMIT, 2.0)
+
+def test_day_orders_expire_at_the_session_end():
+    flat = [(100, 100.5, 99.5, 100)] * 3
+    monday = START + 3 * 86400000
+    candles = make_candles(flat) + make_candles(flat, start=monday)
+
+    day_trade, next_trade = simulate_first_triggers_oco(candles, [0, 3], stop_loss=90.0, profit_target=110.0)
+    gtc_trade, = simulate_first_triggers_oco(candles, [0, 3], stop_loss=90.0, profit_target=110.0,
+                                             duration="GOOD_TILL_CANCEL")
+    unfilled = simulate_first_triggers_oco(candles, [0], stop_loss=90.0, profit_target=110.0,
+                                           order_type="LIMIT", price=95.0)
+
+    assert (day_trade.exit_index, day_trade.exit_reason) == (2, EXPIRED)
+    assert (next_trade.exit_index, next_trade.exit_reason) == (5, OPEN)
+    assert (gtc_trade.exit_index, gtc_trade.exit_reason) == (5, OPEN)
+    assert unfilled == []
+    with pytest.raises(ValueError):
+        simulate_first_triggers_oco(candles, [0], 90.0, 110.0, instruction="HOLD")
+
+def test_sweep_over_fixture_history():
+    with open(os.path.join(TEST_DATA, "QQQ-default.json")) as f:
+        history = json.load(f)
+    entries = list(range(0, 10000, 25))
+
+    results = sweep_brackets(history, entries, [0.5, 1.0, 2.0], [0.5, 1.0, 2.0])
+
+    assert len(results) == 9
+    assert results[0]["total_pnl"] >= results[-1]["total_pnl"]
+    assert all(result["trades"] > 0 for result in results)
+    assert summarize([])["trades"] == 0
@@ -0,0 +1,63 @@
+from py_schwab_wrapper.bar_aggregator import BarAggregator
+from py_schwab_wrapper.candle_store import CandleStore
+from py_schwab_wrapper.streaming import StreamEvent, LEVELONE_EQUITIES, CHART_EQUITY
+
+MINUTE = 60000
+START = 1724423400000  # 2024-08-23 09:30 ET
+
+def test_ticks_build_ohlcv_bars_in_price_history_schema():
+    store = CandleStore()
+    aggregator = BarAggregator(interval_ms=5 * MINUTE, store=store)
+
+    aggregator.update("QQQ", 480.0, 100, START + 1000)
+    aggregator.update("QQQ", 481.0, 50, START + MINUTE)
+    aggregator.update("QQQ", 479.5, 25, START + 2 * MINUTE)
+    aggregator.update("QQQ", 480.5, 10, START + 4 * MINUTE)
+    aggregator.update("QQQ", 482.0, 5, START + 5 * MINUTE)  # Starts the next bar
+
+    history = store.get_price_history("QQQ")
+    assert history["empty"] is False
+    assert history["candles"] == [
+        {"open": 480.0, "high": 481.0, "low": 479.5, "close": 480.5, "volume": 185, "datetime": START}
+    ]
+    assert aggregator.current_bar("QQQ")["open"] == 482.0
+
+def test_flush_closes_idle_symbols_and_ignores_late_ticks():
+    bars = []
+    aggregator = BarAggregator(interval_ms=MINUTE, capacity=2, on_bar=lambda symbol, candle: bars.append((symbol, candle)))
+
+    for i, symbol in enumerate(["QQQ", "SPY", "IWM", "DIA"]):  # More symbols than the initial capacity
+        aggregator.update(symbol, 100.0 + i, 1, START + 1000)
+
+    assert aggregator.flush(START + MINUTE - 1) == 0
+    assert aggregator.flush(START + MINUTE) == 4
+    assert [symbol for symbol, _ in bars] == ["QQQ", "SPY", "IWM", "DIA"]
+
+    aggregator.update("QQQ", 90.0, 1, START + 2000)  # Belongs to a bar that was already closed
+    assert aggregator.late_ticks == 1
+    assert aggregator.current_bar("QQQ") is None
+
+def test_stream_events_feed_the_aggregator():
+    aggregator = BarAggregator(interval_ms=5 * MINUTE)
+
+    aggregator.on_stream_event(StreamEvent(LEVELONE_EQUITIES, "QQQ", START, {"symbol": "QQQ", "lastPrice": 480.0, "totalVolume": 1000, "tradeTime": START}))
+    aggregator.on_stream_event(StreamEvent(LEVELONE_EQUITIES, "QQQ", START, {"symbol": "QQQ", "bidPrice": 479.9}))
+    aggregator.on_stream_event(StreamEvent(LEVELONE_EQUITIES, "QQQ", START, {"symbol": "QQQ", "lastPrice": 480.2, "totalVolume": 1300, "tradeTime": START + 1000}))
+    aggregator.on_stream_event(StreamEvent(CHART_EQUITY, "SPY", START, {"symbol": "SPY", "open": 560.0, "high": 561.0, "low": 559.0, "close": 560.5, "volume": 2000.0, "datetime": START}))
+    aggregator.on_stream_event(StreamEvent(CHART_EQUITY, "SPY", START, {"symbol": "SPY", "open": 560.5, "high": 562.0, "low": 560.0, "close": 561.5, "volume": 1000.0, "datetime": START + MINUTE}))
+
+    assert aggregator.current_bar("QQQ") == {"open": 480.0, "high": 480.2, "low": 480.0, "close": 480.2, "volume": 300, "datetime": START}
+    assert aggregator.current_bar("SPY") == {"open": 560.0, "high": 562.0, "low": 559.0, "close": 561.5, "volume": 3000, "datetime": START}
+
+def test_candle_store_persists_and_slices(tmp_path):
+    store = CandleStore(directory=str(tmp_path))
+    store.append("QQQ", {"open": 1, "high": 1, "low": 1, "close": 1, "volume": 1, "datetime": START + MINUTE})
+    store.append("QQQ", {"open": 2, "high": 2, "low": 2, "close": 2, "volume": 2, "datetime": START})
+    store.append("QQQ", {"open": 3, "high": 3, "low": 3, "close": 3, "volume": 3, "datetime": START})
+
+    reloaded = CandleStore(directory=str(tmp_path))
+    history = reloaded.get_price_history("QQQ", start_date=START, end_date=START)
+
+    assert [c["open"] for c in reloaded.get_price_history("QQQ")["candles"]] == [3, 1]
+    assert [c["open"] for c in history["candles"]] == [3]
+    assert reloaded.get_price_history("SPY")["empty"] is True
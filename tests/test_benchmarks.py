@@ -0,0 +1,29 @@
+import json
+from benchmarks.runner import run_benchmarks, compare, main
+
+def test_run_benchmarks_smoke():
+    results = run_benchmarks(["first_triggers_oco_payload", "options_chain_flatten"], rounds=1, scale=0.01)
+
+    assert set(results["results"]) == {"first_triggers_oco_payload", "options_chain_flatten"}
+    assert results["results"]["first_triggers_oco_payload"]["number"] == 200
+    assert results["results"]["options_chain_flatten"]["ops_per_s"] > 0
+    assert "python" in results["meta"]
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {"results": {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}, "gone": {"median_s": 1.0}}}
+    results = {"results": {"a": {"median_s": 1.2}, "b": {"median_s": 1.2}, "new": {"median_s": 1.0}}}
+
+    rows = compare(results, baseline, thresholds={"b": 0.1}, default_threshold=0.25)
+
+    assert [(name, regressed) for name, _, _, _, regressed in rows] == [("a", False), ("b", True)]
+
+def test_main_writes_results_and_fails_on_regression(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(["--only", "ensure_valid_token", "--rounds", "1", "--scale", "0.01", "--output", str(output)]) == 0
+
+    baseline = json.loads(output.read_text())
+    baseline["results"]["ensure_valid_token"]["median_s"] /= 100
+    slower = tmp_path / "baseline.json"
+    slower.write_text(json.dumps(baseline))
+
+    assert main(["--only", "ensure_valid_token", "--rounds", "1", "--scale", "0.01", "--baseline", str(slower)]) == 1
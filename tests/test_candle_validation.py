@@ -0,0 +1,56 @@
+import copy
+import json
+import os
+from py_schwab_wrapper.candle_validation import (
+    validate_candles, backfill_price_history, OUT_OF_ORDER, OFF_SESSION, DUPLICATE, OHLC, GAP
+)
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "test_data")
+
+def load_history():
+    with open(os.path.join(TEST_DATA, "QQQ-default.json")) as f:
+        return json.load(f)
+
+def corrupt(candles):
+    damaged = copy.deepcopy(candles)
+    damaged[10]["datetime"] = 172346052000  # Truncated timestamp, far in the past
+    damaged[25]["high"] = damaged[25]["low"] - 1
+    damaged.insert(21, dict(damaged[20]))
+    del damaged[35:38]
+    return damaged
+
+def test_fixture_has_no_corrupt_candles():
+    report = validate_candles(load_history(), frequency_ms=60000, min_gap_bars=5)
+
+    assert report.corrupt_indexes() == set()
+    assert set(report.by_kind()) == {GAP}
+    assert report.count == 10038
+
+def test_validate_candles_finds_corruption():
+    candles = load_history()["candles"][:60]
+
+    report = validate_candles(corrupt(candles), frequency_ms=60000)
+    kinds = {(issue.kind, issue.index) for issue in report.issues}
+
+    assert (OFF_SESSION, 10) in kinds
+    assert (OUT_OF_ORDER, 10) in kinds
+    assert (DUPLICATE, 21) in kinds
+    assert (OHLC, 26) in kinds
+    assert any(kind == GAP and index == 35 for kind, index in kinds)
+    assert report.corrupt_indexes() == {10, 21, 26}
+
+def test_backfill_requests_only_failed_windows(schwab_api, requests_mock):
+    original = load_history()["candles"][:60]
+
+    def respond(request, context):
+        start, end = int(request.qs["startdate"][0]), int(request.qs["enddate"][0])
+        return {"candles": [c for c in original if start <= c["datetime"] <= end], "symbol": "QQQ", "empty": False}
+
+    requests_mock.get(f"{schwab_api.base_url}/marketdata/v1/pricehistory", json=respond)
+
+    repaired, report = backfill_price_history(schwab_api, "QQQ", corrupt(original))
+
+    assert not report.ok
+    assert repaired["candles"] == original
+    assert requests_mock.call_count == len(report.windows())
+    assert requests_mock.call_count < 20
@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+from py_schwab_wrapper.candles import Candle, CandleSeries
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "test_data")
+MINUTE = 60000
+START = 1724423400000  # 2024-08-23 09:30 ET
+
+def make_candle(i, close=None):
+    price = 480.0 + i
+    return {"open": price, "high": price + 1, "low": price - 1, "close": close or price, "volume": 100 + i, "datetime": START + i * MINUTE}
+
+def test_series_round_trips_price_history():
+    response = {"candles": [make_candle(i) for i in range(5)], "symbol": "QQQ", "empty": False}
+
+    series = CandleSeries.from_price_history(response)
+
+    assert len(series) == 5
+    assert series.symbol == "QQQ"
+    assert series.to_price_history() == response
+    assert series[0] == Candle.from_dict(make_candle(0))
+    assert series[-1].datetime == START + 4 * MINUTE
+    assert [candle.close for candle in series] == [480.0, 481.0, 482.0, 483.0, 484.0]
+
+def test_series_keeps_order_and_replaces_duplicates():
+    series = CandleSeries("QQQ")
+    series.extend([make_candle(2), make_candle(0), make_candle(1)])
+    series.append(make_candle(1, close=999.0))
+
+    assert list(series.datetimes) == [START, START + MINUTE, START + 2 * MINUTE]
+    assert series[1].close == 999.0
+
+def test_between_slices_by_timestamp():
+    series = CandleSeries.from_price_history([make_candle(i) for i in range(10)])
+
+    window = series.between(START + 2 * MINUTE, START + 4 * MINUTE)
+
+    assert [candle.datetime for candle in window] == [START + 2 * MINUTE, START + 3 * MINUTE, START + 4 * MINUTE]
+    assert len(series.between(START + 20 * MINUTE)) == 0
+    assert len(series.between(end=START - 1)) == 0
+
+def test_series_is_much_smaller_than_dictionaries():
+    with open(os.path.join(TEST_DATA, "QQQ-default.json")) as f:
+        response = json.load(f)
+
+    series = CandleSeries.from_price_history(response)
+    dict_bytes = sum(sys.getsizeof(candle) + sum(sys.getsizeof(value) for value in candle.values())
+                     for candle in response["candles"])
+
+    assert len(series) == len(response["candles"])
+    assert series.nbytes * 8 <= dict_bytes
+    assert not hasattr(series[0], "__dict__")
@@ -0,0 +1,109 @@
+import time
+import pytest
+from requests.exceptions import ConnectTimeout
+from py_schwab_wrapper.deadlines import DeadlineExceeded, deadline, remaining, bound_timeout
+from py_schwab_wrapper.hooks import ON_ERROR
+from py_schwab_wrapper.metrics import DEADLINES_EXCEEDED
+from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.testing.faults import FaultInjector, fixed_latency
+from py_schwab_wrapper.testing.stand_in import StandInServer, TOKEN_PATH
+from py_schwab_wrapper.utils.concurrency_utils import run_concurrently
+
+BASE = "https://api.schwabapi.com"
+QUOTES = {"QQQ": {"symbol": "QQQ", "quote": {"lastPrice": 480.0}}}
+
+def make_api(server, **kwargs):
+    store = {"token": {"access_token": "", "refresh_token": "deadline", "expires_at": 0}}
+    return SchwabAPI("client", "secret", base_url=server.base_url, load_token_func=lambda: store["token"],
+                     save_token_func=lambda token: store.update(token=token), **kwargs)
+
+def test_nested_deadlines_only_shrink():
+    assert remaining() is None
+    with deadline(10):
+        with deadline(60):
+            assert remaining() <= 10
+        with deadline(1):
+            assert remaining() <= 1
+    assert remaining() is None
+    assert bound_timeout((3.05, 30.0), 2.0) == (2.0, 2.0)
+    assert bound_timeout((3.05, 30.0), None) == (3.05, 30.0)
+
+def test_requests_carry_per_endpoint_timeouts(requests_mock):
+    requests_mock.post(f"{BASE}/v1/oauth/token", json={"access_token": "a", "expires_in": 1800})
+    history = requests_mock.get(f"{BASE}/marketdata/v1/pricehistory", json={"candles": []})
+    quotes = requests_mock.get(f"{BASE}/marketdata/v1/quotes", json={})
+    api = SchwabAPI("client", "secret", load_token_func=lambda: {"refresh_token": "r", "expires_at": 0},
+                    save_token_func=lambda token: None, timeouts={"marketdata/quotes": (1.0, 2.0)})
+
+    api.get_price_history("QQQ", start_date=1, end_date=2)
+    api.get_quotes(["QQQ"])
+    with deadline(1.5):
+        api.get_quotes(["QQQ"])
+
+    assert requests_mock.request_history[0].timeout == (3.05, 10.0)  # Token refresh
+    assert history.last_request.timeout == (3.05, 30.0)
+    assert quotes.request_history[0].timeout == (1.0, 2.0)
+    connect, read = quotes.request_history[1].timeout
+    assert connect == 1.0 and 1.0 < read <= 1.5
+
+def test_no_retry_when_the_budget_cannot_cover_the_delay(schwab_api, requests_mock):
+    quotes = requests_mock.get(f"{BASE}/marketdata/v1/quotes", status_code=503, json={})
+    errors = []
+    schwab_api.hooks.add(ON_ERROR, errors.append)
+
+    started = time.perf_counter()
+    with deadline(0.5), pytest.raises(DeadlineExceeded):
+        schwab_api.get_quotes(["QQQ"])
+
+    assert time.perf_counter() - started < 0.5
+    assert quotes.call_count == 1
+    assert len(errors) == 1
+    assert schwab_api.metrics.counter(DEADLINES_EXCEEDED, family="marketdata/quotes") == 1
+
+def test_expired_deadline_fails_before_sending(schwab_api, requests_mock):
+    quotes = requests_mock.get(f"{BASE}/marketdata/v1/quotes", json={})
+
+    with deadline(0), pytest.raises(DeadlineExceeded) as error:
+        schwab_api.get_quotes(["QQQ"])
+
+    assert not error.value.sent
+    assert quotes.call_count == 0
+
+def test_connect_timeout_within_deadline_is_not_sent(schwab_api, requests_mock):
+    requests_mock.get(f"{BASE}/marketdata/v1/quotes", exc=ConnectTimeout)
+
+    with deadline(0.5), pytest.raises(DeadlineExceeded) as error:
+        schwab_api.get_quotes(["QQQ"])
+
+    assert not error.value.sent
+
+def test_slow_server_fails_fast():
+    with StandInServer(faults=FaultInjector(latency=fixed_latency(1.0))) as server:
+        server.add_route("GET", "/marketdata/v1/quotes", QUOTES)
+        api = make_api(server)
+
+        started = time.perf_counter()
+        with deadline(0.2), pytest.raises(DeadlineExceeded) as error:
+            api.get_quotes(["QQQ"])
+        elapsed = time.perf_counter() - started
+
+    assert error.value.sent
+    assert elapsed < 0.6
+
+def test_token_refresh_shares_the_budget():
+    with StandInServer() as server:
+        server.add_route("POST", TOKEN_PATH, lambda *request: (time.sleep(1.0) or 200, {}, server.issue_token()))
+        api = make_api(server, lazy=True)
+
+        with deadline(0.2), pytest.raises(DeadlineExceeded) as error:
+            api.get_quotes(["QQQ"])
+
+    assert "oauth/token" in str(error.value)
+    assert api.metrics.counter(DEADLINES_EXCEEDED, family="oauth/token") == 1
+
+def test_deadline_reaches_concurrent_tasks():
+    with deadline(5):
+        results = run_concurrently({"a": remaining, "b": remaining})
+
+    assert all(0 < left <= 5 for left in results.values())
+    assert run_concurrently({"a": remaining}) == {"a": None}
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+import pytest
+from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
+from py_schwab_wrapper.gateway import SchwabGateway, RateLimiter, DEADLINE_HEADER, ERROR_HEADER, READ_TIMEOUT
+from py_schwab_wrapper.metrics import CACHE_LOOKUPS
+from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.testing.stand_in import StandInServer
+
+QUOTES = {"QQQ": {"symbol": "QQQ", "quote": {"lastPrice": 480.0}}}
+
+@pytest.fixture
+def server():
+    with StandInServer(check_auth=True) as server:
+        server.add_route("GET", "/marketdata/v1/quotes", QUOTES)
+        yield server
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "gw.sock")
+
+def make_upstream(server, **kwargs):
+    store = {"token": {"access_token": "", "refresh_token": "load", "expires_at": 0}}
+    return SchwabAPI("client", "secret", base_url=server.base_url, load_token_func=lambda: store["token"],
+                     save_token_func=lambda new_token: store.update(token=new_token), **kwargs)
+
+def upstream_calls(server, path):
+    return sum(1 for method, request_path, query in server.requests if request_path == path)
+
+def test_thin_clients_share_the_gateway_token_and_cache(server, socket_path):
+    with SchwabGateway(make_upstream(server), socket_path):
+        clients = [SchwabAPI(gateway=socket_path) for _ in range(3)]
+        results = [client.get_quotes(["QQQ"]) for client in clients]
+
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+    assert results == [QUOTES] * 3
+    assert all(client.token is None for client in clients)
+    assert server.tokens_issued == 1
+    assert upstream_calls(server, "/marketdata/v1/quotes") == 1
+
+def test_identical_requests_in_flight_are_coalesced(server, socket_path):
+    def slow_quotes(method, path, query, body):
+        time.sleep(0.2)
+        return 200, {"Content-Type": "application/json"}, QUOTES
+
+    server.add_route("GET", "/marketdata/v1/quotes", slow_quotes)
+    upstream = make_upstream(server)
+    results = []
+    with SchwabGateway(upstream, socket_path, cache_ttls={"marketdata/quotes": 0}):
+        client = SchwabAPI(gateway=socket_path)
+        threads = [threading.Thread(target=lambda: results.append(client.get_quotes("QQQ"))) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == [QUOTES] * 6
+    assert upstream_calls(server, "/marketdata/v1/quotes") == 1
+    assert upstream.metrics.counter(CACHE_LOOKUPS, cache="gateway", result="coalesced") == 5
+
+def test_orders_are_forwarded_once(server, socket_path):
+    with SchwabGateway(make_upstream(server), socket_path):
+        client = SchwabAPI(gateway=socket_path)
+        assert client.post_order("HASH", {"orderType": "LIMIT"}) is None
+        assert client.post_order("HASH", {"orderType": "LIMIT"}) is None
+
+    assert upstream_calls(server, "/trader/v1/accounts/HASH/orders") == 2
+
+def test_clients_reconnect_after_a_restart(server, socket_path):
+    upstream = make_upstream(server)
+    client = SchwabAPI(gateway=socket_path)
+    with SchwabGateway(upstream, socket_path):
+        client.post_order("HASH", {"orderType": "LIMIT"})
+    with SchwabGateway(upstream, socket_path):
+        client.post_order("HASH", {"orderType": "LIMIT"})  # Not sent on the closed kept-alive connection
+        assert client.get_quotes("QQQ") == QUOTES
+
+    assert upstream_calls(server, "/trader/v1/accounts/HASH/orders") == 2
+
+def test_upstream_timeouts_keep_their_meaning(server, socket_path):
+    # An order whose outcome is unknown must not look like a rejection to the thin client
+    def slow_order(method, path, query, body):
+        time.sleep(0.5)
+        return 201, {}, None
+
+    server.add_route("POST", "/trader/v1/accounts/HASH/orders", slow_order)
+    upstream = make_upstream(server, timeouts={"trader/accounts/orders": (1.0, 0.1)})
+    with SchwabGateway(upstream, socket_path):
+        with pytest.raises(ReadTimeout):
+            SchwabAPI(gateway=socket_path).post_order("HASH", {"orderType": "LIMIT"})
+
+def test_requests_over_budget_are_throttled(server, socket_path, monkeypatch):
+    monkeypatch.setattr("py_schwab_wrapper.schwab_api.time.sleep", lambda seconds: None)
+    upstream = make_upstream(server)
+    with SchwabGateway(upstream, socket_path, requests_per_minute=60, burst=1, max_wait=0,
+                       cache_ttls={"marketdata/quotes": 0}):
+        client = SchwabAPI(gateway=socket_path)
+        client.get_quotes("QQQ")
+        with pytest.raises(HTTPError) as error:
+            client.get_quotes("QQQ")
+
+    assert error.value.response.status_code == 429
+    assert upstream_calls(server, "/marketdata/v1/quotes") == 1
+
+def test_every_upstream_retry_waits_for_the_limiter(server, socket_path, monkeypatch):
+    monkeypatch.setattr("py_schwab_wrapper.schwab_api.time.sleep", lambda seconds: None)
+    server.add_route("GET", "/marketdata/v1/quotes", {"errors": []}, status=503)
+    with SchwabGateway(make_upstream(server), socket_path, requests_per_minute=60, burst=2, max_wait=0):
+        with pytest.raises(HTTPError) as error:
+            SchwabAPI(gateway=socket_path).get_quotes("QQQ")
+
+    # Two retries fit the budget of two; the third attempt is throttled instead of sent
+    assert error.value.response.status_code == 429
+    assert upstream_calls(server, "/marketdata/v1/quotes") == 2
+
+def test_coalesced_requests_keep_their_deadline(server, socket_path):
+    def slow_quotes(method, path, query, body):
+        time.sleep(0.5)
+        return 200, {"Content-Type": "application/json"}, QUOTES
+
+    server.add_route("GET", "/marketdata/v1/quotes", slow_quotes)
+    with SchwabGateway(make_upstream(server), socket_path) as gateway:
+        leader = threading.Thread(target=gateway.handle, args=("GET", "/marketdata/v1/quotes?symbols=QQQ"))
+        leader.start()
+        time.sleep(0.1)
+        started = time.monotonic()
+        status, headers, body = gateway.handle("GET", "/marketdata/v1/quotes?symbols=QQQ",
+                                               headers={DEADLINE_HEADER: "0.1"})
+        waited = time.monotonic() - started
+        leader.join()
+
+        assert gateway.handle("GET", "/marketdata/v1/quotes", headers={DEADLINE_HEADER: "soon"})[0] == 400
+
+    assert status == 504 and headers[ERROR_HEADER] == READ_TIMEOUT
+    assert waited < 0.3
+
+def test_rate_limiter_spaces_queued_requests():
+    limiter = RateLimiter(requests_per_minute=600, burst=1)
+
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire(timeout=0.01) is None
+    started = time.monotonic()
+    assert limiter.acquire() == pytest.approx(0.1, abs=0.02)
+    assert time.monotonic() - started >= 0.09
+
+def test_socket_lifecycle(server, socket_path):
+    with pytest.raises(ConnectionError):
+        SchwabAPI(gateway=socket_path).get_quotes("QQQ")
+
+    with open(socket_path, "w"):
+        pass  # A stale file left by a crashed gateway
+    with SchwabGateway(make_upstream(server), socket_path) as gateway:
+        with pytest.raises(OSError):
+            SchwabGateway(gateway.api, socket_path).start()
+        assert gateway.handle("POST", "/v1/oauth/token")[0] == 404
+        status, headers, body = gateway.handle("GET", "/gateway/metrics")
+        assert status == 200 and b"schwab_requests_total" in body
+
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,115 @@
+import pytest
+from requests.exceptions import HTTPError, ConnectTimeout
+from py_schwab_wrapper.hooks import (RequestHooks, RequestTrace, PHASES, BEFORE_SEND, AFTER_HEADERS, AFTER_BODY,
+                                     AFTER_DECODE, ON_RETRY, ON_ERROR)
+
+BASE = "https://api.schwabapi.com"
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, phase):
+        if phase not in PHASES:
+            raise AttributeError(phase)
+        return lambda trace: self.events.append((phase, trace.request_id, trace.attempt, trace.status))
+
+@pytest.fixture
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr("py_schwab_wrapper.schwab_api.time.sleep", lambda seconds: None)
+
+@pytest.fixture
+def recorder(schwab_api):
+    recorder = Recorder()
+    schwab_api.hooks.add_listener(recorder)
+    return recorder
+
+def test_phases_fire_in_order_with_timings(schwab_api, requests_mock, recorder):
+    requests_mock.get(f"{BASE}/marketdata/v1/quotes", json={"QQQ": {"symbol": "QQQ"}})
+    traces = []
+    schwab_api.hooks.add(AFTER_DECODE, traces.append)
+
+    schwab_api.get_quotes(["QQQ"])
+
+    assert [phase for phase, _, _, _ in recorder.events] == [BEFORE_SEND, AFTER_HEADERS, AFTER_BODY, AFTER_DECODE]
+    trace = traces[0]
+    assert trace.family == "marketdata/quotes"
+    assert trace.status == 200
+    assert trace.response_bytes == len('{"QQQ": {"symbol": "QQQ"}}')
+    timestamps = [trace.timestamps[phase] for phase in (BEFORE_SEND, AFTER_HEADERS, AFTER_BODY, AFTER_DECODE)]
+    assert timestamps == sorted(timestamps)
+    assert set(trace.breakdown()) == {"wait", "download", "decode"}
+
+def test_retries_share_a_request_id(schwab_api, requests_mock, recorder, no_retry_delay):
+    requests_mock.get(f"{BASE}/marketdata/v1/quotes", [
+        {"status_code": 503, "json": {}},
+        {"exc": ConnectTimeout},
+        {"status_code": 200, "json": {}},
+    ])
+
+    schwab_api.get_quotes(["QQQ"])
+
+    retries = [event for event in recorder.events if event[0] == ON_RETRY]
+    assert [(attempt, status) for _, _, attempt, status in retries] == [(0, 503), (1, None)]
+    assert len({request_id for _, request_id, _, _ in recorder.events}) == 1
+    assert recorder.events[-1][0] == AFTER_DECODE
+
+def test_on_error_after_exhausted_retries(schwab_api, requests_mock, no_retry_delay):
+    requests_mock.get(f"{BASE}/marketdata/v1/quotes", status_code=500, json={})
+    errors = []
+    schwab_api.hooks.add(ON_ERROR, errors.append)
+
+    with pytest.raises(HTTPError):
+        schwab_api.get_quotes(["QQQ"])
+
+    assert len(errors) == 1
+    assert errors[0].attempt == 2
+    assert isinstance(errors[0].error, HTTPError)
+
+def test_order_post_is_traced(schwab_api, requests_mock):
+    requests_mock.post(f"{BASE}/trader/v1/accounts/ABC/orders", status_code=201)
+    traces = []
+    schwab_api.hooks.add(AFTER_BODY, traces.append)
+
+    schwab_api.post_order("ABC", {"orderType": "MARKET"})
+
+    assert traces[0].method == "POST"
+    assert traces[0].family == "trader/accounts/orders"
+    assert traces[0].status == 201
+
+def test_failing_hook_does_not_break_the_request(schwab_api, requests_mock):
+    requests_mock.get(f"{BASE}/marketdata/v1/quotes", json={"QQQ": {}})
+
+    def broken(trace):
+        raise RuntimeError("profiler crashed")
+
+    schwab_api.hooks.add(BEFORE_SEND, broken)
+
+    assert schwab_api.get_quotes(["QQQ"]) == {"QQQ": {}}
+
+def test_add_and_remove():
+    hooks = RequestHooks()
+    calls = []
+    callback = hooks.add(AFTER_HEADERS, calls.append)
+    trace = hooks.trace("GET", f"{BASE}/marketdata/v1/pricehistory")
+
+    hooks.emit(AFTER_HEADERS, trace)
+    hooks.remove(AFTER_HEADERS, callback)
+    hooks.emit(AFTER_HEADERS, trace)
+
+    assert calls == [trace]
+    assert isinstance(trace, RequestTrace) and trace.family == "marketdata/pricehistory"
+    with pytest.raises(ValueError):
+        hooks.add("after_lunch", calls.append)
+
+def test_account_info_is_traced_and_measured(schwab_api, requests_mock, recorder):
+    requests_mock.get(f"{BASE}/accounts", [{"status_code": 401, "json": {}}, {"json": {"accounts": []}}])
+
+    with pytest.raises(HTTPError):
+        schwab_api.get_account_info()
+    assert schwab_api.get_account_info() == {"accounts": []}
+
+    assert [phase for phase, _, _, _ in recorder.events] == [
+        BEFORE_SEND, AFTER_HEADERS, AFTER_BODY, ON_ERROR, BEFORE_SEND, AFTER_HEADERS, AFTER_BODY, AFTER_DECODE
+    ]
+    assert schwab_api.metrics.total("schwab_requests_total", method="GET") == 2
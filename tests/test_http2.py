@@ -0,0 +1,84 @@
+import gzip
+import time
+import pytest
+import requests
+from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
+from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.testing.faults import FaultInjector
+from py_schwab_wrapper.testing.stand_in import StandInServer
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("h2")
+
+from py_schwab_wrapper.http2 import HTTP2Adapter
+
+QUOTES = {"QQQ": {"symbol": "QQQ", "quote": {"lastPrice": 480.0}}}
+
+@pytest.fixture
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr("py_schwab_wrapper.schwab_api.time.sleep", lambda seconds: None)
+
+def make_api(server, **kwargs):
+    store = {"token": {"access_token": "", "refresh_token": "h2", "expires_at": 0}}
+    return SchwabAPI("client", "secret", base_url=server.base_url, load_token_func=lambda: store["token"],
+                     save_token_func=lambda token: store.update(token=token), http2=True, **kwargs)
+
+def test_client_refreshes_and_fetches_through_the_adapter():
+    with StandInServer() as server:
+        server.add_route("GET", "/marketdata/v1/quotes", QUOTES)
+        api = make_api(server)
+
+        assert api.get_quotes(["QQQ"]) == QUOTES
+        assert isinstance(api.session.get_adapter(f"{server.base_url}/marketdata/v1/quotes"), HTTP2Adapter)
+        assert server.tokens_issued == 1
+        assert api.token["access_token"] in server.valid_tokens
+
+def test_retry_behavior_matches_the_default_transport(no_retry_delay):
+    faults = FaultInjector(server_error=0.2, server_error_burst=2, connection_reset=0.2, seed=3)
+    with StandInServer(faults=faults) as server:
+        server.add_route("GET", "/marketdata/v1/quotes", QUOTES)
+        api = make_api(server)
+        outcomes = []
+        for _ in range(20):
+            try:
+                outcomes.append(api.get_quotes(["QQQ"]) == QUOTES)
+            except (HTTPError, ConnectionError) as e:
+                outcomes.append(type(e).__name__)
+
+    assert True in outcomes
+    assert faults.counts["resets"] > 0 and faults.counts["server_errors"] > 0
+    assert api.metrics.total("schwab_retries_total", reason="connection") > 0
+    assert api.metrics.total("schwab_retries_total", reason="503") > 0
+
+def test_timeouts_map_to_requests_exceptions():
+    session = requests.Session()
+    session.mount("http://", HTTP2Adapter())
+    with StandInServer() as server:
+        server.add_route("GET", "/marketdata/v1/slow", lambda *request: (time.sleep(0.3) or 200, {}, {}))
+
+        with pytest.raises(ReadTimeout):
+            session.get(f"{server.base_url}/marketdata/v1/slow", timeout=(1.0, 0.05))
+        response = session.get(f"{server.base_url}/marketdata/v1/quotes")
+        port = server._httpd.server_address[1]
+
+    assert response.status_code == 404
+    assert response.http_version == "HTTP/1.1"  # Plain http:// falls back to HTTP/1.1
+    with pytest.raises(ConnectionError):
+        HTTP2Adapter().send(requests.Request("GET", f"http://127.0.0.1:{port}/").prepare())  # Nothing listens
+
+def test_compressed_responses_are_decoded():
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers)
+        return httpx.Response(200, content=gzip.compress(b'{"ok": true}'),
+                              headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+    session = requests.Session()
+    session.mount("https://", HTTP2Adapter(client=httpx.Client(transport=httpx.MockTransport(handler))))
+
+    response = session.get("https://api.schwabapi.com/marketdata/v1/quotes", headers={"Authorization": "Bearer x"})
+
+    assert response.json() == {"ok": True}
+    assert "gzip" in seen[0]["accept-encoding"]
+    assert seen[0]["authorization"] == "Bearer x"
@@ -0,0 +1,65 @@
+import json
+import math
+import os
+import pytest
+from py_schwab_wrapper.candles import CandleSeries
+from py_schwab_wrapper.indicators import EMA, VWAP, ATR, RSI, IndicatorEngine
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "test_data")
+MINUTE = 60000
+START = 1724423400000  # 2024-08-23 09:30 ET
+
+def make_candles(closes, start=START):
+    return [{"open": c, "high": c + 1, "low": c - 1, "close": c, "volume": 100, "datetime": start + i * MINUTE}
+            for i, c in enumerate(closes)]
+
+def load_history():
+    with open(os.path.join(TEST_DATA, "QQQ-default.json")) as f:
+        return json.load(f)
+
+def test_ema_is_seeded_with_simple_average():
+    ema = EMA(3)
+    values = ema.batch(make_candles([1.0, 2.0, 3.0, 4.0, 5.0]))
+
+    assert math.isnan(values[1])
+    assert values[2] == 2.0
+    assert values[3] == 3.0
+    assert values[4] == 4.0
+    with pytest.raises(ValueError):
+        EMA(3, field="open")
+
+def test_rsi_and_atr_on_trending_prices():
+    candles = make_candles([float(i) for i in range(1, 21)])
+
+    assert RSI(14).batch(candles)[-1] == 100.0
+    assert ATR(14).batch(candles)[-1] == pytest.approx(2.0)
+
+def test_batch_matches_incremental_updates():
+    history = load_history()
+    series = CandleSeries.from_price_history(history)
+    for factory in (lambda: EMA(20), VWAP, lambda: ATR(14), lambda: RSI(14)):
+        batch = factory().batch(series)
+        incremental = factory()
+        for index, candle in enumerate(history["candles"][:500]):
+            value = incremental.update(candle)
+            assert value == batch[index] or (math.isnan(value) and math.isnan(batch[index]))
+
+def test_vwap_resets_every_trading_day():
+    candles = make_candles([10.0, 20.0]) + make_candles([30.0], start=START + 3 * 86400000)  # Next Monday
+    values = VWAP().batch(candles)
+
+    assert values[1] == 15.0
+    assert values[2] == 30.0
+
+def test_engine_applies_only_new_candles():
+    candles = make_candles([float(i) for i in range(1, 31)])
+    engine = IndicatorEngine({"ema": lambda: EMA(5), "rsi": RSI})
+    engine.warm_up("QQQ", {"candles": candles[:20], "symbol": "QQQ", "empty": False})
+
+    values = engine.update_history("QQQ", {"candles": candles, "symbol": "QQQ", "empty": False})
+    expected = EMA(5).batch(candles)[-1]
+
+    assert values["ema"] == expected
+    assert engine.update("QQQ", candles[-1]) is None
+    engine.on_bar("QQQ", make_candles([31.0], start=candles[-1]["datetime"] + MINUTE)[0])
+    assert engine.values("QQQ")["ema"] > expected
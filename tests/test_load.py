@@ -0,0 +1,63 @@
+import pytest
+from requests.exceptions import HTTPError
+from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.testing.faults import FaultInjector, fixed_latency
+from py_schwab_wrapper.testing.load import run_load, percentile
+from py_schwab_wrapper.testing.stand_in import StandInServer
+
+QUOTES = {"QQQ": {"symbol": "QQQ", "quote": {"lastPrice": 480.0}}}
+
+@pytest.fixture
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr("py_schwab_wrapper.schwab_api.time.sleep", lambda seconds: None)
+
+def make_api(server):
+    token = {"access_token": "", "refresh_token": "load", "expires_at": 0}
+    store = {"token": token}
+    return SchwabAPI("client", "secret", base_url=server.base_url, load_token_func=lambda: store["token"],
+                     save_token_func=lambda new_token: store.update(token=new_token))
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0.0
+
+def test_load_counts_retries_after_resets_and_5xx(no_retry_delay):
+    faults = FaultInjector(latency=fixed_latency(0.001), server_error=0.1, server_error_burst=2,
+                           connection_reset=0.1, seed=7)
+    with StandInServer(faults=faults) as server:
+        server.add_route("GET", "/marketdata/v1/quotes", QUOTES)
+        api = make_api(server)
+        report = run_load(lambda: api.get_quotes(["QQQ"]), concurrency=4, total_calls=60, server=server)
+
+    result = report.as_dict()
+    assert result["calls"] == 60
+    assert result["attempts"] == faults.counts["requests"]
+    assert result["wasted_retries"] == result["attempts"] - result["successes"] > 0
+    assert faults.counts["resets"] > 0 and faults.counts["server_errors"] > 0
+    assert 0 < result["p50"] <= result["p99"] <= result["max"]
+
+def test_rate_limits_exhaust_retries(no_retry_delay):
+    faults = FaultInjector(rate_limit=1.0, retry_after=1, seed=1)
+    with StandInServer(faults=faults) as server:
+        api = make_api(server)
+        report = run_load(lambda: api.get_quotes(["QQQ"]), concurrency=2, total_calls=4, server=server)
+
+    assert report.errors == {"HTTPError": 4}
+    assert report.attempts == 12  # get_with_retry makes three attempts per call
+    assert report.throughput == 0.0
+
+def test_revoked_tokens_are_rejected(no_retry_delay):
+    faults = FaultInjector(expire_tokens_every=3, seed=1)
+    with StandInServer(faults=faults) as server:
+        server.add_route("GET", "/marketdata/v1/quotes", QUOTES)
+        api = make_api(server)
+        api.get_quotes(["QQQ"])
+        api.get_quotes(["QQQ"])
+        with pytest.raises(HTTPError) as error:
+            api.get_quotes(["QQQ"])
+
+    assert error.value.response.status_code == 401
+    assert faults.counts["token_expiries"] == 1
@@ -0,0 +1,76 @@
+from datetime import date, datetime
+import pytest
+import pytz
+from py_schwab_wrapper.market_calendar import MarketCalendar, nyse_holidays, nyse_early_closes, to_eastern_isoformat
+
+eastern = pytz.timezone('America/New_York')
+
+def ms(year, month, day, hour=0, minute=0):
+    return int(eastern.localize(datetime(year, month, day, hour, minute)).timestamp() * 1000)
+
+@pytest.fixture(scope="module")
+def calendar():
+    return MarketCalendar(start_year=2023, end_year=2025)
+
+def test_holidays_and_early_closes():
+    assert nyse_holidays(2024) == {
+        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29), date(2024, 5, 27),
+        date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2), date(2024, 11, 28), date(2024, 12, 25)
+    }
+    assert nyse_early_closes(2024) == {date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)}
+    # July 4th 2026 is a Saturday: observed on Friday the 3rd, so there is no early close that week
+    assert date(2026, 7, 3) in nyse_holidays(2026)
+    assert date(2026, 7, 3) not in nyse_early_closes(2026)
+    assert date(2025, 1, 9) in nyse_holidays(2025)
+
+def test_is_open(calendar):
+    assert calendar.is_open(ms(2024, 8, 23, 9, 30))
+    assert not calendar.is_open(ms(2024, 8, 23, 9, 29))
+    assert not calendar.is_open(ms(2024, 8, 23, 16, 0))
+    assert calendar.is_open(ms(2024, 8, 23, 16, 30), extended=True)
+    assert not calendar.is_open(ms(2024, 8, 24, 12, 0))  # Saturday
+    assert not calendar.is_open(ms(2024, 11, 29, 13, 30))  # Early close
+    assert calendar.is_trading_day(date(2024, 11, 29))
+    assert not calendar.is_trading_day(date(2024, 11, 28))
+
+def test_session_lookups(calendar):
+    saturday = ms(2024, 8, 24, 12, 0)
+
+    assert calendar.trading_session(ms(2024, 8, 23, 8, 0)) == (ms(2024, 8, 23, 9, 30), ms(2024, 8, 23, 16, 0))
+    assert calendar.trading_session(saturday) == (ms(2024, 8, 23, 9, 30), ms(2024, 8, 23, 16, 0))
+    assert calendar.previous_session(ms(2024, 8, 26, 10, 0)) == (ms(2024, 8, 23, 9, 30), ms(2024, 8, 23, 16, 0))
+    assert calendar.next_session(saturday) == (ms(2024, 8, 26, 9, 30), ms(2024, 8, 26, 16, 0))
+    assert calendar.next_session(saturday, extended=True) == (ms(2024, 8, 26, 7, 0), ms(2024, 8, 26, 20, 0))
+    assert calendar.seconds_until_open(ms(2024, 8, 26, 9, 0)) == 1800.0
+    assert calendar.seconds_until_open(ms(2024, 8, 26, 10, 0)) == 0.0
+    assert calendar.cache_ttl(60, ms(2024, 8, 26, 10, 0)) == 60
+    assert calendar.cache_ttl(60, ms(2024, 8, 26, 9, 0)) == 1800.0
+    with pytest.raises(ValueError):
+        calendar.trading_session(ms(2030, 1, 2))
+
+def test_sessions_follow_daylight_saving_time(calendar):
+    assert to_eastern_isoformat(calendar.trading_session(ms(2024, 3, 8, 12))[0]) == "2024-03-08T09:30:00-05:00"
+    assert to_eastern_isoformat(calendar.trading_session(ms(2024, 3, 11, 12))[0]) == "2024-03-11T09:30:00-04:00"
+
+def test_get_orders_defaults_to_trading_session(schwab_api, requests_mock, monkeypatch):
+    account_hash = "sample_account_hash"
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{account_hash}/orders"
+    requests_mock.get(url, json=[])
+    monkeypatch.setattr("py_schwab_wrapper.market_calendar.time.time", lambda: ms(2024, 11, 30, 12) / 1000)
+    schwab_api._market_calendar = MarketCalendar(start_year=2024, end_year=2024)
+
+    schwab_api.get_orders(account_hash)
+
+    # Saturday after Thanksgiving: Friday's early-close session
+    assert requests_mock.last_request.qs["fromenteredtime"] == ["2024-11-29t09:30:00-05:00"]
+    assert requests_mock.last_request.qs["toenteredtime"] == ["2024-11-29t13:00:00-05:00"]
+
+def test_get_price_history_defaults_end_date_to_session_close(schwab_api, requests_mock, monkeypatch):
+    url = f"{schwab_api.base_url}/marketdata/v1/pricehistory"
+    requests_mock.get(url, json={"candles": [], "symbol": "QQQ", "empty": True})
+    monkeypatch.setattr("py_schwab_wrapper.market_calendar.time.time", lambda: ms(2024, 8, 23, 11) / 1000)
+    schwab_api._market_calendar = MarketCalendar(start_year=2024, end_year=2024)
+
+    schwab_api.get_price_history("QQQ", start_date=ms(2024, 8, 23, 9, 30), need_extended_hours_data=True)
+
+    assert requests_mock.last_request.qs["enddate"] == [str(ms(2024, 8, 23, 20))]
@@ -0,0 +1,120 @@
+import sys
+import threading
+import pytest
+from requests.exceptions import HTTPError, ConnectTimeout
+from py_schwab_wrapper.metrics import (MetricsRegistry, Histogram, endpoint_family, REQUESTS, REQUEST_DURATION,
+                                       RETRIES, THROTTLED, RESPONSE_BYTES, DECODE_DURATION, CACHE_LOOKUPS)
+
+BASE = "https://api.schwabapi.com"
+
+@pytest.fixture
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr("py_schwab_wrapper.schwab_api.time.sleep", lambda seconds: None)
+
+def test_endpoint_family_drops_versions_and_identifiers():
+    assert endpoint_family(f"{BASE}/marketdata/v1/pricehistory?symbol=QQQ") == "marketdata/pricehistory"
+    assert endpoint_family(f"{BASE}/marketdata/v1/QQQ/quotes") == "marketdata/quotes"
+    assert endpoint_family(f"{BASE}/marketdata/v1/markets/equity") == "marketdata/markets/equity"
+    assert endpoint_family(f"{BASE}/trader/v1/accounts/0123456789ABCDEF0123456789ABCDEF0123/orders/1001") == \
+        "trader/accounts/orders"
+    assert endpoint_family(f"{BASE}/v1/oauth/token") == "oauth/token"
+
+def test_histogram_buckets_and_quantile():
+    histogram = Histogram(buckets=(0.1, 0.5, 1.0))
+    for value in (0.05, 0.2, 0.3, 0.7, 3.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(0.1, 1), (0.5, 3), (1.0, 4), (float("inf"), 5)]
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(1.0) == float("inf")
+    assert Histogram().quantile(0.5) == 0.0
+
+def test_prometheus_export():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.inc(REQUESTS, family="marketdata/quotes", method="GET", status="200")
+    registry.inc(REQUESTS, family="marketdata/quotes", method="GET", status="200")
+    registry.observe(REQUEST_DURATION, 0.25, family="marketdata/quotes")
+
+    text = registry.to_prometheus()
+
+    assert "# TYPE schwab_requests_total counter" in text
+    assert 'schwab_requests_total{family="marketdata/quotes",method="GET",status="200"} 2' in text
+    assert 'schwab_request_duration_seconds_bucket{family="marketdata/quotes",le="0.1"} 0' in text
+    assert 'schwab_request_duration_seconds_bucket{family="marketdata/quotes",le="1.0"} 1' in text
+    assert 'schwab_request_duration_seconds_bucket{family="marketdata/quotes",le="+Inf"} 1' in text
+    assert 'schwab_request_duration_seconds_count{family="marketdata/quotes"} 1' in text
+    assert MetricsRegistry().to_prometheus() == ""
+
+def test_reads_are_safe_while_other_threads_add_series():
+    registry = MetricsRegistry()
+    errors = []
+
+    def write(worker):
+        for i in range(2000):
+            registry.inc(REQUESTS, family=f"f{worker}-{i}")
+
+    def read():
+        try:
+            for _ in range(200):
+                registry.total(REQUESTS)
+        except RuntimeError as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often enough to interleave with the iteration in total()
+    try:
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)] + [threading.Thread(target=read)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert registry.total(REQUESTS) == 8000
+
+def test_requests_and_decode_are_recorded(schwab_api, requests_mock):
+    requests_mock.get(f"{BASE}/marketdata/v1/quotes", json={"QQQ": {"symbol": "QQQ"}})
+
+    schwab_api.get_quotes(["QQQ"])
+
+    metrics = schwab_api.metrics
+    assert metrics.counter(REQUESTS, family="marketdata/quotes", method="GET", status="200") == 1
+    assert metrics.counter(RESPONSE_BYTES, family="marketdata/quotes") == len('{"QQQ": {"symbol": "QQQ"}}')
+    assert metrics.histogram(REQUEST_DURATION, family="marketdata/quotes").count == 1
+    assert metrics.histogram(DECODE_DURATION, family="marketdata/quotes").count == 1
+
+def test_retries_and_throttles_are_counted(schwab_api, requests_mock, no_retry_delay):
+    requests_mock.get(f"{BASE}/marketdata/v1/quotes", [
+        {"status_code": 429, "json": {}},
+        {"exc": ConnectTimeout},
+        {"status_code": 200, "json": {}},
+    ])
+
+    schwab_api.get_quotes(["QQQ"])
+
+    metrics = schwab_api.metrics
+    assert metrics.counter(THROTTLED, family="marketdata/quotes") == 1
+    assert metrics.counter(RETRIES, family="marketdata/quotes", reason="429") == 1
+    assert metrics.counter(RETRIES, family="marketdata/quotes", reason="timeout") == 1
+    assert metrics.total(REQUESTS, family="marketdata/quotes") == 3
+
+def test_exhausted_attempts_are_not_counted_as_retries(schwab_api, requests_mock, no_retry_delay):
+    requests_mock.get(f"{BASE}/marketdata/v1/quotes", status_code=503, json={})
+
+    with pytest.raises(HTTPError):
+        schwab_api.get_quotes(["QQQ"])
+
+    assert schwab_api.metrics.counter(REQUESTS, family="marketdata/quotes", method="GET", status="503") == 3
+    assert schwab_api.metrics.counter(RETRIES, family="marketdata/quotes", reason="503") == 2
+
+def test_account_hash_cache_hits(schwab_api, requests_mock):
+    requests_mock.get(f"{BASE}/trader/v1/accounts/accountNumbers",
+                      json=[{"accountNumber": "123", "hashValue": "ABC"}])
+
+    schwab_api.get_account_hashes()
+    schwab_api.get_account_hashes()
+
+    assert schwab_api.metrics.counter(CACHE_LOOKUPS, cache="account_hashes", result="miss") == 1
+    assert schwab_api.metrics.counter(CACHE_LOOKUPS, cache="account_hashes", result="hit") == 1
@@ -0,0 +1,29 @@
+import pytest
+from datetime import date
+from py_schwab_wrapper.utils.option_chain_utils import plan_expiry_shards, merge_options_chains, flatten_options_chain
+
+def test_plan_expiry_shards_covers_range_without_overlap():
+    assert plan_expiry_shards(date(2024, 10, 25), "2024-11-10", shard_days=7) == [
+        ("2024-10-25", "2024-10-31"), ("2024-11-01", "2024-11-07"), ("2024-11-08", "2024-11-10")
+    ]
+    with pytest.raises(ValueError):
+        plan_expiry_shards("2024-11-10", "2024-10-25")
+
+def test_merge_options_chains_recounts_contracts():
+    first = {"symbol": "QQQ", "status": "SUCCESS", "numberOfContracts": 2,
+             "callExpDateMap": {"2024-10-25:1": {"480.0": [{}], "481.0": [{}]}}, "putExpDateMap": {}}
+    second = {"symbol": "QQQ", "status": "SUCCESS", "numberOfContracts": 1, "isChainTruncated": True,
+              "callExpDateMap": {"2024-10-25:1": {"482.0": [{}]}}, "putExpDateMap": {}}
+
+    merged = merge_options_chains([first, second])
+
+    assert list(merged["callExpDateMap"]["2024-10-25:1"]) == ["480.0", "481.0", "482.0"]
+    assert merged["numberOfContracts"] == 3
+    assert merged["isChainTruncated"] is True
+    assert merge_options_chains([]) == {}
+
+def test_flatten_options_chain_lists_calls_then_puts():
+    chain = {"callExpDateMap": {"2024-10-25:1": {"480.0": [{"symbol": "C480"}], "481.0": [{"symbol": "C481"}]}},
+             "putExpDateMap": {"2024-10-25:1": {"480.0": [{"symbol": "P480"}]}}}
+
+    assert [contract["symbol"] for contract in flatten_options_chain(chain)] == ["C480", "C481", "P480"]
@@ -0,0 +1,200 @@
+import json
+import pytest
+from requests.exceptions import ReadTimeout, ConnectTimeout, HTTPError
+from py_schwab_wrapper.deadlines import DeadlineExceeded, deadline
+from py_schwab_wrapper.order_journal import OrderJournal, SUBMITTED, CONFIRMED, NOT_FOUND, NOT_SENT, REJECTED, UNKNOWN
+
+ACCOUNT_HASH = "sample_account_hash"
+
+ORDER_PAYLOAD = {
+    "session": "NORMAL",
+    "duration": "DAY",
+    "orderType": "LIMIT",
+    "price": 150.0,
+    "orderLegCollection": [
+        {
+            "instruction": "BUY",
+            "quantity": 10,
+            "instrument": {"symbol": "AAPL", "assetType": "EQUITY"}
+        }
+    ],
+    "orderStrategyType": "SINGLE"
+}
+
+def placed_order(order_id, price=150.0):
+    return {
+        "orderId": order_id,
+        "orderType": "LIMIT",
+        "orderStrategyType": "SINGLE",
+        "price": price,
+        "status": "WORKING",
+        "orderLegCollection": [
+            {"instruction": "BUY", "quantity": 10.0, "instrument": {"symbol": "AAPL", "assetType": "EQUITY"}}
+        ]
+    }
+
+@pytest.fixture
+def journal(tmp_path):
+    return OrderJournal(path=str(tmp_path / "journal.jsonl"), reconcile_attempts=1, reconcile_delay=0,
+                        connect_retry_delay=0)
+
+@pytest.fixture
+def orders_url(schwab_api):
+    return f"{schwab_api.base_url}/trader/v1/accounts/{ACCOUNT_HASH}/orders"
+
+def test_submit_success_is_journaled(schwab_api, requests_mock, journal, orders_url):
+    requests_mock.post(orders_url, status_code=201)
+
+    entry = journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD, client_order_id="abc")
+
+    assert entry["state"] == SUBMITTED
+    with open(journal.path) as f:
+        states = [json.loads(line)["state"] for line in f]
+    assert states == ["PENDING", "PENDING", "SUBMITTED"]
+
+def test_timeout_confirmed_by_reconciliation_is_not_resubmitted(schwab_api, requests_mock, journal, orders_url):
+    post = requests_mock.post(orders_url, exc=ReadTimeout)
+    requests_mock.get(orders_url, json=[placed_order(1, price=151.0), placed_order(2)])
+
+    entry = journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD)
+
+    assert entry["state"] == CONFIRMED
+    assert entry["order_id"] == 2
+    assert post.call_count == 1
+
+def test_timeout_not_found_is_resubmitted(schwab_api, requests_mock, journal, orders_url):
+    post = requests_mock.post(orders_url, [{"exc": ReadTimeout}, {"status_code": 201}])
+    requests_mock.get(orders_url, json=[])
+
+    entry = journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD)
+
+    assert entry["state"] == SUBMITTED
+    assert entry["submissions"] == 2
+    assert post.call_count == 2
+
+def test_connect_timeout_resubmits_without_reconciling(schwab_api, requests_mock, journal, orders_url):
+    requests_mock.post(orders_url, [{"exc": ConnectTimeout}, {"status_code": 201}])
+    get = requests_mock.get(orders_url, json=[])
+
+    entry = journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD)
+
+    assert entry["state"] == SUBMITTED
+    assert get.call_count == 0
+
+def test_connect_timeouts_leave_the_order_not_sent(schwab_api, requests_mock, tmp_path, orders_url, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("py_schwab_wrapper.order_journal.time.sleep", sleeps.append)
+    post = requests_mock.post(orders_url, exc=ConnectTimeout)
+    get = requests_mock.get(orders_url, json=[])
+    journal = OrderJournal(path=str(tmp_path / "journal.jsonl"), max_submissions=3, connect_retry_delay=0.5)
+
+    with pytest.raises(ConnectTimeout):
+        journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD, client_order_id="abc")
+
+    assert post.call_count == 3 and get.call_count == 0
+    assert sleeps == [0.5, 0.5]
+    assert journal.entries["abc"]["state"] == NOT_SENT
+    assert journal.open_entries() == []
+
+def test_server_error_is_reconciled_not_rejected(schwab_api, requests_mock, journal, orders_url):
+    post = requests_mock.post(orders_url, status_code=502, json={"error": "Bad Gateway"})
+    requests_mock.get(orders_url, json=[placed_order(9)])
+
+    entry = journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD, client_order_id="abc")
+
+    assert entry["state"] == CONFIRMED
+    assert entry["order_id"] == 9
+    assert post.call_count == 1
+
+def test_rejected_order_is_not_retried(schwab_api, requests_mock, journal, orders_url):
+    post = requests_mock.post(orders_url, status_code=400, json={"error": "Bad Request"})
+
+    with pytest.raises(HTTPError):
+        journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD, client_order_id="abc")
+
+    assert post.call_count == 1
+    assert journal.entries["abc"]["state"] == REJECTED
+
+def test_existing_order_ids_are_not_claimed_twice(schwab_api, requests_mock, journal, orders_url):
+    requests_mock.post(orders_url, exc=ReadTimeout)
+    requests_mock.get(orders_url, json=[placed_order(7)])
+
+    first = journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD)
+    assert first["state"] == CONFIRMED
+
+    # The identical second order cannot be matched to order 7 again
+    with pytest.raises(ReadTimeout):
+        journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD, client_order_id="second")
+    assert journal.entries["second"]["state"] == UNKNOWN
+
+@pytest.mark.parametrize("location", [f"/trader/v1/accounts/{ACCOUNT_HASH}/orders/7", None])
+def test_identical_order_placed_earlier_is_not_claimed(schwab_api, requests_mock, journal, orders_url, location):
+    # The first order was acknowledged; the identical second one timed out and never reached Schwab
+    requests_mock.post(orders_url, [{"status_code": 201, "headers": {"Location": location} if location else {}},
+                                    {"exc": ReadTimeout}])
+    requests_mock.get(orders_url, json=[placed_order(7)])
+
+    first = journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD)
+    with pytest.raises(ReadTimeout):
+        journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD, client_order_id="second")
+
+    assert first["order_id"] == (7 if location else None)
+    assert journal.entries["second"]["state"] == UNKNOWN
+
+def test_recover_after_restart(schwab_api, requests_mock, tmp_path, orders_url):
+    path = str(tmp_path / "journal.jsonl")
+    with open(path, "w") as f:
+        f.write(json.dumps({"client_order_id": "lost", "state": "PENDING", "ts": 1.0,
+                            "account_hash": ACCOUNT_HASH, "payload": ORDER_PAYLOAD,
+                            "first_sent_at": 1.0, "submissions": 1}) + "\n")
+        f.write('{"client_order_id": "torn", "sta')
+
+    requests_mock.get(orders_url, json=[placed_order(42)])
+    journal = OrderJournal(path=path, reconcile_attempts=1, reconcile_delay=0)
+
+    recovered = journal.recover(schwab_api)
+
+    assert [entry["state"] for entry in recovered] == [CONFIRMED]
+    assert journal.entries["lost"]["order_id"] == 42
+    assert journal.open_entries() == []
+
+def test_recover_marks_missing_orders(schwab_api, requests_mock, tmp_path, orders_url):
+    path = str(tmp_path / "journal.jsonl")
+    with open(path, "w") as f:
+        f.write(json.dumps({"client_order_id": "lost", "state": "UNKNOWN", "ts": 1.0,
+                            "account_hash": ACCOUNT_HASH, "payload": ORDER_PAYLOAD,
+                            "first_sent_at": 1.0, "submissions": 1}) + "\n")
+
+    requests_mock.get(orders_url, json=[])
+    journal = OrderJournal(path=path, reconcile_attempts=1, reconcile_delay=0)
+
+    recovered = journal.recover(schwab_api)
+
+    assert recovered[0]["state"] == NOT_FOUND
+
+def test_deadline_leaves_a_possibly_placed_order_unknown(schwab_api, requests_mock, journal, orders_url):
+    post = requests_mock.post(orders_url, exc=ReadTimeout)
+    reconcile = requests_mock.get(orders_url, json=[])
+
+    with deadline(5.0), pytest.raises(DeadlineExceeded) as error:
+        journal.submit(schwab_api, ACCOUNT_HASH, ORDER_PAYLOAD, client_order_id="abc")
+
+    assert error.value.sent
+    assert post.call_count == 1 and reconcile.call_count == 0
+    assert journal.entries["abc"]["state"] == UNKNOWN
+
+def test_recover_respects_earlier_submissions(schwab_api, requests_mock, tmp_path, orders_url):
+    path = str(tmp_path / "journal.jsonl")
+    with open(path, "w") as f:
+        f.write(json.dumps({"client_order_id": "lost", "state": "UNKNOWN", "ts": 1.0,
+                            "account_hash": ACCOUNT_HASH, "payload": ORDER_PAYLOAD,
+                            "first_sent_at": 1.0, "submissions": 2}) + "\n")
+
+    post = requests_mock.post(orders_url, status_code=201)
+    requests_mock.get(orders_url, json=[])
+    journal = OrderJournal(path=path, reconcile_attempts=1, reconcile_delay=0, max_submissions=2)
+
+    recovered = journal.recover(schwab_api, resubmit=True)
+
+    assert post.call_count == 0
+    assert recovered[0]["state"] == NOT_FOUND and recovered[0]["submissions"] == 2
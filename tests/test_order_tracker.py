@@ -0,0 +1,114 @@
+import json
+import re
+from py_schwab_wrapper.order_tracker import OrderTracker, flatten_orders
+
+ACCOUNT_HASH = "sample_account_hash"
+
+def order(order_id, status, children=None):
+    result = {"orderId": order_id, "status": status, "orderStrategyType": "SINGLE"}
+    if children:
+        result["orderStrategyType"] = "TRIGGER"
+        result["childOrderStrategies"] = children
+    return result
+
+def test_flatten_orders_includes_children():
+    with open("tests/test_data/sample_orders") as f:
+        orders = json.load(f)
+
+    flattened = list(flatten_orders(orders))
+
+    assert len(flattened) > len(orders)
+    assert flattened[0] is orders[0]
+
+def test_first_poll_loads_session_window(schwab_api, requests_mock):
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{ACCOUNT_HASH}/orders"
+    requests_mock.get(url, json=[order(1, "WORKING"), order(2, "FILLED")])
+    events = []
+
+    tracker = OrderTracker(schwab_api, ACCOUNT_HASH, on_status_change=lambda o, prev: events.append((o["orderId"], prev)))
+    changes = tracker.poll(now=1_000_000)
+
+    assert set(tracker.orders) == {1, 2}
+    assert len(changes) == 2
+    assert events == [(1, None), (2, None)]
+    # The first poll uses get_orders' default 9:30-16:00 window
+    assert "T09:30:00" in requests_mock.last_request.qs["fromenteredtime"][0].upper()
+
+def test_later_polls_narrow_window_and_refresh_open_orders(schwab_api, requests_mock):
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{ACCOUNT_HASH}/orders"
+    listing = requests_mock.get(url, [
+        {"json": [order(1, "WORKING"), order(2, "FILLED"), order(3, "WORKING")]},
+        {"json": [order(4, "WORKING")]},
+    ])
+    single = requests_mock.get(f"{url}/1", json=order(1, "FILLED"))
+    requests_mock.get(f"{url}/3", json=order(3, "WORKING"))
+    fills = []
+
+    tracker = OrderTracker(schwab_api, ACCOUNT_HASH, lookback=30)
+    tracker.subscribe(lambda o, prev: fills.append((o["orderId"], prev)), statuses=["FILLED"])
+    tracker.poll(now=1_000_000)
+    fills.clear()
+
+    changes = tracker.poll(now=1_000_010)
+
+    assert listing.last_request.qs["fromenteredtime"][0].startswith("1970-01-12t13:46:10")
+    assert single.call_count == 1
+    assert {o["orderId"]: prev for o, prev in changes} == {1: "WORKING", 4: None}
+    assert fills == [(1, "WORKING")]
+    assert [o["orderId"] for o in tracker.open_orders()] == [3, 4]
+
+def test_child_orders_are_tracked(schwab_api, requests_mock):
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{ACCOUNT_HASH}/orders"
+    oco = order(11, "WORKING", children=[order(12, "AWAITING_PARENT_ORDER"), order(13, "AWAITING_PARENT_ORDER")])
+    requests_mock.get(url, [{"json": [oco]}, {"json": []}])
+    filled_oco = order(11, "FILLED", children=[order(12, "FILLED"), order(13, "CANCELED")])
+    parent = requests_mock.get(f"{url}/11", json=filled_oco)
+
+    tracker = OrderTracker(schwab_api, ACCOUNT_HASH)
+    tracker.poll(now=1_000_000)
+    changes = tracker.poll(now=1_000_010)
+
+    assert {o["orderId"]: o["status"] for o, _ in changes} == {11: "FILLED", 12: "FILLED", 13: "CANCELED"}
+    assert parent.call_count == 1  # The children arrive with their parent, not through get_order
+    assert tracker.open_orders() == []
+
+def test_failing_callback_does_not_break_poll(schwab_api, requests_mock):
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{ACCOUNT_HASH}/orders"
+    requests_mock.get(url, json=[order(1, "WORKING")])
+    received = []
+
+    def broken(o, prev):
+        raise RuntimeError("boom")
+
+    tracker = OrderTracker(schwab_api, ACCOUNT_HASH, on_status_change=broken)
+    tracker.subscribe(lambda o, prev: received.append(o["orderId"]))
+    tracker.poll(now=1_000_000)
+
+    assert received == [1]
+
+def test_one_request_per_poll_covers_resting_orders(schwab_api, requests_mock):
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{ACCOUNT_HASH}/orders"
+    resting = [dict(order(i, "WORKING"), enteredTime="1970-01-12T10:00:00+0000") for i in range(1, 21)]
+    listing = requests_mock.get(url, [{"json": resting}, {"json": resting[:19] + [dict(resting[19], status="FILLED")]}])
+    single = requests_mock.get(re.compile(f"{url}/\\d+"), json={})
+
+    tracker = OrderTracker(schwab_api, ACCOUNT_HASH, lookback=30)
+    tracker.poll(now=1_000_000)
+    changes = tracker.poll(now=1_000_010)
+
+    # The window reaches back to the oldest open order instead of fetching each one
+    assert listing.last_request.qs["fromenteredtime"][0].startswith("1970-01-12t09:59:30")
+    assert listing.call_count == 2 and single.call_count == 0
+    assert [(o["orderId"], prev) for o, prev in changes] == [(20, "WORKING")]
+
+def test_order_refreshes_are_capped_and_rotated(schwab_api, requests_mock):
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{ACCOUNT_HASH}/orders"
+    requests_mock.get(url, [{"json": [order(1, "WORKING"), order(2, "WORKING"), order(3, "WORKING")]}, {"json": []}])
+    singles = {i: requests_mock.get(f"{url}/{i}", json=order(i, "WORKING")) for i in (1, 2, 3)}
+
+    tracker = OrderTracker(schwab_api, ACCOUNT_HASH, max_order_refreshes=2)
+    tracker.poll(now=1_000_000)
+    tracker.poll(now=1_000_010)
+    tracker.poll(now=1_000_020)
+
+    assert [singles[i].call_count for i in (1, 2, 3)] == [2, 1, 1]
@@ -0,0 +1,77 @@
+import pytest
+from py_schwab_wrapper.positions import PositionsSnapshot, PositionsService, ADDED, CHANGED, REMOVED
+
+def account(account_number, positions, liquidation_value=10000.0):
+    return {
+        "securitiesAccount": {
+            "accountNumber": account_number,
+            "positions": [
+                {
+                    "instrument": {"symbol": symbol, "assetType": "EQUITY"},
+                    "longQuantity": quantity if quantity > 0 else 0.0,
+                    "shortQuantity": -quantity if quantity < 0 else 0.0,
+                    "averagePrice": 100.0,
+                    "marketValue": market_value,
+                    "currentDayProfitLoss": market_value - 100.0 * quantity,
+                    "longOpenProfitLoss": market_value - 100.0 * quantity,
+                }
+                for symbol, quantity, market_value in positions
+            ],
+            "currentBalances": {"liquidationValue": liquidation_value, "cashBalance": 500.0}
+        }
+    }
+
+def test_snapshot_builds_keyed_table():
+    snapshot = PositionsSnapshot.from_accounts([
+        account("111", [("QQQ", 10, 4800.0), ("AAPL", -5, -1000.0)]),
+        account("222", [("QQQ", 1, 480.0)]),
+    ])
+
+    assert len(snapshot) == 3
+    assert snapshot.row("111", "AAPL")["quantity"] == -5.0
+    assert snapshot.row("222", "QQQ")["market_value"] == 480.0
+    assert snapshot.row("222", "AAPL") is None
+    assert snapshot.balances["111"] == {"liquidationValue": 10000.0, "cashBalance": 500.0}
+
+def test_diff_reports_only_changed_positions():
+    before = PositionsSnapshot.from_accounts([
+        account("111", [("QQQ", 10, 4800.0), ("AAPL", 5, 1000.0), ("MSFT", 1, 400.0)]),
+    ])
+    after = PositionsSnapshot.from_accounts([
+        account("111", [("QQQ", 10, 4810.0), ("AAPL", 5, 1000.0), ("SPY", 2, 1100.0)], liquidation_value=10010.0),
+    ])
+
+    changes = {(c.account_number, c.symbol): c for c in after.diff(before)}
+
+    assert set(changes) == {("111", "QQQ"), ("111", "SPY"), ("111", "MSFT")}
+    assert changes[("111", "QQQ")].change == CHANGED
+    assert changes[("111", "QQQ")].market_value_change == pytest.approx(10.0)
+    assert changes[("111", "QQQ")].quantity_change == 0.0
+    assert changes[("111", "SPY")].change == ADDED
+    assert changes[("111", "MSFT")].change == REMOVED
+    assert changes[("111", "MSFT")].quantity_change == -1.0
+    assert after.balance_changes(before) == {"111": {"liquidationValue": pytest.approx(10.0)}}
+
+    # Restricting to quantity ignores price-driven changes
+    quantity_only = after.diff(before, columns=("quantity",))
+    assert {c.symbol for c in quantity_only} == {"SPY", "MSFT"}
+
+def test_service_refresh_diffs_against_previous(schwab_api, requests_mock):
+    requests_mock.get(
+        f"{schwab_api.base_url}/trader/v1/accounts/accountNumbers",
+        json=[{"accountNumber": "111", "hashValue": "hash111"}]
+    )
+    requests_mock.get(f"{schwab_api.base_url}/trader/v1/accounts/hash111", [
+        {"json": account("111", [("QQQ", 10, 4800.0)])},
+        {"json": account("111", [("QQQ", 10, 4800.0)])},
+        {"json": account("111", [("QQQ", 5, 2400.0)])},
+    ])
+    service = PositionsService(schwab_api)
+
+    assert [c.change for c in service.refresh()] == [ADDED]
+    assert service.refresh() == []
+    changes = service.refresh()
+
+    assert len(changes) == 1
+    assert changes[0].quantity_change == -5.0
+    assert service.previous is not None
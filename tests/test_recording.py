@@ -0,0 +1,71 @@
+import json
+import os
+import requests
+from py_schwab_wrapper.schwab_api import SchwabAPI
+from py_schwab_wrapper.testing.recording import RecordingAdapter, load_recording, REDACTED
+from py_schwab_wrapper.testing.stand_in import StandInServer
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "test_data")
+
+class TokenStore:
+    def __init__(self):
+        self.token = {"access_token": "", "refresh_token": "stored-refresh", "expires_at": 0}
+
+    def load(self):
+        return self.token
+
+    def save(self, token):
+        self.token = token
+
+def make_api(base_url, adapters=None):
+    store = TokenStore()
+    return SchwabAPI("client", "secret", base_url=base_url, load_token_func=store.load,
+                     save_token_func=store.save, adapters=adapters)
+
+def load_price_history():
+    with open(os.path.join(TEST_DATA, "QQQ-2024-08-23-5min.json")) as f:
+        return json.load(f)
+
+def test_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    history = load_price_history()
+
+    with StandInServer() as server:
+        server.add_route("GET", "/marketdata/v1/pricehistory", history)
+        recorder = RecordingAdapter(path, mode="record")
+        api = make_api(server.base_url, adapters={"http://": recorder})
+        assert api.get_price_history("QQQ", period_type="day", period=1) == history
+        recorder.save()
+
+    entries = load_recording(path)
+    assert [(entry["method"], entry["path"]) for entry in entries] == [
+        ("POST", "/v1/oauth/token"), ("GET", "/marketdata/v1/pricehistory")
+    ]
+    assert json.loads(entries[0]["body"])["access_token"] == REDACTED
+
+    replay = RecordingAdapter(path, mode="replay", latency_scale=0)
+    offline = make_api("http://schwab.invalid", adapters={"http://": replay})
+    offline.refresh_token()  # Refreshing goes through the session with the replay adapter mounted
+    assert offline.get_price_history("QQQ", period_type="day", period=1) == history
+
+def test_stand_in_serves_recordings_tokens_and_orders(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    history = load_price_history()
+    with StandInServer() as source:
+        source.add_route("GET", "/marketdata/v1/pricehistory", history)
+        recorder = RecordingAdapter(path, mode="record")
+        make_api(source.base_url, adapters={"http://": recorder}).get_price_history("QQQ", period_type="day", period=1)
+        recorder.save()
+
+    with StandInServer(recordings=[path]) as server:
+        api = make_api(server.base_url)
+        assert api.token["access_token"].startswith("stand-in-")
+        assert api.get_price_history("QQQ", period_type="day", period=1) == history
+
+        response = api.post_order("hash", {"orderType": "MARKET"})
+        missing = requests.get(f"{server.base_url}/trader/v1/unknown")
+
+    assert response is None  # 201 Created
+    assert missing.status_code == 404
+    assert server.tokens_issued == 1
+    assert ("GET", "/marketdata/v1/pricehistory", "period=1&periodType=day&symbol=QQQ") in server.requests
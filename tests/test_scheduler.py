@@ -0,0 +1,79 @@
+from datetime import datetime
+import threading
+import pytest
+import pytz
+from py_schwab_wrapper.market_calendar import MarketCalendar
+from py_schwab_wrapper.scheduler import BarScheduler
+
+eastern = pytz.timezone('America/New_York')
+
+def seconds(year, month, day, hour=0, minute=0, second=0):
+    return eastern.localize(datetime(year, month, day, hour, minute, second)).timestamp()
+
+@pytest.fixture(scope="module")
+def calendar():
+    return MarketCalendar(start_year=2024, end_year=2024)
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.now += delay
+
+def test_plan_aligns_to_bar_close_and_spaces_requests(calendar):
+    scheduler = BarScheduler(["QQQ", "SPY", "IWM"], interval=300, settle_delay=2, requests_per_minute=120, calendar=calendar)
+
+    plan = scheduler.plan(now=seconds(2024, 8, 23, 10, 1, 30))
+
+    bar_close = seconds(2024, 8, 23, 10, 5)
+    assert plan == [(bar_close + 2, "QQQ"), (bar_close + 2.5, "SPY"), (bar_close + 3, "IWM")]
+
+def test_closed_sessions_are_skipped(calendar):
+    scheduler = BarScheduler(["QQQ"], interval=300, settle_delay=0, calendar=calendar)
+
+    # Friday after the close -> first bar of Monday's session
+    assert scheduler.next_bar_close(seconds(2024, 8, 23, 16, 0)) == seconds(2024, 8, 26, 9, 35)
+    # Early close: the 20-minute bar due at 13:10 is cut at 13:00
+    scheduler = BarScheduler(["QQQ"], interval=1200, settle_delay=0, calendar=calendar)
+    assert scheduler.next_bar_close(seconds(2024, 11, 29, 12, 55)) == seconds(2024, 11, 29, 13, 0)
+
+def test_run_fetches_each_symbol_per_bar_and_reports_lag(calendar):
+    clock = FakeClock(seconds(2024, 8, 23, 10, 1))
+    fetched = []
+
+    def fetch(symbol):
+        fetched.append((symbol, clock()))
+        clock.now += 0.75  # Each request takes longer than the spacing
+        if symbol == "SPY":
+            raise RuntimeError("throttled")
+
+    scheduler = BarScheduler(["QQQ", "SPY"], interval=300, settle_delay=1, requests_per_minute=120,
+                             calendar=calendar, clock=clock, sleep=clock.sleep)
+    scheduler.run(fetch, max_cycles=2)
+
+    assert [symbol for symbol, _ in fetched] == ["QQQ", "SPY", "QQQ", "SPY"]
+    assert fetched[0][1] == seconds(2024, 8, 23, 10, 5, 1)
+    assert fetched[2][1] == seconds(2024, 8, 23, 10, 10, 1)
+    report = scheduler.lag_report()
+    assert report["fetches"] == 4
+    assert report["errors"] == 2
+    assert report["max_lag"] == pytest.approx(0.25)
+
+def test_stop_event_interrupts_a_long_wait(calendar):
+    # Friday after the close: the next bar is Monday morning
+    clock = FakeClock(seconds(2024, 8, 23, 16, 0))
+    scheduler = BarScheduler(["QQQ"], calendar=calendar, clock=clock)
+    stop_event = threading.Event()
+    fetched = []
+    runner = threading.Thread(target=scheduler.run, args=(fetched.append, stop_event))
+    runner.start()
+
+    stop_event.set()
+    runner.join(timeout=2)
+
+    assert not runner.is_alive()
+    assert fetched == []
@@ -3,60 +3,13 @@ import pytest
 import requests_mock
 import sys
 import os
+import subprocess
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from py_schwab_wrapper.schwab_api import SchwabAPI
 from requests.exceptions import HTTPError
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
 
-@pytest.fixture
-def schwab_api(monkeypatch, requests_mock):
-    # Mock the token refresh POST request
-    requests_mock.post(
-        "https://api.schwabapi.com/v1/oauth/token",
-        json={
-            "expires_in": 1800,
-            "token_type": "Bearer",
-            "scope": "api",
-            "refresh_token": "mock_refresh_token",
-            "access_token": "mock_access_token",
-            "id_token": "mock_id_token",
-            "expires_at": 1726754346.9192016
-        }
-    )
-    
-    # Mock the load_token function to return a test token
-    def mock_load_token(self):
-        return {
-            "expires_in": 1800,
-            "token_type": "Bearer",
-            "scope": "api",
-            "refresh_token": "mock_refresh_token",
-            "access_token": "mock_access_token",
-            "id_token": "mock_id_token",
-            "expires_at": 1726754346.9192016
-        }
-    
-    # Mock the save_token function to do nothing (prevent writing to file)
-    def mock_save_token(self, token_data):
-        pass  # Do nothing
-
-    def mock_ensure_valid_token(self):
-        pass
-
-    def mock_refresh_token(self):
-        pass
-    
-    # Correct paths for both load_token and save_token
-    monkeypatch.setattr('py_schwab_wrapper.schwab_api.SchwabAPI.load_token', mock_load_token)
-    monkeypatch.setattr('py_schwab_wrapper.schwab_api.SchwabAPI.save_token', mock_save_token)
-    monkeypatch.setattr('py_schwab_wrapper.schwab_api.SchwabAPI.ensure_valid_token', mock_ensure_valid_token)
-    monkeypatch.setattr('py_schwab_wrapper.schwab_api.SchwabAPI.refresh_token', mock_refresh_token)
-    
-    api = SchwabAPI(client_id="test_client_id", client_secret="test_client_secret")
-
-    return api
-
 # Helper functions
 def load_test_data(filename):
     with open(f"tests/test_data/{filename}", "r") as f:
@@ -356,6 +309,18 @@ def test_get_orders(schwab_api, requests_mock):
     assert len(first_order["orderLegCollection"]) == 1
     assert first_order["orderLegCollection"][0]["instruction"] == "SELL_TO_CLOSE"
 
+def test_get_order(schwab_api, requests_mock):
+    # Use the first order of the sample response as the single order payload
+    mock_response = load_test_data("sample_orders")[0]
+    account_hash = "sample_account_hash"
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{account_hash}/orders/{mock_response['orderId']}"
+    requests_mock.get(url, json=mock_response)
+
+    result = schwab_api.get_order(account_hash, mock_response["orderId"])
+
+    assert result["orderId"] == mock_response["orderId"]
+    assert result["status"] == "FILLED"
+
 def test_post_order_success(schwab_api, requests_mock):
     # Mock the API POST request for a successful order placement
     account_hash = "sample_account_hash"
@@ -630,4 +595,194 @@ def test_place_oco_order_error(schwab_api, requests_mock):
             price=150.00,
             stop_loss=140.00,
             profit_target=160.00
-        )
\ No newline at end of file
+        )
+
+def test_get_orders_history_splits_capped_windows(schwab_api, requests_mock):
+    account_hash = "sample_account_hash"
+    url = f"{schwab_api.base_url}/trader/v1/accounts/{account_hash}/orders"
+    # One order per hour over two days, the first day busy enough to hit a cap of 10 orders
+    start = datetime(2024, 9, 1, tzinfo=pytz.utc)
+    orders = [
+        {"orderId": i, "enteredTime": (start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%S+0000")}
+        for i in range(48)
+    ]
+
+    def respond(request, context):
+        window_start = datetime.fromisoformat(request.qs["fromenteredtime"][0])
+        window_end = datetime.fromisoformat(request.qs["toenteredtime"][0])
+        max_results = int(request.qs["maxresults"][0])
+        matching = [
+            order for order in orders
+            if window_start <= datetime.strptime(order["enteredTime"], "%Y-%m-%dT%H:%M:%S%z") <= window_end
+        ]
+        return matching[:max_results]
+
+    requests_mock.get(url, json=respond)
+
+    result = schwab_api.get_orders_history(
+        account_hash,
+        from_entered_time=start,
+        to_entered_time="2024-09-02T23:59:59Z",
+        max_results=10
+    )
+
+    assert [order["orderId"] for order in result] == list(reversed(range(48)))
+    assert requests_mock.call_count > 2  # Both day windows were split
+
+def test_get_orders_history_rejects_empty_range(schwab_api):
+    with pytest.raises(ValueError):
+        schwab_api.get_orders_history("sample_account_hash", "2024-09-02T00:00:00Z", "2024-09-01T00:00:00Z")
+
+def test_for_each_account_fans_out_and_caches_hashes(schwab_api, requests_mock):
+    numbers = requests_mock.get(
+        f"{schwab_api.base_url}/trader/v1/accounts/accountNumbers",
+        json=[
+            {"accountNumber": "123456789", "hashValue": "abcdef12345"},
+            {"accountNumber": "987654321", "hashValue": "xyz9876543"}
+        ]
+    )
+    requests_mock.get(f"{schwab_api.base_url}/trader/v1/accounts/abcdef12345/orders", json=[{"orderId": 1}])
+    requests_mock.get(f"{schwab_api.base_url}/trader/v1/accounts/xyz9876543/orders", json=[{"orderId": 2}])
+    requests_mock.get(
+        f"{schwab_api.base_url}/trader/v1/accounts/abcdef12345",
+        json={"securitiesAccount": {"accountNumber": "123456789", "positions": []}}
+    )
+
+    orders = schwab_api.get_orders_for_accounts(status="FILLED")
+    accounts = schwab_api.get_account_details(fields="positions", account_numbers=["123456789"])
+
+    assert orders == {"123456789": [{"orderId": 1}], "987654321": [{"orderId": 2}]}
+    assert list(accounts) == ["123456789"]
+    assert requests_mock.last_request.qs["fields"] == ["positions"]
+    assert numbers.call_count == 1
+
+def test_for_each_account_collects_exceptions(schwab_api, requests_mock):
+    requests_mock.get(
+        f"{schwab_api.base_url}/trader/v1/accounts/accountNumbers",
+        json=[
+            {"accountNumber": "123456789", "hashValue": "abcdef12345"},
+            {"accountNumber": "987654321", "hashValue": "xyz9876543"}
+        ]
+    )
+    requests_mock.get(f"{schwab_api.base_url}/trader/v1/accounts/abcdef12345/orders", json=[])
+    requests_mock.get(f"{schwab_api.base_url}/trader/v1/accounts/xyz9876543/orders", status_code=401)
+
+    result = schwab_api.get_orders_for_accounts(return_exceptions=True)
+
+    assert result["123456789"] == []
+    assert isinstance(result["987654321"], HTTPError)
+    with pytest.raises(HTTPError):
+        schwab_api.get_orders_for_accounts()
+    with pytest.raises(ValueError):
+        schwab_api.get_orders_for_accounts(account_numbers=["000000000"])
+
+def test_get_quotes_packs_symbols_into_batches(schwab_api, requests_mock):
+    url = f"{schwab_api.base_url}/marketdata/v1/quotes"
+
+    def respond(request, context):
+        symbols = request.qs["symbols"][0].upper().split(",")
+        result = {
+            symbol: {"assetMainType": "EQUITY", "symbol": symbol, "quote": {"lastPrice": float(len(symbol)), "bidPrice": 1.0}}
+            for symbol in symbols if symbol != "BAD"
+        }
+        if "BAD" in symbols:
+            result["errors"] = {"invalidSymbols": ["BAD"]}
+        return result
+
+    requests_mock.get(url, json=respond)
+    symbols = [f"S{i}" for i in range(25)] + ["BAD", "S0"]
+
+    result = schwab_api.get_quotes(symbols, fields="quote", batch_size=10)
+
+    assert requests_mock.call_count == 3
+    assert len([key for key in result if key != "errors"]) == 25
+    assert result["errors"] == {"invalidSymbols": ["BAD"]}
+    assert requests_mock.last_request.qs["fields"] == ["quote"]
+
+    table = schwab_api.get_quote_table(symbols, batch_size=10)
+    assert len(table) == 25
+    assert table.row("S10")["lastPrice"] == 3.0
+    assert table.last_prices()["S1"] == 2.0
+    assert table.row("S1")["askPrice"] != table.row("S1")["askPrice"]  # Missing fields are NaN
+    assert "BAD" not in table
+
+def test_get_options_chain_sharded_merges_and_retries_failed_shards(schwab_api, requests_mock, monkeypatch):
+    monkeypatch.setattr("py_schwab_wrapper.schwab_api.time.sleep", lambda seconds: None)
+    url = f"{schwab_api.base_url}/marketdata/v1/chains"
+    failures = {"2024-11-01": 3}  # Exhausts get_with_retry once, so the shard needs a second round
+
+    def respond(request, context):
+        from_date = request.qs["fromdate"][0]
+        contract_type = request.qs["contracttype"][0].upper()
+        if failures.get(from_date, 0) > 0:
+            failures[from_date] -= 1
+            context.status_code = 503
+            return {}
+        expiration = f"{from_date}:1"
+        contracts = {"480.0": [{"putCall": contract_type, "symbol": f"QQQ {from_date} {contract_type}"}]}
+        return {
+            "symbol": "QQQ", "status": "SUCCESS", "numberOfContracts": 1,
+            "callExpDateMap": {expiration: contracts} if contract_type == "CALL" else {},
+            "putExpDateMap": {expiration: contracts} if contract_type == "PUT" else {},
+        }
+
+    requests_mock.get(url, json=respond)
+    shards = []
+
+    chain = schwab_api.get_options_chain_sharded("QQQ", "2024-10-25", "2024-11-07", shard_days=7,
+                                                 split_contract_types=True, on_shard=shards.append)
+
+    assert list(chain["callExpDateMap"]) == ["2024-10-25:1", "2024-11-01:1"]
+    assert list(chain["putExpDateMap"]) == ["2024-10-25:1", "2024-11-01:1"]
+    assert chain["numberOfContracts"] == 4
+    assert chain["status"] == "SUCCESS"
+    assert len(shards) == 4
+    assert {request.qs["todate"][0] for request in requests_mock.request_history} == {"2024-10-31", "2024-11-07"}
+
+def test_lazy_client_defers_token_and_session_to_first_call(requests_mock):
+    loads = []
+    store = {"token": {"access_token": "", "refresh_token": "lazy", "expires_at": 0}}
+
+    def load_token():
+        loads.append(True)
+        return store["token"]
+
+    requests_mock.post("https://api.schwabapi.com/v1/oauth/token",
+                       json={"access_token": "fresh", "refresh_token": "lazy", "expires_in": 1800})
+    requests_mock.get("https://api.schwabapi.com/marketdata/v1/quotes", json={"QQQ": {}})
+
+    api = SchwabAPI("client", "secret", load_token_func=load_token,
+                    save_token_func=lambda token: store.update(token=token), lazy=True)
+
+    assert loads == [] and requests_mock.call_count == 0
+    assert api._session is None
+
+    api.get_quotes(["QQQ"])
+
+    assert api.token["access_token"] == "fresh"
+    assert requests_mock.request_history[-1].headers["Authorization"] == "Bearer fresh"
+
+def test_token_refresh_reuses_the_session(requests_mock):
+    store = {"token": {"access_token": "old", "refresh_token": "refresh", "expires_at": 0}}
+    token = requests_mock.post("https://api.schwabapi.com/v1/oauth/token",
+                               json={"access_token": "fresh", "refresh_token": "refresh", "expires_in": 1800})
+    api = SchwabAPI("client", "secret", load_token_func=lambda: store["token"],
+                    save_token_func=lambda new_token: store.update(token=new_token), lazy=True)
+    session = api.session
+    session.headers["Authorization"] = "Bearer old"
+
+    api.refresh_token()
+
+    assert api.session is session
+    assert session.headers["Authorization"] == "Bearer fresh"
+    assert token.last_request.headers["Authorization"].startswith("Basic ")
+
+def test_import_and_lazy_construction_skip_heavy_modules():
+    code = ("import sys\n"
+            "from py_schwab_wrapper.schwab_api import SchwabAPI\n"
+            "SchwabAPI('client', 'secret', lazy=True)\n"
+            "print(sorted(name for name in ('requests', 'pytz') if name in sys.modules))\n")
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == "[]"
@@ -0,0 +1,169 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import pytest
+from py_schwab_wrapper.candles import CandleSeries
+from py_schwab_wrapper.metrics import CACHE_LOOKUPS
+from py_schwab_wrapper.shared_cache import SharedMarketDataCache, make_key, _key_hash
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def load_test_data(filename):
+    with open(os.path.join(ROOT, "tests", "test_data", filename), "r") as f:
+        return json.load(f)
+
+class FixedTTLCalendar:
+    # Freshness independent of whether the market is open when the tests run
+    def cache_ttl(self, ttl, timestamp=None, extended=False):
+        return ttl
+
+class FakeAPI:
+    def __init__(self, history):
+        self.history = history
+        self.calls = 0
+
+    def get_price_history(self, symbol, **params):
+        self.calls += 1
+        time.sleep(0.1)
+        return self.history
+
+@pytest.fixture
+def namespace():
+    return f"t{uuid.uuid4().hex[:8]}"
+
+@pytest.fixture
+def cache(namespace, tmp_path):
+    cache = SharedMarketDataCache(namespace, slots=16, calendar=FixedTTLCalendar(), lock_dir=str(tmp_path))
+    yield cache
+    cache.unlink()
+
+def test_series_round_trip_is_zero_copy(cache, namespace, tmp_path):
+    history = load_test_data("QQQ-default.json")
+    key = make_key("pricehistory", "QQQ", frequency_type="minute", frequency=1)
+    cache.put(key, CandleSeries.from_price_history(history))
+
+    reader = SharedMarketDataCache(namespace, calendar=FixedTTLCalendar(), lock_dir=str(tmp_path))
+    series = reader.get(key)
+
+    assert series.to_dicts() == history["candles"]
+    assert series.symbol == "QQQ"
+    assert isinstance(series.closes, memoryview) and series.closes.readonly
+    first, last = series.datetimes[10], series.datetimes[20]
+    assert len(series.between(first, last)) == 11
+    assert reader.get(key) is series  # Attached once per process
+    assert reader.get(make_key("pricehistory", "SPY")) is None
+    reader.close()
+
+def test_entries_outlive_the_process_that_wrote_them(cache, namespace, tmp_path):
+    code = ("from py_schwab_wrapper.shared_cache import SharedMarketDataCache\n"
+            "class Calendar:\n"
+            "    def cache_ttl(self, ttl, timestamp=None, extended=False):\n"
+            "        return ttl\n"
+            f"cache = SharedMarketDataCache({namespace!r}, calendar=Calendar(), lock_dir={str(tmp_path)!r})\n"
+            "cache.put('chains:QQQ:', {'symbol': 'QQQ', 'status': 'SUCCESS'})\n"
+            "cache.put('pricehistory:QQQ:', {'symbol': 'QQQ', 'candles': [{'open': 1.0, 'high': 2.0, 'low': 0.5,"
+            " 'close': 1.5, 'volume': 10, 'datetime': 1000}]})\n")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+    assert cache.get("chains:QQQ:") == {"symbol": "QQQ", "status": "SUCCESS"}
+    assert cache.get("pricehistory:QQQ:").to_dicts() == [
+        {"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10, "datetime": 1000}]
+
+def test_concurrent_misses_fetch_once(cache):
+    api = FakeAPI(load_test_data("QQQ-2024-08-23-5min.json"))
+    results = []
+
+    def fetch():
+        results.append(cache.get_price_history(api, "QQQ", frequency_type="minute", frequency=5))
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert api.calls == 1
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert len({len(series) for series in results}) == 1
+
+def test_stale_and_replaced_entries(cache):
+    key = make_key("pricehistory", "QQQ")
+    cache.put(key, {"candles": [{"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1, "datetime": 1}]},
+              symbol="QQQ", ttl=60)
+    old = cache.get(key)
+
+    cache.invalidate(key)
+    assert cache.get(key) is None
+
+    cache.put(key, {"candles": [{"open": 2.0, "high": 2.0, "low": 2.0, "close": 2.0, "volume": 2, "datetime": 2}]},
+              symbol="QQQ", ttl=60)
+    assert cache.get(key).closes[0] == 2.0
+    assert old.closes[0] == 1.0  # Series handed out earlier stay readable
+
+    cache.put(make_key("chains", "QQQ"), {"status": "SUCCESS"}, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get(make_key("chains", "QQQ")) is None
+
+def test_full_index_evicts_the_entry_closest_to_expiry(namespace, tmp_path):
+    cache = SharedMarketDataCache(namespace, slots=2, calendar=FixedTTLCalendar(), lock_dir=str(tmp_path))
+    try:
+        cache.put("a", {"v": 1}, ttl=10)
+        cache.put("b", {"v": 2}, ttl=60)
+        cache.put("c", {"v": 3}, ttl=60)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == {"v": 2} and cache.get("c") == {"v": 3}
+    finally:
+        cache.unlink()
+
+def test_options_chain_through_the_client(schwab_api, requests_mock, cache):
+    chain = {"symbol": "QQQ", "status": "SUCCESS", "callExpDateMap": {}, "putExpDateMap": {}}
+    endpoint = requests_mock.get("https://api.schwabapi.com/marketdata/v1/chains", json=chain)
+
+    assert cache.get_options_chain(schwab_api, "QQQ", contract_type="CALL") == chain
+    assert cache.get_options_chain(schwab_api, "QQQ", contract_type="CALL") == chain
+
+    assert endpoint.call_count == 1
+    assert schwab_api.metrics.counter(CACHE_LOOKUPS, cache="shared_memory", result="hit") == 1
+
+def test_stale_segments_are_removed(cache):
+    def segment_exists(key):
+        _, generation, _ = cache._find(_key_hash(key))
+        return os.path.exists(f"/dev/shm/{cache._segment_name(_key_hash(key), generation)}")
+
+    cache.put("kept", {"v": 0}, ttl=60)
+    cache.put("invalidated", {"v": 1}, ttl=60)
+    cache.put("expired", {"v": 2}, ttl=0.05)
+    cache.invalidate("invalidated")
+    time.sleep(0.1)
+
+    assert not segment_exists("invalidated")
+    assert segment_exists("expired")
+    assert cache.sweep() == 1
+    assert not segment_exists("expired") and segment_exists("kept")
+    assert cache.get("expired") is None
+
+    cache.put("invalidated", {"v": 3}, ttl=60)
+    assert cache.get("invalidated") == {"v": 3}
+
+def test_rewrite_after_eviction_is_seen_by_other_processes(namespace, tmp_path):
+    writer = SharedMarketDataCache(namespace, slots=2, calendar=FixedTTLCalendar(), lock_dir=str(tmp_path))
+    reader = SharedMarketDataCache(namespace, calendar=FixedTTLCalendar(), lock_dir=str(tmp_path))
+    try:
+        writer.put("a", {"v": "old"}, ttl=0.2)
+        assert reader.get("a") == {"v": "old"}
+        time.sleep(0.3)
+        writer.put("b", {"v": 2}, ttl=60)
+        writer.put("c", {"v": 3}, ttl=60)  # Evicts the expired "a"
+
+        writer.put("a", {"v": "new"}, ttl=60)
+
+        assert writer.get("a") == {"v": "new"}
+        assert reader.get("a") == {"v": "new"}
+    finally:
+        reader.close()
+        writer.unlink()
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import pytest
+from py_schwab_wrapper.streaming import SchwabStreamer, parse_message, LEVELONE_EQUITIES, CHART_EQUITY
+
+websockets = pytest.importorskip("websockets")
+
+STREAMER_INFO = {
+    "streamerSocketUrl": None,  # Filled in with the local stand-in address
+    "schwabClientCustomerId": "customer",
+    "schwabClientCorrelId": "correl",
+    "schwabClientChannel": "N9",
+    "schwabClientFunctionId": "APIAPP"
+}
+
+class StandInStreamer:
+    """Minimal local stand-in for Schwab's streamer."""
+
+    def __init__(self, drop_after_data=0, silent=False, reject_logins=0):
+        self.drop_after_data = drop_after_data
+        self.reject_logins = reject_logins
+        self.silent = silent
+        self.requests = []
+        self.connections = 0
+
+    async def handler(self, websocket):
+        self.connections += 1
+        connection = self.connections
+        async for raw in websocket:
+            for request in json.loads(raw)["requests"]:
+                self.requests.append(request)
+                command = request["command"]
+                code = 0
+                if command == "LOGIN" and (request["parameters"]["Authorization"] != "mock_access_token"
+                                           or connection <= self.reject_logins):
+                    code = 3
+                await websocket.send(json.dumps({"response": [{
+                    "service": request["service"], "command": command,
+                    "requestid": request["requestid"], "content": {"code": code, "msg": "ok"}
+                }]}))
+                if command in ("SUBS", "ADD") and not self.silent:
+                    await websocket.send(json.dumps({"data": [{
+                        "service": request["service"], "timestamp": 1724423100000, "command": command,
+                        "content": [{"key": key, "1": 480.1, "2": 480.2, "3": 480.15}
+                                    for key in request["parameters"]["keys"].split(",")]
+                    }]}))
+                    if connection <= self.drop_after_data:
+                        await websocket.close()
+                        return
+
+def run_streamer(schwab_api, requests_mock, stand_in, scenario):
+    async def main():
+        async with websockets.serve(stand_in.handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            requests_mock.get(
+                f"{schwab_api.base_url}/trader/v1/userPreference",
+                json={"streamerInfo": [dict(STREAMER_INFO, streamerSocketUrl=f"ws://127.0.0.1:{port}")]}
+            )
+            return await scenario()
+    return asyncio.run(main())
+
+def test_parse_message_names_chart_fields():
+    message = {"data": [{
+        "service": CHART_EQUITY, "timestamp": 1724423100000, "command": "SUBS",
+        "content": [{"key": "QQQ", "seq": 1, "1": 480.0, "2": 481.0, "3": 479.5, "4": 480.5, "5": 1000.0,
+                     "6": 12, "7": 1724423040000, "8": 19958}]
+    }]}
+
+    event = parse_message(message)[0]
+
+    assert event.symbol == "QQQ"
+    assert event.fields["open"] == 480.0
+    assert event.fields["close"] == 480.5
+    assert event.fields["datetime"] == 1724423040000
+    assert parse_message({"notify": [{"heartbeat": "1724423100000"}]}) == []
+
+def test_streamer_logs_in_and_delivers_quotes_to_queue(schwab_api, requests_mock):
+    stand_in = StandInStreamer()
+
+    async def scenario():
+        queue = asyncio.Queue()
+        streamer = SchwabStreamer(schwab_api, queue=queue)
+        await streamer.subscribe_quotes(["QQQ", "SPY"])
+        task = asyncio.create_task(streamer.run())
+        first = await asyncio.wait_for(queue.get(), timeout=5)
+        second = await asyncio.wait_for(queue.get(), timeout=5)
+        await streamer.subscribe_chart_bars(["QQQ"])
+        third = await asyncio.wait_for(queue.get(), timeout=5)
+        await streamer.unsubscribe_quotes(["SPY"])
+        await streamer.stop()
+        await asyncio.wait_for(task, timeout=5)
+        return streamer, [first, second, third]
+
+    streamer, events = run_streamer(schwab_api, requests_mock, stand_in, scenario)
+
+    assert [(e.service, e.symbol) for e in events] == [
+        (LEVELONE_EQUITIES, "QQQ"), (LEVELONE_EQUITIES, "SPY"), (CHART_EQUITY, "QQQ")
+    ]
+    assert events[0].fields["lastPrice"] == 480.15
+    commands = [(r["service"], r["command"]) for r in stand_in.requests]
+    assert commands[0] == ("ADMIN", "LOGIN")
+    assert (LEVELONE_EQUITIES, "UNSUBS") in commands
+    assert streamer.subscriptions[LEVELONE_EQUITIES]["keys"] == ["QQQ"]
+
+def test_streamer_reconnects_and_resubscribes(schwab_api, requests_mock):
+    stand_in = StandInStreamer(drop_after_data=1)
+
+    async def scenario():
+        received = []
+        streamer = SchwabStreamer(schwab_api, on_event=received.append, reconnect_delay=0.01)
+        await streamer.subscribe_quotes(["QQQ"])
+        task = asyncio.create_task(streamer.run())
+        while len(received) < 2:
+            await asyncio.sleep(0.01)
+        await streamer.stop()
+        await asyncio.wait_for(task, timeout=5)
+        return streamer, received
+
+    streamer, received = run_streamer(schwab_api, requests_mock, stand_in, scenario)
+
+    assert stand_in.connections == 2
+    assert streamer.connections == 2
+    assert [e.symbol for e in received] == ["QQQ", "QQQ"]
+
+def test_streamer_reconnects_when_heartbeats_stop(schwab_api, requests_mock):
+    stand_in = StandInStreamer(silent=True)
+
+    async def scenario():
+        streamer = SchwabStreamer(schwab_api, heartbeat_timeout=0.1, reconnect_delay=0.01)
+        task = asyncio.create_task(streamer.run())
+        while stand_in.connections < 2:
+            await asyncio.sleep(0.01)
+        await streamer.stop()
+        await asyncio.wait_for(task, timeout=5)
+
+    run_streamer(schwab_api, requests_mock, stand_in, scenario)
+
+    assert stand_in.connections >= 2
+
+def test_reconnect_backoff_restarts_after_a_successful_login(schwab_api, requests_mock, caplog):
+    # Two rejected logins escalate the delay; the drop after the third, healthy connection does not
+    stand_in = StandInStreamer(reject_logins=2, drop_after_data=3)
+
+    async def scenario():
+        streamer = SchwabStreamer(schwab_api, reconnect_delay=0.01)
+        await streamer.subscribe_quotes(["QQQ"])
+        task = asyncio.create_task(streamer.run())
+        while streamer.connections < 2:
+            await asyncio.sleep(0.01)
+        await streamer.stop()
+        await asyncio.wait_for(task, timeout=5)
+
+    with caplog.at_level("INFO", logger="py_schwab_wrapper.streaming"):
+        run_streamer(schwab_api, requests_mock, stand_in, scenario)
+
+    delays = [record.getMessage().split(" in ")[1] for record in caplog.records
+              if record.getMessage().startswith("Reconnecting")]
+    assert delays == ["0.01 seconds...", "0.02 seconds...", "0.01 seconds..."]
+
+def test_streamer_rejects_a_gateway_thin_client():
+    from py_schwab_wrapper.schwab_api import SchwabAPI
+
+    with pytest.raises(ValueError, match="access token"):
+        SchwabStreamer(SchwabAPI(gateway="/tmp/unused-gateway.sock"))